@@ -0,0 +1,418 @@
+"""
+Index BM25 in-process untuk dokumen_chunk, faq dan sop_komponen.
+
+Build (baca DB → tulis file index):
+    python -m app.bm25 build
+Cari dari command line:
+    python -m app.bm25 search "syarat cetak ulang ktm"
+
+Format file (npz terkompresi):
+- vocab       : semua term (utf-8, dipisah "\\n"), urut term_id
+- offsets     : awal posting tiap term (int64, panjang V+1)
+- doc_delta   : doc id per posting, delta-encoded per term (uint32)
+- tf          : frekuensi term per posting (uint16)
+- doc_len     : jumlah token per dokumen (uint32)
+- sumber, ref_id, sop_id, halaman : metadata per dokumen (-1 = NULL)
+- bagian, isi : teks per dokumen (blob utf-8 + offsets)
+- segmen      : faq.segmen_pengguna / sop.sasaran_layanan per dokumen (untuk filter)
+"""
+
+import argparse
+import os
+import re
+import threading
+import unicodedata
+from functools import lru_cache
+
+import numpy as np
+from sqlalchemy import text
+
+from .config import settings
+
+FORMAT_VERSION = 2
+
+K1 = 1.2
+B = 0.75
+
+SUMBER = ("dokumen_chunk", "faq", "sop_komponen")
+
+# nilai segmen yang lolos filter apa pun (kosong = NULL di DB)
+SEGMEN_SEMUA = ("", "Umum")            # faq.segmen_pengguna
+SASARAN_SEMUA = ("", "Campuran")       # sop.sasaran_layanan
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# =========================
+# TOKENIZER & STEMMER
+# =========================
+
+STOPWORDS = frozenset("""
+ada adalah adanya agar akan akan aku anda antara apa apabila apakah atas atau
+bagaimana bagaimanakah bagi bahkan bahwa baik banyak beberapa begitu belum
+berapa berikut bila bisa boleh dalam dan dapat dari daripada demikian dengan di
+dia dimana harus hal hanya hingga ia ialah ini itu jadi jika juga kalau kami
+kamu kapan karena ke kemudian kenapa kepada ketika kita lagi lain lalu maka
+mana masih melalui mereka merupakan misalnya mungkin namun oleh pada para
+perlu pun saat saja sampai sangat saya sebagai sebelum sedang sehingga sejak
+seperti serta setelah setiap sudah supaya tanpa telah tentang terhadap tersebut
+tetapi tidak untuk walaupun yaitu yakni yang
+""".split())
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+_VOWELS = "aiueo"
+
+
+def _strip_prefix(word: str) -> str:
+    """Buang satu awalan (di-, ke-, se-, ter-, ber-, per-, me(N)-, pe(N)-)."""
+    for prefix in ("di", "ke", "se"):
+        if word.startswith(prefix) and len(word) - 2 >= 4:
+            return word[2:]
+    for prefix in ("ter", "ber", "per"):
+        if word.startswith(prefix) and len(word) - 3 >= 4:
+            return word[3:]
+    if word.startswith("bel") and word[3:].startswith("ajar"):
+        return word[3:]
+
+    for base in ("me", "pe"):
+        if not word.startswith(base):
+            continue
+        rest = word[2:]
+        if rest.startswith("ng") and len(rest) - 2 >= 3:
+            return rest[2:]                        # mengambil → ambil
+        if rest.startswith("ny") and len(rest) - 2 >= 3:
+            return "s" + rest[2:]                  # menyusun → susun
+        if rest.startswith("m") and len(rest) - 1 >= 4:
+            if rest[1] in _VOWELS:
+                return "p" + rest[1:]              # memakai → pakai
+            return rest[1:]                        # membuat → buat
+        if rest.startswith("n") and len(rest) - 1 >= 4:
+            if rest[1] in _VOWELS:
+                return "t" + rest[1:]              # menulis → tulis
+            return rest[1:]                        # mendaftar → daftar
+        if rest[:1] in ("l", "r", "w", "y") and len(rest) >= 4:
+            return rest                            # melapor → lapor
+    return word
+
+
+@lru_cache(maxsize=100_000)
+def stem(word: str) -> str:
+    """
+    Stemmer bahasa Indonesia ringan berbasis aturan (tanpa kamus):
+    partikel → kata ganti milik → akhiran turunan → maks. 2 awalan.
+    Yang penting konsisten untuk index & query, bukan akurasi linguistik.
+    """
+    if len(word) <= 4 or not word.isalpha():
+        return word
+    for suffix in ("lah", "kah", "tah", "pun"):
+        if word.endswith(suffix) and len(word) - 3 >= 4:
+            word = word[:-3]
+            break
+    for suffix in ("nya", "ku", "mu"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            word = word[:-len(suffix)]
+            break
+    for suffix in ("kan", "an", "i"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            word = word[:-len(suffix)]
+            break
+    for _ in range(2):
+        stripped = _strip_prefix(word)
+        if stripped == word:
+            break
+        word = stripped
+    return word
+
+
+def tokenize(value: str) -> list[str]:
+    """Lowercase, buang aksen, pecah jadi token, buang stopword, stem."""
+    if not value:
+        return []
+    value = unicodedata.normalize("NFKD", value.lower())
+    value = value.encode("ascii", "ignore").decode("ascii")
+    return [stem(tok) for tok in TOKEN_RE.findall(value) if tok not in STOPWORDS]
+
+
+# =========================
+# BUILD DARI DATABASE
+# =========================
+
+SQL_SUMBER = {
+    "dokumen_chunk": """
+        SELECT c.id, c.sop_id, c.halaman, c.bagian, c.isi_chunk AS isi,
+               s.sasaran_layanan AS segmen
+        FROM dokumen_chunk c
+        LEFT JOIN sop s ON s.id = c.sop_id
+        ORDER BY c.id
+    """,
+    "faq": """
+        SELECT id, NULL AS sop_id, NULL AS halaman, kategori AS bagian,
+               CONCAT(pertanyaan, '\n', jawaban) AS isi,
+               segmen_pengguna AS segmen
+        FROM faq
+        ORDER BY id
+    """,
+    "sop_komponen": """
+        SELECT k.id, k.sop_id, k.halaman, k.jenis AS bagian,
+               CONCAT(k.judul, ': ', k.isi) AS isi,
+               s.sasaran_layanan AS segmen
+        FROM sop_komponen k
+        JOIN sop s ON s.id = k.sop_id
+        ORDER BY k.id
+    """,
+}
+
+
+def fetch_documents(conn):
+    """Semua dokumen yang di-index: dict sumber, id, sop_id, halaman, bagian, isi, segmen."""
+    for sumber in SUMBER:
+        for row in conn.execute(text(SQL_SUMBER[sumber])).mappings():
+            yield {"sumber": sumber, **row}
+
+
+def pack_strings(values: list) -> tuple[np.ndarray, np.ndarray]:
+    encoded = [(v or "").encode("utf-8") for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(e) for e in encoded])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def unpack_strings(blob: np.ndarray, offsets: np.ndarray) -> list[str]:
+    raw = blob.tobytes()
+    return [raw[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+
+
+def build_index(documents) -> dict:
+    """Bangun array index (siap disimpan dengan save_index) dari dokumen."""
+    vocab = {}
+    postings = []  # per term: list (doc, tf)
+    meta = {"sumber": [], "ref_id": [], "sop_id": [], "halaman": [], "bagian": [], "isi": [], "segmen": []}
+    doc_len = []
+
+    for doc_id, doc in enumerate(documents):
+        tokens = tokenize(f"{doc.get('bagian') or ''} {doc['isi'] or ''}")
+        counts = {}
+        for tok in tokens:
+            counts[tok] = counts.get(tok, 0) + 1
+        for tok, tf in counts.items():
+            term_id = vocab.setdefault(tok, len(vocab))
+            if term_id == len(postings):
+                postings.append([])
+            postings[term_id].append((doc_id, min(tf, 65535)))
+
+        doc_len.append(len(tokens))
+        meta["sumber"].append(SUMBER.index(doc["sumber"]))
+        meta["ref_id"].append(doc["id"])
+        meta["sop_id"].append(-1 if doc.get("sop_id") is None else doc["sop_id"])
+        meta["halaman"].append(-1 if doc.get("halaman") is None else doc["halaman"])
+        meta["bagian"].append(doc.get("bagian"))
+        meta["isi"].append(doc["isi"])
+        meta["segmen"].append(doc.get("segmen"))
+
+    offsets = np.zeros(len(postings) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(p) for p in postings])
+    docs = np.fromiter((d for p in postings for d, _ in p), dtype=np.int64, count=offsets[-1])
+    tf = np.fromiter((t for p in postings for _, t in p), dtype=np.uint16, count=offsets[-1])
+
+    # delta per term: doc id posting selalu naik, selisihnya kecil & mudah dikompres.
+    # Posting pertama tiap term tetap absolut.
+    delta = docs.copy()
+    delta[1:] -= docs[:-1]
+    delta[offsets[:-1]] = docs[offsets[:-1]]
+
+    vocab_blob = "\n".join(vocab).encode("utf-8")
+    bagian_blob, bagian_off = pack_strings(meta["bagian"])
+    isi_blob, isi_off = pack_strings(meta["isi"])
+    segmen_blob, segmen_off = pack_strings(meta["segmen"])
+    return {
+        "version": np.array([FORMAT_VERSION], dtype=np.int32),
+        "vocab": np.frombuffer(vocab_blob, dtype=np.uint8),
+        "offsets": offsets,
+        "doc_delta": delta.astype(np.uint32),
+        "tf": tf,
+        "doc_len": np.array(doc_len, dtype=np.uint32),
+        "sumber": np.array(meta["sumber"], dtype=np.uint8),
+        "ref_id": np.array(meta["ref_id"], dtype=np.int32),
+        "sop_id": np.array(meta["sop_id"], dtype=np.int32),
+        "halaman": np.array(meta["halaman"], dtype=np.int32),
+        "bagian_blob": bagian_blob,
+        "bagian_off": bagian_off,
+        "isi_blob": isi_blob,
+        "isi_off": isi_off,
+        "segmen_blob": segmen_blob,
+        "segmen_off": segmen_off,
+    }
+
+
+def segmen_mask(segmen: np.ndarray, is_faq: np.ndarray,
+                segmen_pengguna: str | None = None, sasaran_layanan: str | None = None) -> np.ndarray:
+    """
+    True = dokumen lolos filter. segmen_pengguna hanya menyaring faq,
+    sasaran_layanan hanya menyaring dokumen ber-SOP; segmen NULL lolos semua filter.
+    """
+    mask = np.ones(len(segmen), dtype=bool)
+    if segmen_pengguna:
+        mask &= ~is_faq | np.isin(segmen, SEGMEN_SEMUA + (segmen_pengguna,))
+    if sasaran_layanan:
+        mask &= is_faq | np.isin(segmen, SASARAN_SEMUA + (sasaran_layanan,))
+    return mask
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indeks k skor positif tertinggi, urut skor turun (seri: indeks kecil dulu)."""
+    candidates = np.flatnonzero(scores > 0)
+    if len(candidates) > k:
+        candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+    return candidates[np.lexsort((candidates, -scores[candidates]))]
+
+
+def index_path() -> str:
+    path = settings.BM25_INDEX_PATH
+    return path if os.path.isabs(path) else os.path.join(API_DIR, path)
+
+
+def save_index(arrays: dict, path: str | None = None):
+    path = path or index_path()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez_compressed(tmp, **arrays)
+    os.replace(tmp, path)  # atomik: pembaca tidak pernah melihat file setengah jadi
+
+
+# =========================
+# PENCARIAN
+# =========================
+
+class BM25Index:
+    """Index yang sudah dimuat ke memori. Bobot BM25 per posting dihitung sekali saat load."""
+
+    def __init__(self, arrays):
+        if int(arrays["version"][0]) != FORMAT_VERSION:
+            raise ValueError("Versi file index BM25 tidak cocok, build ulang index")
+
+        vocab_raw = arrays["vocab"].tobytes().decode("utf-8")
+        self.vocab = {term: i for i, term in enumerate(vocab_raw.split("\n"))} if vocab_raw else {}
+        self.offsets = arrays["offsets"]
+
+        # decode delta → doc id absolut: cumsum global dikurangi cumsum sebelum awal term
+        lengths = np.diff(self.offsets)
+        cum = np.cumsum(arrays["doc_delta"].astype(np.int64))
+        before = np.concatenate([[0], cum])[self.offsets[:-1]]
+        self.docs = (cum - np.repeat(before, lengths)).astype(np.int32)
+
+        doc_len = arrays["doc_len"].astype(np.float32)
+        self.n_docs = len(doc_len)
+        avgdl = float(doc_len.mean()) if self.n_docs else 0.0
+        df = np.diff(self.offsets).astype(np.float32)
+        idf = np.log1p((self.n_docs - df + 0.5) / (df + 0.5))
+        tf = arrays["tf"].astype(np.float32)
+        norm = K1 * (1 - B + B * doc_len[self.docs] / max(avgdl, 1e-9))
+        self.weights = (np.repeat(idf, lengths) * tf * (K1 + 1) / (tf + norm)).astype(np.float32)
+
+        self.sumber = arrays["sumber"]
+        self.ref_id = arrays["ref_id"]
+        self.sop_id = arrays["sop_id"]
+        self.halaman = arrays["halaman"]
+        self.bagian = unpack_strings(arrays["bagian_blob"], arrays["bagian_off"])
+        self.isi = unpack_strings(arrays["isi_blob"], arrays["isi_off"])
+        self.segmen = np.array(unpack_strings(arrays["segmen_blob"], arrays["segmen_off"]))
+        self.position = {(SUMBER[s], int(i)): doc for doc, (s, i) in enumerate(zip(self.sumber, self.ref_id))}
+        self.mtime = None  # diisi saat dimuat lewat get_*index, ikut jadi kunci cache
+
+    @classmethod
+    def load(cls, path: str | None = None) -> "BM25Index":
+        with np.load(path or index_path()) as data:
+            return cls({key: data[key] for key in data.files})
+
+    def scores(self, query: str) -> np.ndarray:
+        """Skor BM25 semua dokumen untuk query (float32, panjang n_docs)."""
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        for term in set(tokenize(query)):
+            term_id = self.vocab.get(term)
+            if term_id is None:
+                continue
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            scores[self.docs[start:end]] += self.weights[start:end]
+        return scores
+
+    def hit_key(self, doc: int) -> tuple[str, int]:
+        return SUMBER[self.sumber[doc]], int(self.ref_id[doc])
+
+    def hit(self, doc: int, score: float) -> dict:
+        return {
+            "sumber": SUMBER[self.sumber[doc]],
+            "id": int(self.ref_id[doc]),
+            "sop_id": None if self.sop_id[doc] < 0 else int(self.sop_id[doc]),
+            "halaman": None if self.halaman[doc] < 0 else int(self.halaman[doc]),
+            "bagian": self.bagian[doc] or None,
+            "skor": round(float(score), 4),
+            "isi": self.isi[doc],
+        }
+
+    def mask(self, sumber: str | None = None, segmen_pengguna: str | None = None,
+             sasaran_layanan: str | None = None) -> np.ndarray:
+        mask = segmen_mask(self.segmen, self.sumber == SUMBER.index("faq"),
+                           segmen_pengguna, sasaran_layanan)
+        if sumber is not None:
+            mask &= self.sumber == SUMBER.index(sumber)
+        return mask
+
+    def search(self, query: str, k: int = 10, sumber: str | None = None,
+               segmen_pengguna: str | None = None, sasaran_layanan: str | None = None) -> list[dict]:
+        scores = self.scores(query)
+        scores[~self.mask(sumber, segmen_pengguna, sasaran_layanan)] = 0
+        return [self.hit(doc, scores[doc]) for doc in top_k(scores, k)]
+
+
+_index = None
+_index_mtime = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> BM25Index | None:
+    """Index dari disk (dimuat ulang otomatis kalau file di-build ulang). None kalau belum ada."""
+    global _index, _index_mtime
+    path = index_path()
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    if _index is None or mtime != _index_mtime:
+        with _index_lock:
+            if _index is None or mtime != _index_mtime:
+                _index = BM25Index.load(path)
+                _index_mtime = mtime
+                _index.mtime = mtime
+    return _index
+
+
+def rebuild(conn, path: str | None = None) -> int:
+    """Build index dari DB dan simpan ke disk. Return jumlah dokumen."""
+    arrays = build_index(fetch_documents(conn))
+    save_index(arrays, path)
+    return len(arrays["doc_len"])
+
+
+if __name__ == "__main__":
+    from .database import engine
+
+    parser = argparse.ArgumentParser(description="Index BM25 dokumen_chunk, faq & sop_komponen.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_build = sub.add_parser("build", help="Build index dari database")
+    p_build.add_argument("--output", default=None, help="Path file index (default: BM25_INDEX_PATH)")
+    p_search = sub.add_parser("search", help="Cari di index")
+    p_search.add_argument("query")
+    p_search.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.cmd == "build":
+        with engine.connect() as conn:
+            n = rebuild(conn, args.output)
+        print(f"Index BM25 ditulis: {args.output or index_path()} ({n} dokumen)")
+    else:
+        index = get_index()
+        if index is None:
+            raise SystemExit("Index belum ada, jalankan: python -m app.bm25 build")
+        for hit in index.search(args.query, args.k):
+            print(f"[{hit['skor']:.3f}] {hit['sumber']}#{hit['id']} sop={hit['sop_id']} "
+                  f"hal={hit['halaman']} {hit['bagian']}: {hit['isi'][:100]}")
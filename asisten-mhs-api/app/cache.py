@@ -0,0 +1,81 @@
+"""
+Cache in-memory LRU + TTL (thread-safe) untuk hasil query yang sering
+berulang. Kunci query dinormalisasi dengan normalize_query supaya variasi
+huruf besar, tanda baca dan spasi tetap kena cache yang sama.
+"""
+
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_query(value: str) -> str:
+    value = unicodedata.normalize("NFKD", (value or "").lower())
+    value = value.encode("ascii", "ignore").decode("ascii")
+    return _NON_ALNUM.sub(" ", value).strip()
+
+
+class TTLCache:
+    """
+    LRU dengan batas umur entri. Entri kedaluwarsa dibuang saat dibaca;
+    entri paling lama tidak dipakai dibuang saat cache penuh.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] <= now:
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_set(self, key, factory):
+        """Nilai dari cache, atau factory() yang lalu disimpan."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            self.set(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
+
+
+_MISSING = object()
@@ -0,0 +1,114 @@
+"""
+Cache katalog layanan (services) di memori proses.
+
+Katalog hampir tidak pernah berubah, jadi hasil query + serialisasi JSON
+disimpan sebagai bytes siap kirim beserta ETag-nya. create_service memanggil
+invalidate() (versi naik → dimuat ulang pada request berikutnya); TTL tetap
+dipasang karena worker uvicorn lain tidak ikut ter-invalidate.
+
+Sekalian disimpan peta id → sla_days semua layanan (termasuk yang tidak
+aktif) untuk pembuatan tiket tanpa query ke tabel services.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+
+from sqlalchemy import select
+
+from . import models, schemas
+from .config import settings
+
+MAX_VARIANTS = 256  # kombinasi offset/limit/fields yang disimpan per versi
+RELOAD_ON_MISS_AFTER = 5.0  # detik; id tak dikenal memicu muat ulang paling sering segini
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
+
+
+def dump_json(value) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class ServiceCatalog:
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self._loaded_version = -1
+        self._expires_at = 0.0
+        self._items = []
+        self._sla = {}  # id layanan -> sla_days
+        self._loaded_at = 0.0
+        self._variants = {}  # (offset, limit, fields) -> (body, etag)
+        self._lock = asyncio.Lock()
+
+    def invalidate(self):
+        self.version += 1
+
+    def _fresh(self) -> bool:
+        return self._loaded_version == self.version and time.monotonic() < self._expires_at
+
+    async def _load(self, db):
+        version = self.version
+        # urutan tetap (id) supaya offset/limit & ETag sama di semua worker/reload
+        services = (await db.execute(select(models.Service).order_by(models.Service.id))).scalars().all()
+        self._items = [
+            schemas.ServiceOut.model_validate(svc).model_dump(mode="json")
+            for svc in services
+            if svc.is_active
+        ]
+        self._sla = {svc.id: svc.sla_days or 0 for svc in services}
+        self._variants = {}
+        self._loaded_version = version
+        self._loaded_at = time.monotonic()
+        self._expires_at = self._loaded_at + self.ttl
+
+    async def _ensure(self, db, force: bool = False):
+        if not force and self._fresh():
+            self.hits += 1
+            return
+        async with self._lock:
+            if force or not self._fresh():
+                self.misses += 1
+                await self._load(db)
+
+    async def service_sla(self, db, service_ids) -> dict[str, int]:
+        """{id: sla_days} untuk id yang ada; id yang tidak ada tidak ikut."""
+        await self._ensure(db)
+        if any(i not in self._sla for i in service_ids) \
+                and time.monotonic() - self._loaded_at >= RELOAD_ON_MISS_AFTER:
+            await self._ensure(db, force=True)  # mungkin dibuat di worker lain
+        return {i: self._sla[i] for i in service_ids if i in self._sla}
+
+    async def get(self, db, offset: int = 0, limit: int | None = None,
+                  fields: tuple[str, ...] | None = None) -> tuple[bytes, str]:
+        """(body JSON, ETag) katalog aktif; DB hanya disentuh kalau cache basi."""
+        await self._ensure(db)
+
+        key = (offset, limit, fields)
+        cached = self._variants.get(key)
+        if cached is None:
+            items = self._items[offset:None if limit is None else offset + limit]
+            if fields:
+                items = [{f: item[f] for f in fields} for item in items]
+            body = dump_json(items)
+            cached = (body, make_etag(body))
+            if len(self._variants) < MAX_VARIANTS:
+                self._variants[key] = cached
+        return cached
+
+
+service_catalog = ServiceCatalog(settings.CATALOG_TTL)
@@ -6,8 +6,26 @@ class Settings(BaseSettings):
     DB_NAME: str = "asisten_mhs"
     DB_USER: str = "root"
     DB_PASS: str = "root"  # ganti dengan password MySQL kamu
+    DB_URL: str = ""  # jika diisi, menggantikan DB_* (mis. sqlite:///bench.db untuk load test)
+    DB_POOL_SIZE: int = 10        # koneksi yang selalu dibuka per proses
+    DB_MAX_OVERFLOW: int = 20     # koneksi tambahan saat puncak
+    DB_POOL_TIMEOUT: int = 10     # detik menunggu koneksi kosong
+    DB_POOL_RECYCLE: int = 1800   # detik, di bawah wait_timeout MySQL
     JWT_SECRET: str = "supersecret"
     JWT_ALG: str = "HS256"
+    BM25_INDEX_PATH: str = "data/bm25_index.npz"  # relatif ke folder asisten-mhs-api
+    VECTOR_DIR: str = "data/vectors"
+    EMBEDDING_MODEL: str = "hashing"  # atau "sentence-transformers:<nama model>"
+    VECTOR_NPROBE: int = 8
+    HYBRID_BOBOT_VEKTOR: float = 0.5
+    SEARCH_CACHE_SIZE: int = 2048
+    SEARCH_CACHE_TTL: int = 300  # detik
+    CATALOG_TTL: int = 600  # detik, batas basi katalog layanan antar worker
+    SCHEDULE_CACHE_SIZE: int = 20000  # jadwal mingguan (mahasiswa, term)
+    SCHEDULE_CACHE_TTL: int = 900
+    KALENDER_TTL: int = 3600  # detik, cache hari libur kalender_akademik
+    SLOW_REQUEST_MS: int = 1000  # request selambat ini dicatat ke log; 0 = mati
+    SLOW_REQUEST_SAMPLE: float = 1.0  # porsi request lambat yang dicatat (0..1)
 
     class Config:
         env_file = ".env"
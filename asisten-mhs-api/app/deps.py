@@ -0,0 +1,6 @@
+from typing import Optional
+from fastapi import Header
+
+def get_actor(x_actor: Optional[str] = Header(None, max_length=120)) -> str:
+    """Pelaku perubahan untuk ticket_logs (sementara dari header, sampai auth JWT dipasang)."""
+    return x_actor or "staff"
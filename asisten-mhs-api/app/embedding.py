@@ -0,0 +1,93 @@
+"""
+Model embedding lokal (CPU) untuk chunk dokumen & query.
+
+EMBEDDING_MODEL di config:
+- "hashing"                     : default, tanpa dependensi tambahan.
+                                  Feature hashing token (stem) + bigram,
+                                  bobot log-tf, dinormalisasi L2.
+- "sentence-transformers:<nama>": pakai paket sentence-transformers
+                                  (opsional), dipaksa jalan di CPU.
+
+Semua embedder mengembalikan float32 (n, dim) yang sudah dinormalisasi,
+jadi dot product = cosine similarity. `key` dipakai sebagai nama folder
+store vektor, supaya vektor dari model berbeda tidak tercampur.
+"""
+
+import hashlib
+import zlib
+from functools import lru_cache
+
+import numpy as np
+
+from .bm25 import tokenize
+
+HASHING_DIM = 512
+
+
+def content_hash(value: str) -> str:
+    """Kunci cache embedding: sha1 isi chunk."""
+    return hashlib.sha1((value or "").encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize=200_000)
+def _feature(token: str) -> tuple[int, float]:
+    h = zlib.crc32(token.encode("utf-8"))
+    return h % HASHING_DIM, (1.0 if (h >> 31) & 1 else -1.0)
+
+
+class HashingEmbedder:
+    """Embedding leksikal murah: cukup untuk CPU tanpa model neural."""
+
+    def __init__(self, dim: int = HASHING_DIM):
+        if dim != HASHING_DIM:
+            raise ValueError(f"HashingEmbedder hanya mendukung dim={HASHING_DIM}")
+        self.dim = dim
+        self.key = f"hashing-{dim}-v1"
+
+    def encode(self, texts: list[str], batch_size: int = 64) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, value in enumerate(texts):
+            tokens = tokenize(value)
+            counts = {}
+            for feat in tokens + [f"{a}_{b}" for a, b in zip(tokens, tokens[1:])]:
+                counts[feat] = counts.get(feat, 0) + 1
+            for feat, tf in counts.items():
+                col, sign = _feature(feat)
+                out[row, col] += sign * (1.0 + np.log(tf))
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        np.divide(out, norms, out=out, where=norms > 0)
+        return out
+
+
+class SentenceTransformerEmbedder:
+    def __init__(self, name: str):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise RuntimeError(
+                "EMBEDDING_MODEL memakai sentence-transformers, "
+                "install dulu: pip install sentence-transformers"
+            ) from e
+        self.model = SentenceTransformer(name, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.key = "st-" + name.replace("/", "__")
+
+    def encode(self, texts: list[str], batch_size: int = 64) -> np.ndarray:
+        vectors = self.model.encode(
+            texts,
+            batch_size=batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+        return np.asarray(vectors, dtype=np.float32)
+
+
+@lru_cache(maxsize=4)
+def get_embedder(spec: str):
+    """Buat embedder dari string EMBEDDING_MODEL (di-cache per proses)."""
+    if spec == "hashing":
+        return HashingEmbedder()
+    if spec.startswith("sentence-transformers:"):
+        return SentenceTransformerEmbedder(spec.split(":", 1)[1])
+    raise ValueError(f"EMBEDDING_MODEL tidak dikenal: {spec!r}")
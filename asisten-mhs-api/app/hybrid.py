@@ -0,0 +1,101 @@
+"""
+Pencarian hybrid: gabungan skor BM25 (bm25.py) dan vektor (vector_index.py)
+di atas dokumen_chunk, faq dan sop_komponen, di belakang cache LRU+TTL.
+
+Skor tiap modalitas dinormalisasi terhadap skor tertinggi kandidat, lalu:
+    skor = bobot_vektor * vektor + (1 - bobot_vektor) * leksikal
+Kandidat diambil dari top-N kedua modalitas, lalu skor modalitas yang
+belum ada dihitung persis untuk seluruh kandidat. faq & sop_komponen tidak
+ada di index vektor, jadi skornya memakai skor leksikal saja.
+"""
+
+import numpy as np
+
+from .bm25 import get_index, top_k
+from .cache import TTLCache, normalize_query
+from .config import settings
+from .vector_index import get_vector_index
+
+CANDIDATE_FACTOR = 4
+
+search_cache = TTLCache(settings.SEARCH_CACHE_SIZE, settings.SEARCH_CACHE_TTL)
+
+
+def hybrid_search(lex, vec, query: str, k: int = 10, bobot_vektor: float = 0.5,
+                  segmen_pengguna: str | None = None, sasaran_layanan: str | None = None) -> list[dict]:
+    """lex/vec boleh None (index belum di-build): pakai modalitas yang ada saja."""
+    n_candidates = k * CANDIDATE_FACTOR
+    lexical = {}  # (sumber, id) -> skor BM25
+    vector = {}   # (sumber, id) -> cosine
+
+    if lex is not None:
+        lex_scores = lex.scores(query)
+        lex_scores[~lex.mask(None, segmen_pengguna, sasaran_layanan)] = 0
+        for doc in top_k(lex_scores, n_candidates):
+            lexical[lex.hit_key(doc)] = float(lex_scores[doc])
+
+    if vec is not None:
+        query_vec = vec.encode(query)
+        mask = vec.mask(sasaran_layanan) if sasaran_layanan else None
+        entries, scores = vec.search_vector(query_vec, n_candidates, mask=mask)
+        for entry, score in zip(entries, scores):
+            vector[("dokumen_chunk", int(vec.chunk_id[entry]))] = float(score)
+
+        # chunk dari kandidat leksikal yang tidak ikut top-N vektor
+        missing = [vec.position[key[1]] for key in lexical
+                   if key[0] == "dokumen_chunk" and key not in vector and key[1] in vec.position]
+        if missing:
+            exact = vec.exact_scores(query_vec, np.array(missing))
+            for entry, score in zip(missing, exact):
+                vector[("dokumen_chunk", int(vec.chunk_id[entry]))] = max(float(score), 0.0)
+
+    if lex is not None:
+        for key in vector:
+            if key not in lexical and key in lex.position:
+                lexical[key] = float(lex_scores[lex.position[key]])
+
+    lex_max = max(lexical.values(), default=0.0) or 1.0
+    vec_max = max(vector.values(), default=0.0) or 1.0
+    fused = []
+    for key in lexical.keys() | vector.keys():
+        lex_norm = lexical.get(key, 0.0) / lex_max
+        if vec is None or key[0] != "dokumen_chunk":
+            score = lex_norm
+        elif lex is None:
+            score = vector.get(key, 0.0) / vec_max
+        else:
+            score = bobot_vektor * vector.get(key, 0.0) / vec_max + (1 - bobot_vektor) * lex_norm
+        if score > 0:
+            fused.append((-score, key))
+    fused.sort()
+
+    hits = []
+    for neg_score, key in fused[:k]:
+        if lex is not None and key in lex.position:
+            hit = lex.hit(lex.position[key], 0.0)
+        else:
+            hit = vec.hit(vec.position[key[1]], 0.0)
+        hit["skor"] = round(-neg_score, 4)
+        hit["skor_leksikal"] = round(lexical[key], 4) if key in lexical else None
+        hit["skor_vektor"] = round(vector[key], 4) if key in vector else None
+        hits.append(hit)
+    return hits
+
+
+def search(query: str, k: int = 10, bobot_vektor: float | None = None,
+           segmen_pengguna: str | None = None, sasaran_layanan: str | None = None) -> list[dict] | None:
+    """Pencarian hybrid ber-cache. None kalau belum ada index sama sekali."""
+    lex, vec = get_index(), get_vector_index()
+    if lex is None and vec is None:
+        return None
+    normalized = normalize_query(query)
+    if not normalized:
+        return []
+    if bobot_vektor is None:
+        bobot_vektor = settings.HYBRID_BOBOT_VEKTOR
+    key = (normalized, k, bobot_vektor, segmen_pengguna, sasaran_layanan,
+           lex and lex.mtime, vec and vec.mtime)
+    return search_cache.get_or_set(
+        key,
+        lambda: hybrid_search(lex, vec, normalized, k, bobot_vektor, segmen_pengguna, sasaran_layanan),
+    )
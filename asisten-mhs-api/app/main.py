@@ -1,20 +1,49 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .routers import services, tickets
+from fastapi.responses import PlainTextResponse
+from . import metrics
+from .catalog import service_catalog
+from .database import async_engine, engine
+from .hybrid import search_cache
+from .pagination import NEXT_CURSOR_HEADER
+from .routers import akademik, services, tickets, search, export
 
-app = FastAPI(title="Asisten Mahasiswa API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await async_engine.dispose()
 
+app = FastAPI(title="Asisten Mahasiswa API", version="1.0.0", lifespan=lifespan)
+
+app.add_middleware(metrics.MetricsMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", NEXT_CURSOR_HEADER],
 )
 
+app.include_router(akademik.router)
 app.include_router(services.router)
 app.include_router(tickets.router)
+app.include_router(search.router)
+app.include_router(export.router)
 
 @app.get("/v1/util/healthz")
 def healthz():
     return {"ok": True}
+
+@app.get("/v1/util/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    body = metrics.render(
+        pools={"async": async_engine.sync_engine.pool, "sync": engine.pool},
+        caches={
+            "catalog": service_catalog,
+            "search": search_cache,
+            "schedule": akademik.schedule_cache,
+        },
+    )
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
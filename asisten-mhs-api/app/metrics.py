@@ -0,0 +1,243 @@
+"""
+Metrik performa per proses, diekspor dalam format teks Prometheus di
+/v1/util/metrics:
+
+- latensi request per route (histogram, label template route, bukan path asli)
+- jumlah & waktu query DB per route (event before/after_cursor_execute)
+- lama menunggu koneksi dari pool (subclass pool, override _do_get)
+- hit/miss cache (objek dengan atribut hits & misses)
+
+Request yang lebih lambat dari SLOW_REQUEST_MS dicatat (sebagian, sesuai
+SLOW_REQUEST_SAMPLE) ke logger "asisten_mhs.slow". Dengan beberapa worker
+uvicorn, tiap worker punya metriknya sendiri.
+"""
+
+import contextvars
+import logging
+import random
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from .config import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+slow_log = logging.getLogger("asisten_mhs.slow")
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # slot terakhir: +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        i = 0
+        while i < len(self.buckets) and value > self.buckets[i]:
+            i += 1
+        self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name: str, labels: str) -> list[str]:
+        sep = "," if labels else ""
+        out, cumulative = [], 0
+        for le, n in zip((*map(str, self.buckets), "+Inf"), self.counts):
+            cumulative += n
+            out.append(f'{name}_bucket{{{labels}{sep}le="{le}"}} {cumulative}')
+        suffix = f"{{{labels}}}" if labels else ""
+        out.append(f"{name}_sum{suffix} {self.sum:.6f}")
+        out.append(f"{name}_count{suffix} {self.count}")
+        return out
+
+
+class RequestStats:
+    __slots__ = ("db_queries", "db_seconds", "pool_wait")
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.pool_wait = 0.0
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latency = {}     # (method, route, status) -> Histogram
+        self.db_queries = {}  # (method, route) -> [jumlah query, detik]
+        self.pool_wait = Histogram(POOL_WAIT_BUCKETS)
+        self.outside_queries = [0, 0.0]  # query di luar request (CLI, startup)
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float, stats: RequestStats):
+        with self.lock:
+            hist = self.latency.get((method, route, status))
+            if hist is None:
+                hist = self.latency[(method, route, status)] = Histogram(LATENCY_BUCKETS)
+            hist.observe(seconds)
+            db = self.db_queries.setdefault((method, route), [0, 0.0])
+            db[0] += stats.db_queries
+            db[1] += stats.db_seconds
+
+    def observe_pool_wait(self, seconds: float):
+        with self.lock:
+            self.pool_wait.observe(seconds)
+
+
+registry = Registry()
+_current = contextvars.ContextVar("request_stats", default=None)
+
+
+# --- DB ------------------------------------------------------------------
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.db_queries += 1
+        stats.db_seconds += elapsed
+    else:
+        with registry.lock:
+            registry.outside_queries[0] += 1
+            registry.outside_queries[1] += elapsed
+
+
+def instrument_engine(engine):
+    """Pasang hitung query pada Engine sync (untuk AsyncEngine: .sync_engine)."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _record_checkout(started: float):
+    elapsed = time.perf_counter() - started
+    registry.observe_pool_wait(elapsed)
+    stats = _current.get()
+    if stats is not None:
+        stats.pool_wait += elapsed
+
+
+class TimedQueuePool(QueuePool):
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            _record_checkout(started)
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            _record_checkout(started)
+
+
+# --- HTTP ----------------------------------------------------------------
+
+class MetricsMiddleware:
+    """Middleware ASGI murni (tanpa BaseHTTPMiddleware) supaya overhead kecil."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current.reset(token)
+            route = getattr(scope.get("route"), "path", None) or "<unmatched>"
+            registry.observe_request(scope["method"], route, status, elapsed, stats)
+            if (
+                settings.SLOW_REQUEST_MS
+                and elapsed * 1000 >= settings.SLOW_REQUEST_MS
+                and random.random() < settings.SLOW_REQUEST_SAMPLE
+            ):
+                query = scope.get("query_string", b"").decode("latin-1")
+                slow_log.warning(
+                    "slow request %s %s%s status=%s %.1fms db_queries=%d db=%.1fms pool_wait=%.1fms",
+                    scope["method"], scope["path"], f"?{query}" if query else "", status,
+                    elapsed * 1000, stats.db_queries, stats.db_seconds * 1000, stats.pool_wait * 1000,
+                )
+
+
+# --- Ekspor --------------------------------------------------------------
+
+def _label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render(pools: dict, caches: dict) -> str:
+    """Teks Prometheus. pools: nama -> Pool, caches: nama -> objek ber-hits/misses."""
+    lines = []
+    with registry.lock:
+        lines += [
+            "# HELP http_request_duration_seconds Latensi request per route.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route, status), hist in sorted(registry.latency.items()):
+            labels = f'method="{method}",route="{_label(route)}",status="{status}"'
+            lines += hist.lines("http_request_duration_seconds", labels)
+
+        lines += [
+            "# HELP http_request_db_queries_total Query DB yang dijalankan selama request.",
+            "# TYPE http_request_db_queries_total counter",
+        ]
+        for (method, route), (count, _) in sorted(registry.db_queries.items()):
+            lines.append(f'http_request_db_queries_total{{method="{method}",route="{_label(route)}"}} {count}')
+        lines += [
+            "# HELP http_request_db_seconds_total Waktu query DB selama request.",
+            "# TYPE http_request_db_seconds_total counter",
+        ]
+        for (method, route), (_, seconds) in sorted(registry.db_queries.items()):
+            lines.append(f'http_request_db_seconds_total{{method="{method}",route="{_label(route)}"}} {seconds:.6f}')
+        lines += [
+            "# HELP db_queries_outside_request_total Query DB di luar request HTTP.",
+            "# TYPE db_queries_outside_request_total counter",
+            f"db_queries_outside_request_total {registry.outside_queries[0]}",
+            "# HELP db_pool_checkout_wait_seconds Lama menunggu koneksi dari pool.",
+            "# TYPE db_pool_checkout_wait_seconds histogram",
+        ]
+        lines += registry.pool_wait.lines("db_pool_checkout_wait_seconds", "")
+
+    lines += ["# HELP db_pool_connections Koneksi pool per status.", "# TYPE db_pool_connections gauge"]
+    for name, pool in pools.items():
+        for state, value in (("checked_out", pool.checkedout()), ("idle", pool.checkedin()), ("overflow", max(pool.overflow(), 0))):
+            lines.append(f'db_pool_connections{{pool="{name}",state="{state}"}} {value}')
+
+    lines += [
+        "# HELP cache_requests_total Akses cache per hasil.",
+        "# TYPE cache_requests_total counter",
+    ]
+    for name, cache in caches.items():
+        lines.append(f'cache_requests_total{{cache="{name}",result="hit"}} {cache.hits}')
+        lines.append(f'cache_requests_total{{cache="{name}",result="miss"}} {cache.misses}')
+    lines += ["# HELP cache_hit_ratio Rasio hit cache sejak proses mulai.", "# TYPE cache_hit_ratio gauge"]
+    for name, cache in caches.items():
+        total = cache.hits + cache.misses
+        lines.append(f'cache_hit_ratio{{cache="{name}"}} {cache.hits / total if total else 0.0:.6f}')
+    return "\n".join(lines) + "\n"
@@ -1,11 +1,15 @@
 import uuid
+from datetime import datetime
 from sqlalchemy import (
-    Column, String, Integer, Boolean, Date, Time, ForeignKey, JSON, text
+    Column, String, Integer, Boolean, Date, DateTime, Time, ForeignKey, Index, JSON, Text, text
 )
-from sqlalchemy.dialects.mysql import CHAR
+from sqlalchemy.dialects.mysql import CHAR, DATETIME
 from sqlalchemy.orm import relationship
 from .database import Base
 
+# presisi mikrodetik di MySQL supaya cursor keyset (created_at, id) tidak ambigu
+Timestamp = DateTime().with_variant(DATETIME(fsp=6), "mysql")
+
 class Student(Base):
     __tablename__ = "students"
     npm = Column(String(20), primary_key=True)
@@ -30,6 +34,12 @@ class Course(Base):
 
 class Class(Base):
     __tablename__ = "classes"
+    __table_args__ = (
+        # filter /classes: term (+ hari / dosen), urut jam mulai (keyset)
+        Index("idx_classes_term_day_start", "term_code", "day", "start_time", "id"),
+        Index("idx_classes_term_start", "term_code", "start_time", "id"),
+        Index("idx_classes_lecturer_term", "lecturer_id", "term_code", "start_time"),
+    )
     id = Column(CHAR(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     course_id = Column(CHAR(36), ForeignKey("courses.id"))
     lecturer_id = Column(CHAR(36), ForeignKey("lecturers.id"))
@@ -42,6 +52,49 @@ class Class(Base):
     course = relationship("Course")
     lecturer = relationship("Lecturer")
 
+class Enrollment(Base):
+    __tablename__ = "enrollments"
+    student_npm = Column(String(20), ForeignKey("students.npm"), primary_key=True)
+    class_id = Column(CHAR(36), ForeignKey("classes.id"), primary_key=True)
+
+    class_ = relationship("Class")
+
+class Exam(Base):
+    __tablename__ = "exams"
+    __table_args__ = (
+        Index("idx_exams_term_date", "term_code", "date", "start_time", "id"),
+        Index("idx_exams_course_term", "course_id", "term_code"),
+    )
+    id = Column(CHAR(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    course_id = Column(CHAR(36), ForeignKey("courses.id"), nullable=False)
+    class_id = Column(CHAR(36), ForeignKey("classes.id"))
+    type = Column(String(3), nullable=False)  # UTS / UAS
+    date = Column(Date, nullable=False)
+    start_time = Column(Time, nullable=False)
+    end_time = Column(Time, nullable=False)
+    room = Column(String(60))
+    term_code = Column(String(20), nullable=False)
+
+    course = relationship("Course")
+
+class Event(Base):
+    __tablename__ = "events"
+    __table_args__ = (
+        Index("idx_events_date_id", "date", "id"),
+        Index("idx_events_category_date", "category", "date", "id"),
+        Index("idx_events_npm_date", "related_npm", "date"),
+    )
+    id = Column(CHAR(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    category = Column(String(20), nullable=False)  # sempro/semhas/sidang/kalender
+    title = Column(String(200), nullable=False)
+    date = Column(Date, nullable=False)
+    start_time = Column(Time)
+    end_time = Column(Time)
+    location = Column(String(160))
+    organizer = Column(String(160))
+    description = Column(Text)
+    related_npm = Column(String(20))
+
 class Service(Base):
     __tablename__ = "services"
     id = Column(CHAR(36), primary_key=True, default=lambda: str(uuid.uuid4()))
@@ -55,6 +108,13 @@ class Service(Base):
 
 class Ticket(Base):
     __tablename__ = "tickets"
+    __table_args__ = (
+        # daftar tiket per mahasiswa / per status, urut terbaru (keyset)
+        Index("idx_tickets_npm_status_created", "student_npm", "status", "created_at", "id"),
+        Index("idx_tickets_npm_created", "student_npm", "created_at", "id"),
+        Index("idx_tickets_status_created", "status", "created_at", "id"),
+        Index("idx_tickets_created", "created_at", "id"),
+    )
     id = Column(CHAR(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     student_npm = Column(String(20), ForeignKey("students.npm"))
     service_id = Column(CHAR(36), ForeignKey("services.id"))
@@ -62,3 +122,19 @@ class Ticket(Base):
     attachments = Column(JSON)
     note = Column(String(255))
     due_date = Column(Date)
+    created_at = Column(Timestamp, default=datetime.now)
+    updated_at = Column(Timestamp, default=datetime.now, onupdate=datetime.now)
+
+    logs = relationship("TicketLog", order_by="TicketLog.created_at", lazy="raise")
+
+class TicketLog(Base):
+    __tablename__ = "ticket_logs"
+    __table_args__ = (
+        Index("idx_ticket_logs_ticket_created", "ticket_id", "created_at"),
+    )
+    id = Column(CHAR(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    ticket_id = Column(CHAR(36), ForeignKey("tickets.id", ondelete="CASCADE"), nullable=False)
+    actor = Column(String(120), nullable=False)  # npm/email/role
+    action = Column(String(80), nullable=False)  # status / note
+    message = Column(Text)
+    created_at = Column(Timestamp, default=datetime.now)
@@ -0,0 +1,53 @@
+"""
+Keyset pagination: cursor = nilai kolom urut baris terakhir (base64 JSON).
+Halaman berikutnya diambil dengan WHERE (a, b, ...) > cursor, jadi biaya
+tiap halaman tetap (pakai index), tidak tumbuh seperti OFFSET.
+"""
+
+import base64
+import json
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values) -> str:
+    raw = json.dumps([None if v is None else str(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types) -> tuple:
+    """Kebalikan encode_cursor; types = konverter per kolom (mis. date.fromisoformat)."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if len(values) != len(types):
+            raise ValueError
+        return tuple(conv(v) for conv, v in zip(types, values))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="cursor tidak valid")
+
+
+def after(columns, values, descending: bool = False):
+    """
+    (c1, c2, ...) > (v1, v2, ...) (atau < untuk urutan turun) dalam bentuk
+    OR/AND supaya index terpakai.
+    """
+    clauses = []
+    for i, (col, val) in enumerate(zip(columns, values)):
+        cmp = col < val if descending else col > val
+        clauses.append(and_(*[c == v for c, v in zip(columns[:i], values[:i])], cmp))
+    return or_(*clauses)
+
+
+def page(rows: list, limit: int, key, response) -> list:
+    """
+    rows diambil dengan LIMIT limit + 1: kalau lebih, potong dan pasang
+    header cursor halaman berikutnya dari key(baris terakhir).
+    """
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*key(rows[-1]))
+    return rows
@@ -0,0 +1,172 @@
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from typing import List, Literal, Optional
+from datetime import date, time, timedelta
+from ..cache import TTLCache
+from ..config import settings
+from ..database import get_db
+from ..pagination import after, decode_cursor, page
+from .. import models, schemas
+
+router = APIRouter(prefix="/v1", tags=["Akademik"])
+
+DAYS = ("Senin", "Selasa", "Rabu", "Kamis", "Jumat", "Sabtu", "Minggu")
+Day = Literal["Senin", "Selasa", "Rabu", "Kamis", "Jumat", "Sabtu", "Minggu"]
+
+# (npm, term_code | None) -> (term_code, {hari: [kelas terserialisasi, urut jam mulai]})
+schedule_cache = TTLCache(settings.SCHEDULE_CACHE_SIZE, settings.SCHEDULE_CACHE_TTL)
+
+def class_query():
+    return select(models.Class).options(
+        joinedload(models.Class.course), joinedload(models.Class.lecturer)
+    )
+
+@router.get("/courses", response_model=List[schemas.CourseOut])
+async def list_courses(
+    response: Response,
+    q: Optional[str] = Query(None, description="filter nama/kode"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    stmt = select(models.Course).order_by(models.Course.code)
+    if q:
+        pattern = f"%{q}%"
+        stmt = stmt.where(or_(models.Course.code.like(pattern), models.Course.name.like(pattern)))
+    if cursor:
+        (code,) = decode_cursor(cursor, str)
+        stmt = stmt.where(models.Course.code > code)
+    rows = (await db.execute(stmt.limit(limit + 1))).scalars().all()
+    return page(rows, limit, lambda c: (c.code,), response)
+
+@router.get("/classes", response_model=List[schemas.ClassOut])
+async def list_classes(
+    response: Response,
+    term_code: str,
+    day: Optional[Day] = None,
+    lecturer_id: Optional[str] = None,
+    course_code: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    Class = models.Class
+    stmt = class_query().where(Class.term_code == term_code)
+    if day:
+        stmt = stmt.where(Class.day == day)
+    if lecturer_id:
+        stmt = stmt.where(Class.lecturer_id == lecturer_id)
+    if course_code:
+        stmt = stmt.where(Class.course_id.in_(
+            select(models.Course.id).where(models.Course.code == course_code)
+        ))
+    if cursor:
+        stmt = stmt.where(after((Class.start_time, Class.id), decode_cursor(cursor, time.fromisoformat, str)))
+    stmt = stmt.order_by(Class.start_time, Class.id).limit(limit + 1)
+    rows = (await db.execute(stmt)).scalars().all()
+    return page(rows, limit, lambda c: (c.start_time, c.id), response)
+
+async def load_week(db: AsyncSession, npm: str, term_code: Optional[str]):
+    """Jadwal mingguan mahasiswa per hari untuk satu term (default: term terbaru di KRS)."""
+    enrolled = select(models.Enrollment.class_id).where(models.Enrollment.student_npm == npm)
+    if term_code is None:
+        term_code = (await db.execute(
+            select(func.max(models.Class.term_code)).where(models.Class.id.in_(enrolled))
+        )).scalar()
+        if term_code is None:
+            return None, {}
+    stmt = (
+        class_query()
+        .where(models.Class.id.in_(enrolled), models.Class.term_code == term_code)
+        .order_by(models.Class.start_time, models.Class.id)
+    )
+    week = {}
+    for cls in (await db.execute(stmt)).scalars().all():
+        week.setdefault(cls.day, []).append(schemas.ClassOut.model_validate(cls).model_dump())
+    return term_code, week
+
+@router.get("/schedule/{npm}", response_model=schemas.ScheduleOut)
+async def get_schedule(
+    npm: str,
+    date_: Optional[date] = Query(None, alias="date", description="default hari ini; jika tidak diisi, kembalikan minggu berjalan"),
+    term_code: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    key = (npm, term_code)
+    cached = schedule_cache.get(key)
+    if cached is None:
+        cached = await load_week(db, npm, term_code)
+        schedule_cache.set(key, cached)
+    term_code, week = cached
+
+    if date_ is not None:
+        days = [date_]
+    else:
+        today = date.today()
+        monday = today - timedelta(days=today.weekday())
+        days = [monday + timedelta(days=i) for i in range(7)]
+    items = [
+        {"date": d, "class": cls}
+        for d in days
+        for cls in week.get(DAYS[d.weekday()], ())
+    ]
+    return {"date": date_ or date.today(), "term_code": term_code, "items": items}
+
+@router.get("/exams", response_model=List[schemas.ExamOut])
+async def list_exams(
+    response: Response,
+    npm: Optional[str] = Query(None, description="jika diisi, ambil berdasarkan KRS mahasiswa"),
+    type: Optional[Literal["UTS", "UAS"]] = None,
+    term_code: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    Exam = models.Exam
+    stmt = select(Exam).options(joinedload(Exam.course))
+    if npm:
+        enrolled = select(models.Enrollment.class_id).where(models.Enrollment.student_npm == npm)
+        enrolled_courses = select(models.Class.course_id).where(models.Class.id.in_(enrolled))
+        stmt = stmt.where(or_(
+            Exam.class_id.in_(enrolled),
+            and_(Exam.class_id.is_(None), Exam.course_id.in_(enrolled_courses)),
+        ))
+    if type:
+        stmt = stmt.where(Exam.type == type)
+    if term_code:
+        stmt = stmt.where(Exam.term_code == term_code)
+    if cursor:
+        values = decode_cursor(cursor, date.fromisoformat, time.fromisoformat, str)
+        stmt = stmt.where(after((Exam.date, Exam.start_time, Exam.id), values))
+    stmt = stmt.order_by(Exam.date, Exam.start_time, Exam.id).limit(limit + 1)
+    rows = (await db.execute(stmt)).scalars().all()
+    return page(rows, limit, lambda e: (e.date, e.start_time, e.id), response)
+
+@router.get("/events", response_model=List[schemas.EventOut])
+async def list_events(
+    response: Response,
+    category: Optional[Literal["sempro", "semhas", "sidang", "kalender"]] = None,
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    npm: Optional[str] = Query(None, description="untuk event yang spesifik ke mahasiswa"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    Event = models.Event
+    stmt = select(Event)
+    if category:
+        stmt = stmt.where(Event.category == category)
+    if date_from:
+        stmt = stmt.where(Event.date >= date_from)
+    if date_to:
+        stmt = stmt.where(Event.date <= date_to)
+    if npm:
+        stmt = stmt.where(Event.related_npm == npm)
+    if cursor:
+        stmt = stmt.where(after((Event.date, Event.id), decode_cursor(cursor, date.fromisoformat, str)))
+    stmt = stmt.order_by(Event.date, Event.id).limit(limit + 1)
+    rows = (await db.execute(stmt)).scalars().all()
+    return page(rows, limit, lambda e: (e.date, e.id), response)
@@ -0,0 +1,80 @@
+"""
+Ekspor tabel knowledge base sebagai NDJSON (1 baris JSON per record) untuk
+pipeline offline (embedding, evaluasi retrieval).
+
+Baris dibaca lewat server-side cursor (stream_results) dan dikirim per
+batch, jadi memori tetap konstan berapa pun jumlah barisnya. Urutan
+(updated_at, id) + filter updated_since (>=) untuk sinkron inkremental:
+simpan updated_at terbesar yang diterima, kirim lagi di sync berikutnya.
+Baris di batas waktu itu bisa terkirim ulang, jadi sisi klien sebaiknya
+upsert berdasarkan id.
+"""
+
+import json
+from datetime import date, datetime
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import text
+
+from ..database import async_engine
+
+router = APIRouter(prefix="/v1", tags=["Export"])
+
+EXPORT_BATCH = 1000  # baris per fetch dari cursor & per potongan response
+
+TABLES = {
+    "dokumen_chunk": (
+        "id", "dokumen_id", "sop_id", "no_urut", "isi_chunk", "halaman",
+        "bagian", "embedding_id", "created_at", "updated_at",
+    ),
+    "sop_komponen": (
+        "id", "sop_id", "jenis", "judul", "isi", "halaman", "created_at", "updated_at",
+    ),
+    "faq": (
+        "id", "kategori", "segmen_pengguna", "pertanyaan", "jawaban", "created_at", "updated_at",
+    ),
+}
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} tidak bisa diserialisasi")
+
+
+def export_sql(table: str, updated_since: Optional[datetime], limit: Optional[int]) -> str:
+    sql = f"SELECT {', '.join(TABLES[table])} FROM {table}"
+    if updated_since is not None:
+        sql += " WHERE updated_at >= :since"
+    sql += " ORDER BY updated_at, id"
+    if limit is not None:
+        sql += f" LIMIT {int(limit)}"
+    return sql
+
+
+async def ndjson_rows(table: str, updated_since: Optional[datetime], limit: Optional[int]):
+    # Koneksi sendiri (bukan get_db): harus tetap hidup sampai body selesai dikirim.
+    stmt = text(export_sql(table, updated_since, limit))
+    params = {"since": updated_since} if updated_since is not None else {}
+    async with async_engine.connect() as conn:
+        result = await conn.stream(stmt.execution_options(yield_per=EXPORT_BATCH), params)
+        async for batch in result.mappings().partitions(EXPORT_BATCH):
+            yield "".join(
+                json.dumps(dict(row), ensure_ascii=False, separators=(",", ":"), default=_json_default) + "\n"
+                for row in batch
+            ).encode("utf-8")
+
+
+@router.get("/export/{table}")
+async def export_table(
+    table: Literal["dokumen_chunk", "sop_komponen", "faq"],
+    updated_since: Optional[datetime] = Query(None, description="hanya baris dengan updated_at >= nilai ini"),
+    limit: Optional[int] = Query(None, ge=1),
+):
+    return StreamingResponse(
+        ndjson_rows(table, updated_since, limit),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'inline; filename="{table}.ndjson"'},
+    )
@@ -0,0 +1,44 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import List, Literal, Optional
+from .. import hybrid, schemas
+from ..bm25 import get_index
+from ..vector_index import get_vector_index
+
+router = APIRouter(prefix="/v1", tags=["Search"])
+
+Segmen = Literal["Mahasiswa", "Dosen", "Tenaga Kependidikan", "Umum"]
+Sasaran = Literal["Mahasiswa", "Dosen", "Tenaga Kependidikan", "Umum/Eksternal", "Campuran"]
+
+@router.get("/search", response_model=List[schemas.HybridHit])
+def search(
+    q: str = Query(..., min_length=1),
+    k: int = Query(10, ge=1, le=100),
+    segmen_pengguna: Optional[Segmen] = None,
+    sasaran_layanan: Optional[Sasaran] = None,
+    bobot_vektor: Optional[float] = Query(None, ge=0, le=1),
+):
+    hits = hybrid.search(q, k, bobot_vektor, segmen_pengguna, sasaran_layanan)
+    if hits is None:
+        raise HTTPException(503, "Index pencarian belum dibuat (python -m app.bm25 build)")
+    return hits
+
+@router.get("/search/lexical", response_model=List[schemas.SearchHit])
+def search_lexical(
+    q: str = Query(..., min_length=1),
+    k: int = Query(10, ge=1, le=100),
+    sumber: Optional[Literal["dokumen_chunk", "faq", "sop_komponen"]] = None,
+):
+    index = get_index()
+    if index is None:
+        raise HTTPException(503, "Index BM25 belum dibuat (python -m app.bm25 build)")
+    return index.search(q, k, sumber)
+
+@router.get("/search/semantic", response_model=List[schemas.SearchHit])
+def search_semantic(
+    q: str = Query(..., min_length=1),
+    k: int = Query(10, ge=1, le=100),
+):
+    index = get_vector_index()
+    if index is None:
+        raise HTTPException(503, "Index vektor belum dibuat (python -m app.vector_index build)")
+    return index.search(q, k)
@@ -1,19 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from ..catalog import etag_matches, service_catalog
 from ..database import get_db
 from .. import models, schemas
 
 router = APIRouter(prefix="/v1", tags=["Helpdesk"])
 
+SERVICE_FIELDS = tuple(schemas.ServiceOut.model_fields)
+
 @router.get("/services", response_model=List[schemas.ServiceOut])
-def list_services(db: Session = Depends(get_db)):
-    return db.query(models.Service).filter(models.Service.is_active == True).all()
+async def list_services(
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    fields: Optional[str] = Query(None, description="Kolom dipisah koma, mis. id,name,sla_days"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
+):
+    selected = None
+    if fields:
+        selected = tuple(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+        unknown = [f for f in selected if f not in SERVICE_FIELDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Field tidak dikenal: {', '.join(unknown)}")
+
+    body, etag = await service_catalog.get(db, offset, limit, selected)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @router.post("/services", response_model=schemas.ServiceOut)
-def create_service(payload: schemas.ServiceBase, db: Session = Depends(get_db)):
+async def create_service(payload: schemas.ServiceBase, db: AsyncSession = Depends(get_db)):
     svc = models.Service(**payload.model_dump())
     db.add(svc)
-    db.commit()
-    db.refresh(svc)
+    await db.commit()
+    await db.refresh(svc)
+    service_catalog.invalidate()
     return svc
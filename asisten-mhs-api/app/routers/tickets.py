@@ -1,26 +1,188 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from datetime import date, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import List, Optional
+from datetime import date, datetime
+import uuid
+from ..catalog import service_catalog
 from ..database import get_db
+from ..deps import get_actor
+from ..pagination import after, decode_cursor, page
+from ..workdays import calendar_cache
 from .. import models, schemas
 
 router = APIRouter(prefix="/v1", tags=["Tiket"])
 
+def status_log(ticket_id: str, actor: str, old: str, new: str, note: Optional[str] = None) -> dict:
+    message = f"{old} -> {new}"
+    if note:
+        message += f": {note}"
+    return {"ticket_id": ticket_id, "actor": actor, "action": "status", "message": message}
+
+@router.get("/tickets", response_model=List[schemas.TicketOut])
+async def list_tickets(
+    response: Response,
+    npm: Optional[str] = None,
+    status: Optional[schemas.TicketStatus] = None,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    Ticket = models.Ticket
+    stmt = select(Ticket)
+    if npm:
+        stmt = stmt.where(Ticket.student_npm == npm)
+    if status:
+        stmt = stmt.where(Ticket.status == status)
+    if cursor:
+        values = decode_cursor(cursor, datetime.fromisoformat, str)
+        stmt = stmt.where(after((Ticket.created_at, Ticket.id), values, descending=True))
+    stmt = stmt.order_by(Ticket.created_at.desc(), Ticket.id.desc()).limit(limit + 1)
+    rows = (await db.execute(stmt)).scalars().all()
+    return page(rows, limit, lambda t: (t.created_at, t.id), response)
+
+async def insert_tickets(db: AsyncSession, payloads: List[schemas.TicketCreate]) -> List[dict]:
+    """
+    Satu INSERT (multi-row) tanpa SELECT balik: id, status & timestamp diisi
+    di aplikasi, sla_days dari cache katalog, due_date dari kalender hari kerja.
+    """
+    sla = await service_catalog.service_sla(db, {p.service_id for p in payloads})
+    missing = sorted({p.service_id for p in payloads} - sla.keys())
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Service not found: {', '.join(missing)}")
+
+    calendar = await calendar_cache.get(db)
+    today = date.today()
+    now = datetime.now()
+    rows = [
+        {
+            "id": str(uuid.uuid4()),
+            "student_npm": p.student_npm,
+            "service_id": p.service_id,
+            "status": "submitted",
+            "attachments": p.attachments,
+            "note": p.note,
+            "due_date": calendar.add_working_days(today, sla[p.service_id]),
+            "created_at": now,
+            "updated_at": now,
+        }
+        for p in payloads
+    ]
+    await db.execute(insert(models.Ticket), rows)
+    await db.commit()
+    return rows
+
 @router.post("/tickets", response_model=schemas.TicketOut)
-def create_ticket(payload: schemas.TicketCreate, db: Session = Depends(get_db)):
-    service = db.query(models.Service).get(payload.service_id)
-    if not service:
-        raise HTTPException(status_code=404, detail="Service not found")
-
-    ticket = models.Ticket(
-        student_npm=payload.student_npm,
-        service_id=payload.service_id,
-        attachments=payload.attachments,
-        note=payload.note,
-        due_date=date.today() + timedelta(days=service.sla_days or 0)
+async def create_ticket(payload: schemas.TicketCreate, db: AsyncSession = Depends(get_db)):
+    (ticket,) = await insert_tickets(db, [payload])
+    return ticket
+
+@router.post("/tickets/batch", response_model=List[schemas.TicketOut])
+async def create_tickets_batch(payload: schemas.TicketBatchCreate, db: AsyncSession = Depends(get_db)):
+    """Banyak tiket dalam 1 transaksi (semua berhasil atau semua batal)."""
+    return await insert_tickets(db, payload.tickets)
+
+@router.patch("/tickets", response_model=schemas.TicketBulkResult)
+async def bulk_update_tickets(
+    payload: schemas.TicketBulkUpdate,
+    actor: str = Depends(get_actor),
+    db: AsyncSession = Depends(get_db),
+):
+    """Ubah status banyak tiket sekaligus (staff): 1 UPDATE + 1 INSERT log batch, 1 transaksi."""
+    Ticket = models.Ticket
+    ids = list(dict.fromkeys(payload.ids))
+    current = dict((await db.execute(
+        select(Ticket.id, Ticket.status).where(Ticket.id.in_(ids)).with_for_update()
+    )).all())
+    changed = [i for i in ids if i in current and current[i] != payload.status]
+
+    if changed:
+        await db.execute(
+            update(Ticket)
+            .where(Ticket.id.in_(changed))
+            .values(status=payload.status, updated_at=datetime.now())
+            .execution_options(synchronize_session=False)
+        )
+        await db.execute(insert(models.TicketLog), [
+            status_log(i, actor, current[i], payload.status, payload.note) for i in changed
+        ])
+    await db.commit()
+    return {
+        "updated": len(changed),
+        "unchanged": len(current) - len(changed),
+        "not_found": [i for i in ids if i not in current],
+    }
+
+CLOSED_STATUSES = ("approved", "rejected", "completed")
+
+@router.get("/tickets/sla-report", response_model=schemas.SlaReport)
+async def sla_report(
+    service_id: Optional[str] = None,
+    as_of: Optional[date] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """Tiket terbuka per layanan dan yang melewati due_date (dalam hari kerja)."""
+    Ticket = models.Ticket
+    as_of = as_of or date.today()
+    stmt = (
+        select(Ticket.service_id, models.Service.name, Ticket.due_date, func.count())
+        .join(models.Service, models.Service.id == Ticket.service_id)
+        .where(Ticket.status.not_in(CLOSED_STATUSES))
+        .group_by(Ticket.service_id, models.Service.name, Ticket.due_date)
     )
-    db.add(ticket)
-    db.commit()
-    db.refresh(ticket)
+    if service_id:
+        stmt = stmt.where(Ticket.service_id == service_id)
+    calendar = await calendar_cache.get(db)
+
+    report = {}
+    for svc_id, name, due_date, count in (await db.execute(stmt)).all():
+        row = report.setdefault(svc_id, {
+            "service_id": svc_id, "service_name": name,
+            "open": 0, "breached": 0, "max_days_late": 0, "total_late": 0,
+        })
+        row["open"] += count
+        late = calendar.working_days_between(due_date, as_of) if due_date else 0
+        if late > 0:
+            row["breached"] += count
+            row["total_late"] += late * count
+            row["max_days_late"] = max(row["max_days_late"], late)
+
+    services = []
+    for row in sorted(report.values(), key=lambda r: (-r["breached"], r["service_id"])):
+        total_late = row.pop("total_late")
+        row["avg_days_late"] = round(total_late / row["breached"], 2) if row["breached"] else 0.0
+        services.append(row)
+    return {"date": as_of, "services": services}
+
+@router.get("/tickets/{ticket_id}", response_model=schemas.TicketDetail)
+async def get_ticket(ticket_id: str, db: AsyncSession = Depends(get_db)):
+    ticket = await db.get(models.Ticket, ticket_id, options=[selectinload(models.Ticket.logs)])
+    if not ticket:
+        raise HTTPException(status_code=404, detail="Ticket not found")
+    return {"ticket": ticket, "logs": ticket.logs}
+
+@router.patch("/tickets/{ticket_id}", response_model=schemas.TicketOut)
+async def update_ticket(
+    ticket_id: str,
+    payload: schemas.TicketUpdate,
+    actor: str = Depends(get_actor),
+    db: AsyncSession = Depends(get_db),
+):
+    ticket = await db.get(models.Ticket, ticket_id, with_for_update=True)
+    if not ticket:
+        raise HTTPException(status_code=404, detail="Ticket not found")
+
+    logs = []
+    if payload.status is not None and payload.status != ticket.status:
+        logs.append(status_log(ticket.id, actor, ticket.status, payload.status, payload.note))
+        ticket.status = payload.status
+    elif payload.note is not None:
+        logs.append({"ticket_id": ticket.id, "actor": actor, "action": "note", "message": payload.note})
+    if payload.note is not None:
+        ticket.note = payload.note
+    if logs:
+        ticket.updated_at = datetime.now()
+        db.add_all(models.TicketLog(**log) for log in logs)
+    await db.commit()
     return ticket
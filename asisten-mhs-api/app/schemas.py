@@ -1,6 +1,6 @@
-from typing import Optional, List, Dict
-from pydantic import BaseModel
-from datetime import date
+from typing import Optional, List, Dict, Literal
+from pydantic import BaseModel, ConfigDict, Field
+from datetime import date, datetime, time
 
 class ServiceBase(BaseModel):
     name: str
@@ -15,12 +15,73 @@ class ServiceOut(ServiceBase):
     id: str
     class Config: from_attributes = True
 
+class CourseOut(BaseModel):
+    id: str
+    code: str
+    name: str
+    sks: int
+    class Config: from_attributes = True
+
+class LecturerBrief(BaseModel):
+    id: str
+    name: str
+    class Config: from_attributes = True
+
+class ClassOut(BaseModel):
+    id: str
+    course: CourseOut
+    lecturer: Optional[LecturerBrief]
+    term_code: str
+    day: str
+    start_time: time
+    end_time: time
+    room: Optional[str]
+    class Config: from_attributes = True
+
+class ScheduleItem(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+    date: date
+    class_: ClassOut = Field(alias="class")
+
+class ScheduleOut(BaseModel):
+    date: date
+    term_code: Optional[str]
+    items: List[ScheduleItem]
+
+class ExamOut(BaseModel):
+    id: str
+    type: str
+    date: date
+    start_time: time
+    end_time: time
+    room: Optional[str]
+    course: CourseOut
+    class Config: from_attributes = True
+
+class EventOut(BaseModel):
+    id: str
+    category: str
+    title: str
+    date: date
+    start_time: Optional[time]
+    end_time: Optional[time]
+    location: Optional[str]
+    description: Optional[str]
+    organizer: Optional[str]
+    related_npm: Optional[str]
+    class Config: from_attributes = True
+
 class TicketCreate(BaseModel):
     student_npm: str
     service_id: str
     attachments: Optional[Dict] = None
     note: Optional[str] = None
 
+TicketStatus = Literal["submitted", "in_review", "need_revision", "approved", "rejected", "completed"]
+
+class TicketBatchCreate(BaseModel):
+    tickets: List[TicketCreate] = Field(..., min_length=1, max_length=500)
+
 class TicketOut(BaseModel):
     id: str
     student_npm: str
@@ -29,4 +90,56 @@ class TicketOut(BaseModel):
     attachments: Optional[Dict]
     note: Optional[str]
     due_date: Optional[date]
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
     class Config: from_attributes = True
+
+class TicketUpdate(BaseModel):
+    status: Optional[TicketStatus] = None
+    note: Optional[str] = None
+
+class TicketBulkUpdate(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=1000)
+    status: TicketStatus
+    note: Optional[str] = None
+
+class TicketBulkResult(BaseModel):
+    updated: int
+    unchanged: int
+    not_found: List[str]
+
+class TicketLogOut(BaseModel):
+    actor: str
+    action: str
+    message: Optional[str]
+    created_at: datetime
+    class Config: from_attributes = True
+
+class TicketDetail(BaseModel):
+    ticket: TicketOut
+    logs: List[TicketLogOut]
+
+class SearchHit(BaseModel):
+    sumber: str
+    id: int
+    sop_id: Optional[int]
+    halaman: Optional[int]
+    bagian: Optional[str]
+    skor: float
+    isi: str
+
+class HybridHit(SearchHit):
+    skor_leksikal: Optional[float]
+    skor_vektor: Optional[float]
+
+class SlaServiceRow(BaseModel):
+    service_id: str
+    service_name: Optional[str]
+    open: int
+    breached: int
+    max_days_late: int
+    avg_days_late: float
+
+class SlaReport(BaseModel):
+    date: date
+    services: List[SlaServiceRow]
@@ -0,0 +1,428 @@
+"""
+Tahap embedding + index vektor (ANN) untuk dokumen_chunk.
+
+Build (embed chunk baru/berubah → tulis index → tautkan embedding_id):
+    python -m app.vector_index build [--batch-size 64]
+Cari dari command line:
+    python -m app.vector_index search "syarat cuti akademik"
+
+Layout di VECTOR_DIR/<key model>/:
+- keys.txt    : hash isi chunk per baris vektor (baris ke-i = embedding_id i)
+- vectors.f32 : matriks float32 (n, dim), di-memmap
+- vectors.i8  : matriks int8 hasil kuantisasi per baris + scale.f32
+- index.npz   : index IVF (centroid + daftar chunk per cluster) dan
+                metadata chunk (id, sop_id, halaman, bagian, isi, sasaran_layanan)
+
+Store vektor bersifat append-only dan dikunci dengan hash isi chunk, jadi
+chunk yang isinya tidak berubah (atau kembar) tidak pernah di-embed ulang.
+Pencarian: pilih NPROBE cluster terdekat, skor kasar dengan int8,
+lalu skor ulang kandidat teratas dengan float32.
+"""
+
+import argparse
+import os
+import threading
+
+import numpy as np
+from sqlalchemy import bindparam, text
+
+from .bm25 import API_DIR, pack_strings, segmen_mask, unpack_strings
+from .config import settings
+from .embedding import content_hash, get_embedder
+
+FORMAT_VERSION = 2
+
+KMEANS_ITER = 10
+KMEANS_SAMPLE_PER_LIST = 256
+RERANK_FACTOR = 4
+
+STATUS_SIAP_EMBEDDING = "siap_embedding"
+STATUS_SUKSES = "sukses"
+
+
+def store_dir(key: str) -> str:
+    base = settings.VECTOR_DIR
+    base = base if os.path.isabs(base) else os.path.join(API_DIR, base)
+    return os.path.join(base, key)
+
+
+# =========================
+# STORE VEKTOR (MEMMAP)
+# =========================
+
+class VectorStore:
+    """
+    Matriks vektor append-only di disk. keys.txt ditulis paling akhir saat
+    append, jadi kalau proses mati di tengah jalan baris yang setengah
+    tertulis diabaikan (dan ditimpa pada append berikutnya).
+    """
+
+    def __init__(self, path: str, dim: int):
+        self.path = path
+        self.dim = dim
+        os.makedirs(path, exist_ok=True)
+        self.keys = []
+        keys_path = self._file("keys.txt")
+        if os.path.exists(keys_path):
+            with open(keys_path, encoding="ascii") as f:
+                self.keys = f.read().split()
+        self.rows = {key: row for row, key in enumerate(self.keys)}
+        self._maps = {}
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _memmap(self, name: str, dtype, width: int):
+        n = len(self.keys)
+        cached = self._maps.get(name)
+        if cached is not None and cached.shape[0] == n:
+            return cached
+        if n == 0:
+            arr = np.zeros((0, width), dtype=dtype)
+        else:
+            arr = np.memmap(self._file(name), dtype=dtype, mode="r", shape=(n, width))
+        self._maps[name] = arr
+        return arr
+
+    @property
+    def f32(self) -> np.ndarray:
+        return self._memmap("vectors.f32", np.float32, self.dim)
+
+    @property
+    def i8(self) -> np.ndarray:
+        return self._memmap("vectors.i8", np.int8, self.dim)
+
+    @property
+    def scale(self) -> np.ndarray:
+        return self._memmap("scale.f32", np.float32, 1)[:, 0]
+
+    def append(self, keys: list[str], vectors: np.ndarray):
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        scale = np.abs(vectors).max(axis=1) / 127.0
+        scale[scale == 0] = 1.0
+        quant = np.rint(vectors / scale[:, None]).astype(np.int8)
+
+        n = len(self.keys)
+        for name, arr, width in (
+            ("vectors.f32", vectors, 4 * self.dim),
+            ("vectors.i8", quant, self.dim),
+            ("scale.f32", scale.astype(np.float32), 4),
+        ):
+            with open(self._file(name), "ab") as f:
+                f.truncate(n * width)  # buang sisa append yang gagal
+                f.write(arr.tobytes())
+        with open(self._file("keys.txt"), "a", encoding="ascii") as f:
+            f.write("".join(f"{key}\n" for key in keys))
+
+        for key in keys:
+            self.rows[key] = len(self.keys)
+            self.keys.append(key)
+
+
+def embed_texts(store: VectorStore, embedder, texts: list[str], batch_size: int = 64):
+    """
+    Baris store untuk tiap teks; yang belum ada di-embed per batch.
+    Return (rows, jumlah teks yang di-embed).
+    """
+    hashes = [content_hash(t) for t in texts]
+    missing = {}
+    for h, t in zip(hashes, texts):
+        if h not in store.rows and h not in missing:
+            missing[h] = t
+    pending = list(missing.items())
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start:start + batch_size]
+        vectors = embedder.encode([t for _, t in batch], batch_size=batch_size)
+        store.append([h for h, _ in batch], vectors)
+    return np.array([store.rows[h] for h in hashes], dtype=np.int64), len(pending)
+
+
+# =========================
+# INDEX IVF
+# =========================
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    return np.divide(x, norms, out=np.zeros_like(x), where=norms > 0)
+
+
+def _assign(x: np.ndarray, centroids: np.ndarray, block: int = 4096) -> np.ndarray:
+    out = np.empty(len(x), dtype=np.int32)
+    for start in range(0, len(x), block):
+        out[start:start + block] = np.argmax(x[start:start + block] @ centroids.T, axis=1)
+    return out
+
+
+def train_ivf(x: np.ndarray, nlist: int | None = None, seed: int = 0):
+    """
+    k-means sferis (cosine) → (centroids, offsets, entries): entries urut
+    per cluster, cluster c = entries[offsets[c]:offsets[c+1]].
+    """
+    n = len(x)
+    if n == 0:
+        return np.zeros((0, x.shape[1]), np.float32), np.zeros(1, np.int64), np.zeros(0, np.int32)
+    nlist = nlist or max(1, int(np.sqrt(n)))
+    nlist = min(nlist, n)
+    rng = np.random.default_rng(seed)
+
+    sample = x
+    if n > nlist * KMEANS_SAMPLE_PER_LIST:
+        sample = x[np.sort(rng.choice(n, nlist * KMEANS_SAMPLE_PER_LIST, replace=False))]
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(KMEANS_ITER):
+        assign = _assign(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, sample)
+        filled = np.bincount(assign, minlength=nlist) > 0
+        centroids[filled] = _normalize(sums[filled])
+
+    assign = _assign(x, centroids)
+    entries = np.argsort(assign, kind="stable").astype(np.int32)
+    offsets = np.searchsorted(assign[entries], np.arange(nlist + 1)).astype(np.int64)
+    return centroids.astype(np.float32), offsets, entries
+
+
+class VectorIndex:
+    def __init__(self, arrays, store: VectorStore, embedder):
+        if int(arrays["version"][0]) != FORMAT_VERSION:
+            raise ValueError("Versi index vektor tidak cocok, build ulang index")
+        self.store = store
+        self.embedder = embedder
+        self.centroids = arrays["centroids"]
+        self.offsets = arrays["offsets"]
+        self.entries = arrays["entries"]
+        self.chunk_id = arrays["chunk_id"]
+        self.row = arrays["row"]
+        self.sop_id = arrays["sop_id"]
+        self.halaman = arrays["halaman"]
+        self.bagian = unpack_strings(arrays["bagian_blob"], arrays["bagian_off"])
+        self.isi = unpack_strings(arrays["isi_blob"], arrays["isi_off"])
+        self.segmen = np.array(unpack_strings(arrays["segmen_blob"], arrays["segmen_off"]))
+        self.position = {int(chunk_id): entry for entry, chunk_id in enumerate(self.chunk_id)}
+        self.mtime = None  # diisi saat dimuat lewat get_*index, ikut jadi kunci cache
+
+    @classmethod
+    def load(cls, embedder) -> "VectorIndex":
+        store = VectorStore(store_dir(embedder.key), embedder.dim)
+        with np.load(os.path.join(store.path, "index.npz")) as data:
+            return cls({key: data[key] for key in data.files}, store, embedder)
+
+    def candidates(self, query_vec: np.ndarray, nprobe: int) -> np.ndarray:
+        """Entry chunk di nprobe cluster terdekat."""
+        if len(self.centroids) == 0:
+            return np.zeros(0, dtype=np.int32)
+        nprobe = min(nprobe, len(self.centroids))
+        lists = np.argpartition(-(self.centroids @ query_vec), nprobe - 1)[:nprobe]
+        return np.concatenate([self.entries[self.offsets[c]:self.offsets[c + 1]] for c in lists])
+
+    def hit(self, entry: int, score: float) -> dict:
+        return {
+            "sumber": "dokumen_chunk",
+            "id": int(self.chunk_id[entry]),
+            "sop_id": None if self.sop_id[entry] < 0 else int(self.sop_id[entry]),
+            "halaman": None if self.halaman[entry] < 0 else int(self.halaman[entry]),
+            "bagian": self.bagian[entry] or None,
+            "skor": round(float(score), 4),
+            "isi": self.isi[entry],
+        }
+
+    def encode(self, query: str) -> np.ndarray:
+        return self.embedder.encode([query])[0]
+
+    def mask(self, sasaran_layanan: str | None = None) -> np.ndarray:
+        return segmen_mask(self.segmen, np.zeros(len(self.segmen), dtype=bool),
+                           sasaran_layanan=sasaran_layanan)
+
+    def exact_scores(self, query_vec: np.ndarray, entries: np.ndarray) -> np.ndarray:
+        """Cosine float32 persis untuk entry tertentu."""
+        return self.store.f32[self.row[entries]] @ query_vec
+
+    def search_vector(self, query_vec: np.ndarray, k: int = 10, nprobe: int | None = None,
+                      mask: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """(entries, skor) top-k, urut skor turun."""
+        empty = np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+        if not query_vec.any():
+            return empty
+        entries = self.candidates(query_vec, nprobe or settings.VECTOR_NPROBE)
+        if mask is not None:
+            entries = entries[mask[entries]]
+        if len(entries) == 0:
+            return empty
+
+        # skor kasar int8, lalu skor ulang kandidat teratas dengan float32
+        rows = self.row[entries]
+        order = np.argsort(rows, kind="stable")  # akses memmap berurutan
+        entries, rows = entries[order], rows[order]
+        approx = (self.store.i8[rows].astype(np.float32) @ query_vec) * self.store.scale[rows]
+        keep = min(len(entries), k * RERANK_FACTOR)
+        if keep < len(entries):
+            top = np.sort(np.argpartition(-approx, keep - 1)[:keep])
+            entries, rows = entries[top], rows[top]
+        exact = self.store.f32[rows] @ query_vec
+
+        ranked = np.lexsort((self.chunk_id[entries], -exact))[:k]
+        ranked = ranked[exact[ranked] > 0]
+        return entries[ranked], exact[ranked]
+
+    def search(self, query: str, k: int = 10, nprobe: int | None = None,
+               sasaran_layanan: str | None = None) -> list[dict]:
+        mask = self.mask(sasaran_layanan) if sasaran_layanan else None
+        entries, scores = self.search_vector(self.encode(query), k, nprobe, mask)
+        return [self.hit(entry, score) for entry, score in zip(entries, scores)]
+
+
+_index = None
+_index_mtime = None
+_index_lock = threading.Lock()
+
+
+def get_vector_index() -> VectorIndex | None:
+    """Index dari disk (dimuat ulang kalau di-build ulang). None kalau belum ada."""
+    global _index, _index_mtime
+    embedder = get_embedder(settings.EMBEDDING_MODEL)
+    path = os.path.join(store_dir(embedder.key), "index.npz")
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    if _index is None or mtime != _index_mtime:
+        with _index_lock:
+            if _index is None or mtime != _index_mtime:
+                _index = VectorIndex.load(embedder)
+                _index_mtime = mtime
+                _index.mtime = mtime
+    return _index
+
+
+# =========================
+# BUILD DARI DATABASE
+# =========================
+
+def ensure_schema(conn):
+    """Tambah kolom dokumen_chunk.embedding_id & status 'siap_embedding' (DB lama)."""
+    if conn.dialect.name != "mysql":
+        return
+    has_column = conn.execute(text("""
+        SELECT COUNT(*) FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE()
+          AND TABLE_NAME = 'dokumen_chunk' AND COLUMN_NAME = 'embedding_id'
+    """)).scalar()
+    if not has_column:
+        conn.execute(text("ALTER TABLE dokumen_chunk ADD COLUMN embedding_id INT NULL DEFAULT NULL AFTER bagian"))
+        conn.execute(text("CREATE INDEX idx_dokumen_chunk_embedding ON dokumen_chunk (embedding_id)"))
+    status_type = conn.execute(text("""
+        SELECT COLUMN_TYPE FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE()
+          AND TABLE_NAME = 'dokumen_kb' AND COLUMN_NAME = 'status_indexing'
+    """)).scalar()
+    if status_type and STATUS_SIAP_EMBEDDING not in status_type:
+        conn.execute(text("""
+            ALTER TABLE dokumen_kb MODIFY status_indexing
+            ENUM('belum','proses','siap_embedding','sukses','gagal') NOT NULL DEFAULT 'belum'
+        """))
+
+
+def write_index(store: VectorStore, chunks: list[dict], rows: np.ndarray):
+    vectors = np.asarray(store.f32[rows]) if len(rows) else np.zeros((0, store.dim), np.float32)
+    centroids, offsets, entries = train_ivf(vectors)
+    bagian_blob, bagian_off = pack_strings([c["bagian"] for c in chunks])
+    isi_blob, isi_off = pack_strings([c["isi_chunk"] for c in chunks])
+    segmen_blob, segmen_off = pack_strings([c["sasaran_layanan"] for c in chunks])
+
+    path = os.path.join(store.path, "index.npz")
+    tmp = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez(
+        tmp,
+        version=np.array([FORMAT_VERSION], dtype=np.int32),
+        centroids=centroids,
+        offsets=offsets,
+        entries=entries,
+        chunk_id=np.array([c["id"] for c in chunks], dtype=np.int32),
+        row=rows.astype(np.int32),
+        sop_id=np.array([-1 if c["sop_id"] is None else c["sop_id"] for c in chunks], dtype=np.int32),
+        halaman=np.array([-1 if c["halaman"] is None else c["halaman"] for c in chunks], dtype=np.int32),
+        bagian_blob=bagian_blob,
+        bagian_off=bagian_off,
+        isi_blob=isi_blob,
+        isi_off=isi_off,
+        segmen_blob=segmen_blob,
+        segmen_off=segmen_off,
+    )
+    os.replace(tmp, path)
+
+
+def build(conn, embedder, batch_size: int = 64) -> dict:
+    """
+    Embed semua chunk (yang sudah ada di store dilewati), tulis index,
+    update embedding_id yang berubah, lalu dokumen 'siap_embedding' → 'sukses'.
+    Hanya dokumen yang sudah 'siap_embedding' sebelum chunk dibaca yang
+    di-'sukses'-kan; yang masuk dari daemon selama build menunggu build berikutnya.
+    Tidak commit.
+    """
+    ensure_schema(conn)
+    siap_ids = [
+        row[0] for row in conn.execute(
+            text("SELECT id FROM dokumen_kb WHERE status_indexing = :siap"),
+            {"siap": STATUS_SIAP_EMBEDDING},
+        )
+    ]
+    chunks = [
+        dict(row) for row in conn.execute(text("""
+            SELECT c.id, c.sop_id, c.halaman, c.bagian, c.isi_chunk, c.embedding_id,
+                   s.sasaran_layanan
+            FROM dokumen_chunk c
+            LEFT JOIN sop s ON s.id = c.sop_id
+            ORDER BY c.id
+        """)).mappings()
+    ]
+    store = VectorStore(store_dir(embedder.key), embedder.dim)
+    rows, embedded = embed_texts(store, embedder, [c["isi_chunk"] for c in chunks], batch_size)
+    write_index(store, chunks, rows)
+
+    changed = [
+        {"id": c["id"], "embedding_id": int(row)}
+        for c, row in zip(chunks, rows)
+        if c["embedding_id"] != row
+    ]
+    if changed:
+        conn.execute(text("UPDATE dokumen_chunk SET embedding_id = :embedding_id WHERE id = :id"), changed)
+    siap = 0
+    if siap_ids:
+        siap = conn.execute(
+            text("""
+                UPDATE dokumen_kb SET status_indexing = :sukses
+                WHERE id IN :ids AND status_indexing = :siap
+            """).bindparams(bindparam("ids", expanding=True)),
+            {"sukses": STATUS_SUKSES, "siap": STATUS_SIAP_EMBEDDING, "ids": siap_ids},
+        ).rowcount
+    return {"chunk": len(chunks), "di_embed": embedded, "vektor": len(store),
+            "embedding_id_berubah": len(changed), "dokumen_sukses": siap}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Embedding & index vektor dokumen_chunk.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_build = sub.add_parser("build", help="Embed chunk dan build index dari database")
+    p_build.add_argument("--batch-size", type=int, default=64)
+    p_search = sub.add_parser("search", help="Cari di index")
+    p_search.add_argument("query")
+    p_search.add_argument("-k", type=int, default=10)
+    p_search.add_argument("--nprobe", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.cmd == "build":
+        from .database import engine
+
+        with engine.begin() as conn:
+            stats = build(conn, get_embedder(settings.EMBEDDING_MODEL), args.batch_size)
+        print(" ".join(f"{k}={v}" for k, v in stats.items()))
+    else:
+        index = get_vector_index()
+        if index is None:
+            raise SystemExit("Index vektor belum ada, jalankan: python -m app.vector_index build")
+        for hit in index.search(args.query, args.k, args.nprobe):
+            print(f"[{hit['skor']:.3f}] chunk#{hit['id']} sop={hit['sop_id']} "
+                  f"hal={hit['halaman']} {hit['bagian']}: {hit['isi'][:100]}")
@@ -0,0 +1,132 @@
+"""
+Hari kerja untuk SLA tiket: Senin–Jumat, kecuali hari libur nasional dan
+cuti bersama yang tercatat di kalender_akademik.
+
+Libur akademik (mis. "Libur Semester Genap") tidak dihitung libur: kantor
+layanan tetap buka. Kalender dimuat dari DB sekali, dihitung menjadi array
+kumulatif (lihat WorkCalendar), lalu di-cache (TTL).
+"""
+
+import asyncio
+import time
+from datetime import date, timedelta
+
+import numpy as np
+from sqlalchemy import text
+
+from .config import settings
+
+SQL_LIBUR = """
+    SELECT tanggal_mulai, tanggal_selesai, nama_agenda
+    FROM kalender_akademik
+    WHERE kategori = 'Libur' OR nama_agenda LIKE '%cuti%'
+"""
+
+BUKAN_LIBUR_KANTOR = ("libur semester",)
+
+WINDOW_AHEAD_DAYS = 3 * 366  # rentang kalender setelah libur terakhir yang tercatat
+
+
+def holiday_dates(rows) -> set[date]:
+    """Tanggal libur dari baris (tanggal_mulai, tanggal_selesai, nama_agenda)."""
+    result = set()
+    for mulai, selesai, nama in rows:
+        if any(nama.lower().startswith(p) for p in BUKAN_LIBUR_KANTOR):
+            continue
+        if isinstance(mulai, str):
+            mulai = date.fromisoformat(mulai)
+        if isinstance(selesai, str):
+            selesai = date.fromisoformat(selesai)
+        day, end = mulai, selesai or mulai
+        while day <= end:
+            result.add(day)
+            day += timedelta(days=1)
+    return result
+
+
+class WorkCalendar:
+    """
+    Kalender hari kerja yang sudah dihitung di muka untuk rentang
+    [origin, origin + len), sehingga operasi SLA O(1):
+    - cum[i]   : jumlah hari kerja di [origin, origin + i)
+    - ordinal  : indeks hari ke-k yang merupakan hari kerja
+    Tanggal di luar rentang dihitung langkah demi langkah (jarang terjadi).
+    """
+
+    def __init__(self, holidays: set[date], start: date | None = None, end: date | None = None):
+        today = date.today()
+        start = start or min([today, *holidays]) - timedelta(days=366)
+        end = end or max([today, *holidays]) + timedelta(days=WINDOW_AHEAD_DAYS)
+        self.holidays = holidays
+        self.origin = start
+        n = (end - start).days + 1
+        weekday = (np.arange(n) + start.weekday()) % 7
+        work = weekday < 5
+        for day in holidays:
+            if start <= day <= end:
+                work[(day - start).days] = False
+        self.cum = np.zeros(n + 1, dtype=np.int32)
+        np.cumsum(work, out=self.cum[1:])
+        self.ordinal = np.flatnonzero(work).astype(np.int32)
+
+    def _index(self, day: date) -> int | None:
+        i = (day - self.origin).days
+        return i if 0 <= i < len(self.cum) - 1 else None
+
+    def is_working_day(self, day: date) -> bool:
+        i = self._index(day)
+        if i is None:
+            return day.weekday() < 5 and day not in self.holidays
+        return bool(self.cum[i + 1] - self.cum[i])
+
+    def add_working_days(self, start: date, n: int) -> date:
+        """Hari kerja ke-n setelah start (n=0 → start)."""
+        if n <= 0:
+            return start
+        i = self._index(start)
+        if i is not None:
+            k = int(self.cum[i + 1]) + n - 1  # hari kerja ke-k (0-based) sejak origin
+            if k < len(self.ordinal):
+                return self.origin + timedelta(days=int(self.ordinal[k]))
+        day = start
+        while n > 0:
+            day += timedelta(days=1)
+            if self.is_working_day(day):
+                n -= 1
+        return day
+
+    def working_days_between(self, start: date, end: date) -> int:
+        """Jumlah hari kerja di (start, end]; negatif kalau end < start."""
+        if end < start:
+            return -self.working_days_between(end, start)
+        i, j = self._index(start), self._index(end)
+        if i is not None and j is not None:
+            return int(self.cum[j + 1] - self.cum[i + 1])
+        count, day = 0, start
+        while day < end:
+            day += timedelta(days=1)
+            count += self.is_working_day(day)
+        return count
+
+
+class CalendarCache:
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._calendar = None
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def invalidate(self):
+        self._expires_at = 0.0
+
+    async def get(self, db) -> WorkCalendar:
+        if self._calendar is None or time.monotonic() >= self._expires_at:
+            async with self._lock:
+                if self._calendar is None or time.monotonic() >= self._expires_at:
+                    rows = (await db.execute(text(SQL_LIBUR))).all()
+                    self._calendar = WorkCalendar(holiday_dates(rows))
+                    self._expires_at = time.monotonic() + self.ttl
+        return self._calendar
+
+
+calendar_cache = CalendarCache(settings.KALENDER_TTL)
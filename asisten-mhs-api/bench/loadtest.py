@@ -0,0 +1,464 @@
+"""
+Load test API asisten-mhs-api.
+
+Mode lokal (default): buat SQLite dari database/*.sql + data sintetis
+(services dari tabel sop, mahasiswa & tiket acak), build index BM25 &
+vektor, jalankan uvicorn app.main:app sebagai proses terpisah, lalu kirim
+campuran request dengan concurrency tertentu. Hasil (p50/p95/p99 per
+skenario, throughput, error) ditulis ke JSON.
+
+Mode --url: tembak server yang sudah jalan (mis. staging dengan MySQL);
+id tiket, npm & query diambil lewat API itu sendiri.
+
+Pemakaian (dari folder asisten-mhs-api):
+    python -m bench.loadtest --concurrency 32 --duration 30 --output bench/hasil.json
+    python -m bench.loadtest --mix services=5,search=5 --workers 2
+    python -m bench.loadtest --url http://127.0.0.1:8000 --duration 60
+
+Seed & random generator memakai --seed, jadi dua run dengan argumen sama
+mengirim urutan request yang sama (urutan antar worker tetap bergantung
+pada penjadwalan).
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+import platform
+import random
+import re
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import httpx
+import numpy as np
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SQL_DIR = os.path.join(os.path.dirname(API_DIR), "database")
+
+DEFAULT_MIX = {
+    "services": 25,         # GET /v1/services (tanpa ETag)
+    "services_etag": 10,    # GET /v1/services dengan If-None-Match (304)
+    "tickets_list": 15,     # GET /v1/tickets?npm=...
+    "ticket_detail": 10,    # GET /v1/tickets/{id}
+    "ticket_create": 10,    # POST /v1/tickets
+    "search": 25,           # GET /v1/search (hybrid)
+    "search_lexical": 5,    # GET /v1/search/lexical
+}
+
+TICKET_STATUSES = ("submitted", "in_review", "need_revision", "approved", "rejected", "completed")
+
+_INSERT = re.compile(r"INSERT INTO `(\w+)` \(([^)]*)\) VALUES")
+# kolom yang ditambahkan ke skema setelah file INSERT per tabel di-dump
+EXTRA_COLUMNS = {"dokumen_chunk": ("embedding_id",)}
+_MYSQL_ESCAPES = {"'": "''", "n": "\n", "r": "\r", "t": "\t", "\\": "\\", '"': '"', "0": ""}
+
+
+# --- Seed SQLite -----------------------------------------------------------
+
+def mysql_to_sqlite(statement: str) -> str:
+    """Ubah escape string MySQL (\\' \\n ...) ke bentuk SQLite."""
+    out, i = [], 0
+    while i < len(statement):
+        c = statement[i]
+        if c == "\\" and i + 1 < len(statement):
+            nxt = statement[i + 1]
+            out.append(_MYSQL_ESCAPES.get(nxt, nxt))
+            i += 2
+            continue
+        out.append(c)
+        i += 1
+    return "".join(out).replace("INSERT INTO", "INSERT OR IGNORE INTO", 1)
+
+
+def load_dump(conn: sqlite3.Connection) -> dict:
+    """
+    Muat baris INSERT dari database/*.sql. DDL MySQL tidak dipakai: tabel
+    dibuat dari daftar kolom INSERT pertama (cukup untuk query API & index).
+    """
+    counts = {}
+    for path in sorted(glob.glob(os.path.join(SQL_DIR, "*.sql"))):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                m = _INSERT.match(line)
+                if not m:
+                    continue
+                table = m.group(1)
+                if table not in counts:
+                    cols = [c.strip("` ") for c in m.group(2).split(",")]
+                    conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ("
+                                 + ", ".join(c + (" INTEGER PRIMARY KEY" if c == "id" else "") for c in cols)
+                                 + ")")
+                    counts[table] = 0
+                conn.execute(mysql_to_sqlite(line.rstrip().rstrip(";")))
+                counts[table] += 1
+    for table, columns in EXTRA_COLUMNS.items():
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        for column in columns:
+            if existing and column not in existing:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column}")
+    conn.commit()
+    return counts
+
+
+def seed_api_tables(db_path: str, students: int, tickets: int, rng: random.Random) -> dict:
+    """Tabel API (models) + data sintetis: services dari sop, mahasiswa, tiket."""
+    from sqlalchemy import create_engine, insert
+
+    from app import models
+
+    engine = create_engine(f"sqlite:///{db_path}")
+    models.Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        sops = conn.exec_driver_sql("SELECT kode_sop, judul_sop, kategori_layanan FROM sop ORDER BY id").all()
+        services = [
+            {
+                "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                "name": judul,
+                "description": kategori,
+                "sla_days": rng.randint(1, 14),
+                "fee_rp": 0,
+                "is_active": True,
+                "sop_ref": kode,
+            }
+            for kode, judul, kategori in sops
+        ]
+        npms = [f"2{i:08d}" for i in range(students)]
+        conn.execute(insert(models.Service), services)
+        conn.execute(insert(models.Student), [
+            {"npm": npm, "name": f"Mahasiswa {npm}", "email": f"{npm}@students.usu.ac.id"} for npm in npms
+        ])
+        now = datetime.now()
+        rows = []
+        for _ in range(tickets):
+            created = now - timedelta(minutes=rng.randint(0, 60 * 24 * 180))
+            rows.append({
+                "id": str(uuid.UUID(int=rng.getrandbits(128))),
+                "student_npm": rng.choice(npms),
+                "service_id": rng.choice(services)["id"],
+                "status": rng.choice(TICKET_STATUSES),
+                "due_date": (created + timedelta(days=rng.randint(1, 20))).date(),
+                "created_at": created,
+                "updated_at": created,
+            })
+        for start in range(0, len(rows), 5000):
+            conn.execute(insert(models.Ticket), rows[start:start + 5000])
+    engine.dispose()
+    return {"service_ids": [s["id"] for s in services], "npms": npms, "ticket_ids": [r["id"] for r in rows]}
+
+
+def build_search_indexes(db_path: str) -> dict:
+    from sqlalchemy import create_engine, event
+
+    from app import bm25, vector_index
+    from app.config import settings
+    from app.embedding import get_embedder
+
+    def concat(*values):
+        return None if any(v is None for v in values) else "".join(str(v) for v in values)
+
+    engine = create_engine(f"sqlite:///{db_path}")
+    event.listen(engine, "connect", lambda dbapi_conn, _: dbapi_conn.create_function("CONCAT", -1, concat))
+    with engine.begin() as conn:
+        docs = bm25.rebuild(conn)
+        vectors = vector_index.build(conn, get_embedder(settings.EMBEDDING_MODEL))
+    engine.dispose()
+    return {"bm25_docs": docs, "vector": vectors}
+
+
+def sample_queries(db_path: str, limit: int, rng: random.Random) -> list[str]:
+    """Query realistis: pertanyaan FAQ & judul SOP, sebagian dipotong."""
+    conn = sqlite3.connect(db_path)
+    texts = [r[0] for r in conn.execute("SELECT pertanyaan FROM faq")]
+    texts += [r[0] for r in conn.execute("SELECT judul_sop FROM sop")]
+    conn.close()
+    queries = []
+    for value in rng.sample(texts, min(limit, len(texts))):
+        words = value.split()
+        if len(words) > 4 and rng.random() < 0.5:
+            start = rng.randrange(len(words) - 3)
+            words = words[start:start + rng.randint(2, 4)]
+        queries.append(" ".join(words))
+    return queries
+
+
+def prepare_local(workdir: str, args, rng: random.Random) -> dict:
+    db_path = os.path.join(workdir, "bench.db")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    os.environ.update({
+        "DB_URL": f"sqlite:///{db_path}",
+        "BM25_INDEX_PATH": os.path.join(workdir, "bm25_index.npz"),
+        "VECTOR_DIR": os.path.join(workdir, "vectors"),
+    })
+    sys.path.insert(0, API_DIR)
+
+    t0 = time.perf_counter()
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    dump = load_dump(conn)
+    conn.close()
+    # import app di sini membaca .env dari cwd; seperti start_server, pindah ke
+    # workdir dulu supaya .env di folder API tidak ikut terbaca
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        data = seed_api_tables(db_path, args.students, args.tickets, rng)
+        indexes = build_search_indexes(db_path)
+    finally:
+        os.chdir(cwd)
+    data["queries"] = sample_queries(db_path, 200, rng)
+    data["seed"] = {
+        "seconds": round(time.perf_counter() - t0, 2),
+        "dump_rows": dump,
+        "students": args.students,
+        "tickets": args.tickets,
+        "services": len(data["service_ids"]),
+        **indexes,
+    }
+    return data
+
+
+# --- Server ----------------------------------------------------------------
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(workdir: str, port: int, workers: int) -> subprocess.Popen:
+    # cwd = workdir supaya .env di folder API tidak ikut terbaca; setting lewat env
+    env = {**os.environ, "SLOW_REQUEST_MS": "0"}
+    cmd = [
+        sys.executable, "-m", "uvicorn", "app.main:app",
+        "--app-dir", API_DIR, "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(workers), "--log-level", "warning", "--no-access-log",
+    ]
+    return subprocess.Popen(cmd, cwd=workdir, env=env)
+
+
+def wait_ready(url: str, proc: subprocess.Popen | None, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc is not None and proc.poll() is not None:
+            raise RuntimeError(f"uvicorn berhenti dengan kode {proc.returncode}")
+        try:
+            if httpx.get(f"{url}/v1/util/healthz", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"server {url} tidak siap dalam {timeout:.0f} detik")
+
+
+def discover_remote(url: str, rng: random.Random) -> dict:
+    """Data untuk mode --url: ambil lewat API (services & tiket yang ada)."""
+    services = httpx.get(f"{url}/v1/services", params={"limit": 200}, timeout=10).json()
+    tickets = httpx.get(f"{url}/v1/tickets", params={"limit": 200}, timeout=10).json()
+    if not services or not tickets:
+        raise RuntimeError("server --url butuh minimal 1 service & 1 tiket")
+    queries = [s["name"] for s in services if s.get("name")] or ["cuti akademik"]
+    return {
+        "service_ids": [s["id"] for s in services],
+        "npms": sorted({t["student_npm"] for t in tickets if t.get("student_npm")}),
+        "ticket_ids": [t["id"] for t in tickets],
+        "queries": queries,
+    }
+
+
+# --- Beban -----------------------------------------------------------------
+
+def parse_mix(value: str | None) -> dict:
+    if not value:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise SystemExit(f"skenario tidak dikenal: {name} (pilihan: {', '.join(DEFAULT_MIX)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class Scenarios:
+    def __init__(self, data: dict, rng: random.Random):
+        self.data = data
+        self.rng = rng
+        self.etag = None
+
+    def request(self, name: str) -> tuple[str, str, dict]:
+        """(method, path, kwargs httpx) untuk satu request skenario `name`."""
+        rng, data = self.rng, self.data
+        if name == "services":
+            return "GET", "/v1/services", {}
+        if name == "services_etag":
+            return "GET", "/v1/services", {"headers": {"If-None-Match": self.etag or "*"}}
+        if name == "tickets_list":
+            return "GET", "/v1/tickets", {"params": {"npm": rng.choice(data["npms"]), "limit": 20}}
+        if name == "ticket_detail":
+            return "GET", f"/v1/tickets/{rng.choice(data['ticket_ids'])}", {}
+        if name == "ticket_create":
+            body = {"student_npm": rng.choice(data["npms"]), "service_id": rng.choice(data["service_ids"])}
+            return "POST", "/v1/tickets", {"json": body}
+        if name == "search":
+            return "GET", "/v1/search", {"params": {"q": rng.choice(data["queries"]), "k": 10}}
+        if name == "search_lexical":
+            return "GET", "/v1/search/lexical", {"params": {"q": rng.choice(data["queries"]), "k": 10}}
+        raise KeyError(name)
+
+
+async def run_load(url: str, data: dict, mix: dict, concurrency: int, duration: float,
+                   requests: int | None, warmup: float, rng: random.Random) -> tuple[dict, float]:
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    scenarios = Scenarios(data, rng)
+    samples = {name: [] for name in names}  # name -> [(latency_s, status)]
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30.0) as client:
+        scenarios.etag = (await client.get("/v1/services")).headers.get("etag")
+
+        async def worker(deadline: float, record: bool, budget: list):
+            while time.perf_counter() < deadline:
+                if budget is not None:
+                    if budget[0] <= 0:
+                        return
+                    budget[0] -= 1
+                name = rng.choices(names, weights)[0]
+                method, path, kwargs = scenarios.request(name)
+                started = time.perf_counter()
+                try:
+                    status = (await client.request(method, path, **kwargs)).status_code
+                except httpx.HTTPError:
+                    status = 0
+                if record:
+                    samples[name].append((time.perf_counter() - started, status))
+
+        if warmup > 0:
+            end = time.perf_counter() + warmup
+            await asyncio.gather(*(worker(end, False, None) for _ in range(concurrency)))
+
+        budget = [requests] if requests else None
+        started = time.perf_counter()
+        end = started + (duration if not requests else float("inf"))
+        await asyncio.gather(*(worker(end, True, budget) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return samples, elapsed
+
+
+def summarize(latencies: list[float], statuses: list[int], elapsed: float) -> dict:
+    ok = [s for s in statuses if 200 <= s < 400]
+    result = {
+        "count": len(latencies),
+        "errors": len(statuses) - len(ok),
+        "rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "status": {str(s): statuses.count(s) for s in sorted(set(statuses))},
+    }
+    if latencies:
+        ms = np.asarray(latencies) * 1000
+        p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+        result.update(
+            mean_ms=round(float(ms.mean()), 3),
+            p50_ms=round(float(p50), 3),
+            p95_ms=round(float(p95), 3),
+            p99_ms=round(float(p99), 3),
+            max_ms=round(float(ms.max()), 3),
+        )
+    return result
+
+
+def build_report(samples: dict, elapsed: float) -> dict:
+    endpoints, all_lat, all_status = {}, [], []
+    for name, rows in samples.items():
+        lat = [r[0] for r in rows]
+        status = [r[1] for r in rows]
+        endpoints[name] = summarize(lat, status, elapsed)
+        all_lat += lat
+        all_status += status
+    return {"overall": summarize(all_lat, all_status, elapsed), "endpoints": endpoints}
+
+
+def print_report(report: dict):
+    print(f"{'skenario':<16}{'n':>8}{'err':>6}{'rps':>10}{'p50':>9}{'p95':>9}{'p99':>9}  (ms)")
+    rows = [*report["endpoints"].items(), ("TOTAL", report["overall"])]
+    for name, r in rows:
+        print(f"{name:<16}{r['count']:>8}{r['errors']:>6}{r['rps']:>10.1f}"
+              f"{r.get('p50_ms', 0):>9.2f}{r.get('p95_ms', 0):>9.2f}{r.get('p99_ms', 0):>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test asisten-mhs-api (p50/p95/p99 & throughput ke JSON).")
+    parser.add_argument("--url", help="server yang sudah jalan; default: SQLite lokal + uvicorn baru")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20.0, help="detik pengukuran")
+    parser.add_argument("--requests", type=int, default=None, help="jumlah request total (menggantikan --duration)")
+    parser.add_argument("--warmup", type=float, default=3.0, help="detik pemanasan (tidak dihitung)")
+    parser.add_argument("--mix", default=None, help="mis. services=30,search=50,ticket_create=20")
+    parser.add_argument("--workers", type=int, default=1, help="worker uvicorn (mode lokal)")
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--tickets", type=int, default=20000)
+    parser.add_argument("--workdir", default=None, help="folder DB & index sementara (default: temp)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="loadtest.json")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    mix = parse_mix(args.mix)
+    proc = None
+    workdir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix="asisten-bench-"))
+    os.makedirs(workdir, exist_ok=True)
+    try:
+        if args.url:
+            url = args.url.rstrip("/")
+            wait_ready(url, None, timeout=10)
+            data = discover_remote(url, rng)
+        else:
+            print(f"seed SQLite di {workdir} ...")
+            data = prepare_local(workdir, args, rng)
+            print(f"seed selesai ({data['seed']['seconds']} detik), menjalankan uvicorn ...")
+            url = f"http://127.0.0.1:{free_port()}"
+            proc = start_server(workdir, int(url.rsplit(":", 1)[1]), args.workers)
+            wait_ready(url, proc)
+
+        samples, elapsed = asyncio.run(run_load(
+            url, data, mix, args.concurrency, args.duration, args.requests, args.warmup, rng,
+        ))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=15)
+
+    report = {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "target": args.url or "local-sqlite",
+        "config": {
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "requests": args.requests,
+            "warmup_s": args.warmup,
+            "workers": None if args.url else args.workers,
+            "mix": mix,
+            "seed": args.seed,
+        },
+        "seed": data.get("seed"),
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "elapsed_s": round(elapsed, 3),
+        **build_report(samples, elapsed),
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print_report(report)
+    print(f"hasil: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
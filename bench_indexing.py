@@ -0,0 +1,422 @@
+"""
+Benchmark & profiling pipeline indexing PDF (index_sop_pdf_full.py dan
+index_kalender.py) tanpa MySQL.
+
+Kode indexer yang asli yang dijalankan (analyze_page, iter_sops,
+write_sop/SopBatchWriter, page_chunks, insert_chunk); hanya koneksi DB
+yang diganti SQLite in-memory (%s → ?), jadi tahap "db_write" mengukur
+penyusunan baris + executemany, bukan jaringan/MySQL.
+
+Tahap yang diukur:
+- open     : pdfplumber.open + daftar halaman (per dokumen)
+- hash     : sidik jari halaman (fingerprint_store.page_hash)
+- words    : extract_words             (SOP)
+- tables   : find_tables + extract     (SOP)
+- title    : deteksi judul & urut tabel, di luar words/tables (SOP)
+- text     : extract_text              (kalender)
+- parse    : state machine SOP + baris DB (SOP) / bersih + chunk (kalender)
+- db_write : flush batch ke sink in-memory
+
+Pemakaian:
+    python bench_indexing.py                         # dua pipeline, cache ekstraksi mati
+    python bench_indexing.py --pipeline sop --pages 9-40 --repeat 3
+    python bench_indexing.py --cache warm            # ukur jalur cache ekstraksi
+    python bench_indexing.py --profile sop.prof      # cProfile (snakeviz / flameprof sop.prof)
+
+Hasil (per tahap, per halaman, halaman/detik) ditulis ke --output (JSON)
+supaya bisa dibandingkan antar perubahan.
+"""
+
+import argparse
+import contextlib
+import cProfile
+import io
+import json
+import os
+import platform
+import pstats
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+import pdfplumber
+
+import index_kalender
+import index_sop_pdf_full
+from db_writer import BATCH_SIZE, SopBatchWriter
+from extraction_cache import ExtractionCache
+from fingerprint_store import page_hash
+
+KALENDER_PDF = os.path.join(
+    index_kalender.BASE_PROJECT_DIR, "storage", "dokumen", "kalender",
+    "SK_Kalender_Akademik_USU_2025_2026.pdf",
+)
+
+STAGES = {
+    "sop": ("open", "hash", "words", "tables", "title", "parse", "db_write"),
+    "kalender": ("open", "hash", "text", "parse", "db_write"),
+}
+
+MEMORY_SCHEMA = """
+    CREATE TABLE sop (
+        id INTEGER PRIMARY KEY, kode_sop TEXT UNIQUE, judul_sop TEXT,
+        unit_layanan_id INTEGER, kategori_layanan TEXT, sasaran_layanan TEXT, file_url TEXT
+    );
+    CREATE TABLE sop_komponen (
+        id INTEGER PRIMARY KEY, sop_id INTEGER REFERENCES sop(id) ON DELETE CASCADE,
+        jenis TEXT, judul TEXT, isi TEXT, halaman INTEGER
+    );
+    CREATE TABLE sop_step (
+        id INTEGER PRIMARY KEY, sop_id INTEGER REFERENCES sop(id) ON DELETE CASCADE,
+        no_urut INTEGER, deskripsi TEXT
+    );
+    CREATE TABLE dokumen_chunk (
+        id INTEGER PRIMARY KEY, dokumen_id INTEGER, sop_id INTEGER, no_urut INTEGER,
+        isi_chunk TEXT, halaman INTEGER, bagian TEXT, embedding_id INTEGER,
+        created_at TEXT, updated_at TEXT
+    );
+"""
+
+
+# =========================
+# SINK IN-MEMORY
+# =========================
+
+class MemoryCursor:
+    """Cursor ala mysql.connector di atas sqlite3 (placeholder %s)."""
+
+    def __init__(self, cur):
+        self._cur = cur
+
+    def execute(self, sql, params=()):
+        self._cur.execute(sql.replace("%s", "?"), params)
+
+    def executemany(self, sql, rows):
+        self._cur.executemany(sql.replace("%s", "?"), rows)
+
+    def fetchall(self):
+        return self._cur.fetchall()
+
+    @property
+    def lastrowid(self):
+        return self._cur.lastrowid
+
+    def close(self):
+        self._cur.close()
+
+
+class MemoryConnection:
+    """Pengganti koneksi MySQL untuk benchmark: SQLite :memory:."""
+
+    def __init__(self):
+        self.db = sqlite3.connect(":memory:")
+        self.db.execute("PRAGMA foreign_keys = ON")
+        self.db.create_function("NOW", 0, lambda: datetime.now().isoformat(sep=" ", timespec="seconds"))
+        self.db.executescript(MEMORY_SCHEMA)
+
+    def cursor(self, buffered=False, dictionary=False):
+        return MemoryCursor(self.db.cursor())
+
+    def commit(self):
+        self.db.commit()
+
+    def rollback(self):
+        self.db.rollback()
+
+    def close(self):
+        self.db.close()
+
+    def count(self, table: str) -> int:
+        return self.db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+# =========================
+# PENGUKUR
+# =========================
+
+class TimedPage:
+    """Bungkus CachedPage: catat waktu tiap jenis ekstraksi."""
+
+    def __init__(self, page):
+        self._page = page
+        self.spent = {"words": 0.0, "tables": 0.0, "text": 0.0}
+
+    def _timed(self, stage, fn):
+        t0 = time.perf_counter()
+        try:
+            return fn()
+        finally:
+            self.spent[stage] += time.perf_counter() - t0
+
+    def extract_words(self):
+        return self._timed("words", self._page.extract_words)
+
+    def tables(self):
+        return self._timed("tables", self._page.tables)
+
+    def extract_text(self):
+        return self._timed("text", self._page.extract_text)
+
+    def save(self):
+        self._page.save()
+
+
+class TimedWriter(SopBatchWriter):
+    """SopBatchWriter yang mencatat total waktu flush (= tahap db_write)."""
+
+    flush_seconds = 0.0
+
+    def flush(self):
+        t0 = time.perf_counter()
+        try:
+            super().flush()
+        finally:
+            self.flush_seconds += time.perf_counter() - t0
+
+
+def parse_pages(value: str | None, default: tuple[int, int]) -> tuple[int, int]:
+    if not value:
+        return default
+    start, _, end = value.partition("-")
+    return int(start), int(end or start)
+
+
+def quiet(verbose: bool):
+    """Log print indexer dibuang kecuali --verbose (print ikut terukur kalau tidak)."""
+    return contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+
+
+# =========================
+# PIPELINE
+# =========================
+
+def run_sop(pdf_path: str, pages: tuple[int, int], cache_dir: str | None,
+            batch_size: int, verbose: bool) -> dict:
+    stages = dict.fromkeys(STAGES["sop"], 0.0)
+    per_page = []
+    conn = MemoryConnection()
+
+    t0 = time.perf_counter()
+    pdf = pdfplumber.open(pdf_path)
+    pdf_pages = pdf.pages
+    cache = ExtractionCache(pdf_path, pdf=pdf, cache_dir=cache_dir or "", enabled=cache_dir is not None)
+    stages["open"] = time.perf_counter() - t0
+
+    results = []
+    for page_no in range(pages[0], min(pages[1], len(pdf_pages)) + 1):
+        t0 = time.perf_counter()
+        page_hash(pdf_pages[page_no - 1])
+        t1 = time.perf_counter()
+        page = TimedPage(cache.page(page_no))
+        results.append(index_sop_pdf_full.analyze_page(page, page_no))
+        page.save()
+        t2 = time.perf_counter()
+
+        row = {
+            "halaman": page_no,
+            "hash": t1 - t0,
+            "words": page.spent["words"],
+            "tables": page.spent["tables"],
+            "title": (t2 - t1) - page.spent["words"] - page.spent["tables"],
+        }
+        per_page.append(row)
+        for stage in ("hash", "words", "tables", "title"):
+            stages[stage] += row[stage]
+
+    writer = TimedWriter(conn, index_sop_pdf_full.DOKUMEN_ID, batch_size=batch_size, replace_existing=True)
+    t0 = time.perf_counter()
+    with quiet(verbose):
+        n_sop = 0
+        for urutan, sop_dict in enumerate(index_sop_pdf_full.iter_sops(results), start=1):
+            index_sop_pdf_full.write_sop(writer, sop_dict, urutan, unit_ult_id=1)
+            n_sop += 1
+        writer.commit()
+    total = time.perf_counter() - t0
+    stages["db_write"] = writer.flush_seconds
+    stages["parse"] = total - writer.flush_seconds
+
+    writer.close()
+    pdf.close()
+    counts = {t: conn.count(t) for t in ("sop", "sop_komponen", "sop_step", "dokumen_chunk")}
+    conn.close()
+    return {"stages": stages, "per_page": per_page, "sop": n_sop, "rows": counts}
+
+
+def run_kalender(pdf_path: str, pages: tuple[int, int], cache_dir: str | None,
+                 batch_size: int, verbose: bool) -> dict:
+    stages = dict.fromkeys(STAGES["kalender"], 0.0)
+    per_page = []
+    conn = MemoryConnection()
+    cur = conn.cursor()
+
+    t0 = time.perf_counter()
+    pdf = pdfplumber.open(pdf_path)
+    pdf_pages = pdf.pages
+    cache = ExtractionCache(pdf_path, pdf=pdf, cache_dir=cache_dir or "", enabled=cache_dir is not None)
+    stages["open"] = time.perf_counter() - t0
+
+    no_urut = 1
+    for page_no in range(pages[0], min(pages[1], len(pdf_pages)) + 1):
+        t0 = time.perf_counter()
+        page_hash(pdf_pages[page_no - 1])
+        t1 = time.perf_counter()
+        page = TimedPage(cache.page(page_no))
+        bagian, chunks = index_kalender.page_chunks(page)
+        page.save()
+        t2 = time.perf_counter()
+        for chunk in chunks:
+            index_kalender.insert_chunk(
+                cur, dokumen_id=0, sop_id=None, no_urut=no_urut,
+                isi_chunk=chunk, halaman=page_no, bagian=bagian,
+            )
+            no_urut += 1
+        t3 = time.perf_counter()
+
+        row = {
+            "halaman": page_no,
+            "hash": t1 - t0,
+            "text": page.spent["text"],
+            "parse": (t2 - t1) - page.spent["text"],
+            "db_write": t3 - t2,
+            "chunk": len(chunks),
+        }
+        per_page.append(row)
+        for stage in ("hash", "text", "parse", "db_write"):
+            stages[stage] += row[stage]
+
+    t0 = time.perf_counter()
+    index_kalender.renumber_chunks(cur, 0)
+    conn.commit()
+    stages["db_write"] += time.perf_counter() - t0
+
+    pdf.close()
+    counts = {"dokumen_chunk": conn.count("dokumen_chunk")}
+    conn.close()
+    return {"stages": stages, "per_page": per_page, "rows": counts}
+
+
+PIPELINES = {
+    "sop": (run_sop, lambda: index_sop_pdf_full.PDF_PATH,
+            (index_sop_pdf_full.START_PAGE, index_sop_pdf_full.END_PAGE)),
+    "kalender": (run_kalender, lambda: KALENDER_PDF,
+                 (index_kalender.START_PAGE, index_kalender.END_PAGE)),
+}
+
+
+# =========================
+# LAPORAN
+# =========================
+
+def summarize(name: str, runs: list[dict]) -> dict:
+    """Median antar-repeat per tahap + rincian per halaman dari run tercepat."""
+    walls = [sum(r["stages"].values()) for r in runs]
+    best = runs[walls.index(min(walls))]
+    n_pages = len(best["per_page"])
+    stages = {s: statistics.median(r["stages"][s] for r in runs) for s in STAGES[name]}
+    wall = statistics.median(walls)
+    page_totals = [
+        sum(v for k, v in p.items() if k in STAGES[name]) for p in best["per_page"]
+    ]
+    return {
+        "pages": n_pages,
+        "wall_s": round(wall, 4),
+        "pages_per_s": round(n_pages / wall, 2) if wall else None,
+        "stages_s": {s: round(v, 4) for s, v in stages.items()},
+        "stages_pct": {s: round(100 * v / wall, 1) if wall else 0.0 for s, v in stages.items()},
+        "page_ms": {
+            "p50": round(1000 * statistics.median(page_totals), 2) if page_totals else None,
+            "max": round(1000 * max(page_totals), 2) if page_totals else None,
+        },
+        "runs_wall_s": [round(w, 4) for w in walls],
+        "rows": best["rows"],
+        "per_page_ms": [
+            {k: (round(1000 * v, 3) if k in STAGES[name] else v) for k, v in p.items()}
+            for p in best["per_page"]
+        ],
+    }
+
+
+def print_summary(name: str, s: dict):
+    print(f"\n[{name}] {s['pages']} halaman, {s['wall_s']:.3f} s, {s['pages_per_s']} halaman/detik")
+    for stage, seconds in s["stages_s"].items():
+        print(f"  {stage:<9}{seconds * 1000:>10.1f} ms  {s['stages_pct'][stage]:>5.1f}%")
+    slowest = sorted(
+        s["per_page_ms"],
+        key=lambda p: -sum(v for k, v in p.items() if k in STAGES[name]),
+    )[:5]
+    print("  halaman terlambat: " + ", ".join(
+        f"{p['halaman']} ({sum(v for k, v in p.items() if k in STAGES[name]):.0f} ms)" for p in slowest
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per tahap pipeline indexing PDF (tanpa MySQL).")
+    parser.add_argument("--pipeline", choices=["sop", "kalender", "all"], default="all")
+    parser.add_argument("--pdf", default=None, help="override PDF (hanya untuk satu --pipeline)")
+    parser.add_argument("--pages", default=None, help="rentang halaman cetak, mis. 9-40 (default: konfigurasi indexer)")
+    parser.add_argument("--repeat", type=int, default=1, help="jumlah pengulangan; laporan = median")
+    parser.add_argument("--cache", choices=["off", "warm"], default="off",
+                        help="off: selalu extract dari PDF; warm: cache ekstraksi sudah terisi")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--profile", default=None, help="simpan cProfile ke file .prof")
+    parser.add_argument("--profile-top", type=int, default=25, help="fungsi teratas (cumulative) yang dicetak")
+    parser.add_argument("--output", default="bench_indexing.json")
+    parser.add_argument("--verbose", action="store_true", help="tampilkan log print indexer")
+    args = parser.parse_args()
+
+    names = ["sop", "kalender"] if args.pipeline == "all" else [args.pipeline]
+    if args.pdf and len(names) > 1:
+        parser.error("--pdf butuh --pipeline sop atau kalender")
+
+    profiler = cProfile.Profile() if args.profile else None
+    report = {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "config": {
+            "cache": args.cache, "repeat": args.repeat, "batch_size": args.batch_size,
+            "profile": bool(args.profile),
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "pdfplumber": pdfplumber.__version__,
+            "platform": platform.platform(),
+        },
+        "pipelines": {},
+    }
+
+    with tempfile.TemporaryDirectory(prefix="bench-ekstraksi-") as tmp:
+        for name in names:
+            run, default_pdf, default_pages = PIPELINES[name]
+            pdf_path = args.pdf or default_pdf()
+            pages = parse_pages(args.pages, default_pages)
+            cache_dir = os.path.join(tmp, name) if args.cache == "warm" else None
+            if cache_dir is not None:
+                run(pdf_path, pages, cache_dir, args.batch_size, verbose=False)  # isi cache dulu
+
+            runs = []
+            for _ in range(max(1, args.repeat)):
+                if profiler is not None:
+                    profiler.enable()
+                runs.append(run(pdf_path, pages, cache_dir, args.batch_size, args.verbose))
+                if profiler is not None:
+                    profiler.disable()
+
+            summary = summarize(name, runs)
+            summary["pdf"] = os.path.relpath(pdf_path)
+            summary["page_range"] = list(pages)
+            report["pipelines"][name] = summary
+            print_summary(name, summary)
+
+    if profiler is not None:
+        profiler.dump_stats(args.profile)
+        print(f"\ncProfile: {args.profile} (mis. snakeviz {args.profile} / flameprof {args.profile} > flame.svg)")
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(args.profile_top)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"hasil: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -29,6 +29,7 @@ CREATE TABLE `dokumen_chunk`  (
   `isi_chunk` text CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL,
   `halaman` int NULL DEFAULT NULL,
   `bagian` varchar(150) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NULL DEFAULT NULL,
+  `embedding_id` int NULL DEFAULT NULL,
   `created_at` timestamp NOT NULL DEFAULT current_timestamp(),
   `updated_at` timestamp NOT NULL DEFAULT current_timestamp() ON UPDATE CURRENT_TIMESTAMP,
   PRIMARY KEY (`id`) USING BTREE,
@@ -37,11 +38,41 @@ CREATE TABLE `dokumen_chunk`  (
   INDEX `idx_dokumen_chunk_bagian`(`bagian` ASC) USING BTREE,
   INDEX `idx_chunk_dokumen_urut`(`dokumen_id` ASC, `no_urut` ASC) USING BTREE,
   INDEX `idx_chunk_sop_urut`(`sop_id` ASC, `no_urut` ASC) USING BTREE,
+  INDEX `idx_dokumen_chunk_embedding`(`embedding_id` ASC) USING BTREE,
+  INDEX `idx_dokumen_chunk_updated`(`updated_at` ASC, `id` ASC) USING BTREE,
   FULLTEXT INDEX `ft_chunk_isi`(`isi_chunk`),
   CONSTRAINT `fk_chunk_dokumen_kb` FOREIGN KEY (`dokumen_id`) REFERENCES `dokumen_kb` (`id`) ON DELETE CASCADE ON UPDATE CASCADE,
   CONSTRAINT `fk_chunk_sop` FOREIGN KEY (`sop_id`) REFERENCES `sop` (`id`) ON DELETE SET NULL ON UPDATE CASCADE
 ) ENGINE = InnoDB AUTO_INCREMENT = 350 CHARACTER SET = utf8mb4 COLLATE = utf8mb4_unicode_ci ROW_FORMAT = Dynamic;
 
+-- ----------------------------
+-- Table structure for dokumen_fingerprint
+-- ----------------------------
+DROP TABLE IF EXISTS `dokumen_fingerprint`;
+CREATE TABLE `dokumen_fingerprint`  (
+  `dokumen_id` int NOT NULL,
+  `file_hash` char(64) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL,
+  `created_at` timestamp NOT NULL DEFAULT current_timestamp(),
+  `updated_at` timestamp NOT NULL DEFAULT current_timestamp() ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (`dokumen_id`) USING BTREE,
+  CONSTRAINT `fk_fingerprint_dokumen_kb` FOREIGN KEY (`dokumen_id`) REFERENCES `dokumen_kb` (`id`) ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE = InnoDB CHARACTER SET = utf8mb4 COLLATE = utf8mb4_unicode_ci ROW_FORMAT = Dynamic;
+
+-- ----------------------------
+-- Table structure for dokumen_halaman
+-- ----------------------------
+DROP TABLE IF EXISTS `dokumen_halaman`;
+CREATE TABLE `dokumen_halaman`  (
+  `dokumen_id` int NOT NULL,
+  `halaman` int NOT NULL,
+  `content_hash` char(40) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL,
+  `sop_id` int NULL DEFAULT NULL,
+  `created_at` timestamp NOT NULL DEFAULT current_timestamp(),
+  `updated_at` timestamp NOT NULL DEFAULT current_timestamp() ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (`dokumen_id`, `halaman`) USING BTREE,
+  CONSTRAINT `fk_halaman_dokumen_kb` FOREIGN KEY (`dokumen_id`) REFERENCES `dokumen_kb` (`id`) ON DELETE CASCADE ON UPDATE CASCADE
+) ENGINE = InnoDB CHARACTER SET = utf8mb4 COLLATE = utf8mb4_unicode_ci ROW_FORMAT = Dynamic;
+
 -- ----------------------------
 -- Table structure for dokumen_kb
 -- ----------------------------
@@ -52,7 +83,7 @@ CREATE TABLE `dokumen_kb`  (
   `kategori` varchar(100) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NULL DEFAULT NULL,
   `sumber` varchar(100) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NULL DEFAULT NULL,
   `file_path` varchar(255) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NULL DEFAULT NULL,
-  `status_indexing` enum('belum','proses','sukses','gagal') CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL DEFAULT 'belum',
+  `status_indexing` enum('belum','proses','siap_embedding','sukses','gagal') CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL DEFAULT 'belum',
   `catatan` text CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NULL,
   `created_at` timestamp NOT NULL DEFAULT current_timestamp(),
   `updated_at` timestamp NOT NULL DEFAULT current_timestamp() ON UPDATE CURRENT_TIMESTAMP,
@@ -137,6 +168,7 @@ CREATE TABLE `faq`  (
   PRIMARY KEY (`id`) USING BTREE,
   INDEX `idx_faq_kategori`(`kategori` ASC) USING BTREE,
   INDEX `idx_faq_segmen`(`segmen_pengguna` ASC) USING BTREE,
+  INDEX `idx_faq_updated`(`updated_at` ASC, `id` ASC) USING BTREE,
   FULLTEXT INDEX `ft_faq_pertanyaan_jawaban`(`pertanyaan`, `jawaban`)
 ) ENGINE = InnoDB AUTO_INCREMENT = 84 CHARACTER SET = utf8mb4 COLLATE = utf8mb4_unicode_ci ROW_FORMAT = Dynamic;
 
@@ -225,6 +257,7 @@ CREATE TABLE `sop_komponen`  (
   INDEX `idx_sop_komponen_sop_id`(`sop_id` ASC) USING BTREE,
   INDEX `idx_sop_komponen_jenis`(`jenis` ASC) USING BTREE,
   INDEX `idx_sop_komponen_sop_jenis`(`sop_id` ASC, `jenis` ASC) USING BTREE,
+  INDEX `idx_sop_komponen_updated`(`updated_at` ASC, `id` ASC) USING BTREE,
   FULLTEXT INDEX `ft_sop_komponen_isi`(`isi`),
   CONSTRAINT `fk_sop_komponen_sop` FOREIGN KEY (`sop_id`) REFERENCES `sop` (`id`) ON DELETE CASCADE ON UPDATE CASCADE
 ) ENGINE = InnoDB AUTO_INCREMENT = 223 CHARACTER SET = utf8mb4 COLLATE = utf8mb4_unicode_ci ROW_FORMAT = Dynamic;
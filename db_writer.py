@@ -0,0 +1,233 @@
+"""
+Writer batch untuk hasil indexing SOP ke MySQL.
+
+Baris untuk tabel sop, sop_komponen, sop_step dan dokumen_chunk ditampung
+dulu di memori, lalu dikirim dengan executemany (mysql.connector menulis
+ulang INSERT ... VALUES menjadi multi-row insert). sop_id untuk baris anak
+di-resolve sekaligus per batch lewat kode_sop (UNIQUE di tabel sop).
+
+Commit TIDAK dilakukan saat flush; pemanggil memanggil commit() satu kali
+per dokumen sehingga satu dokumen = satu transaksi.
+"""
+
+# Jumlah baris yang ditampung sebelum otomatis di-flush ke DB,
+# sekaligus jumlah baris maksimal per statement executemany.
+BATCH_SIZE = 500
+
+SQL_INSERT_SOP = """
+    INSERT INTO sop
+        (kode_sop, judul_sop, unit_layanan_id,
+         kategori_layanan, sasaran_layanan,
+         file_url)
+    VALUES
+        (%s, %s, %s,
+         %s, %s,
+         %s)
+"""
+
+SQL_INSERT_KOMPONEN = """
+    INSERT INTO sop_komponen (sop_id, jenis, judul, isi, halaman)
+    VALUES (%s, %s, %s, %s, %s)
+"""
+
+SQL_INSERT_STEP = """
+    INSERT INTO sop_step (sop_id, no_urut, deskripsi)
+    VALUES (%s, %s, %s)
+"""
+
+SQL_INSERT_CHUNK = """
+    INSERT INTO dokumen_chunk
+        (dokumen_id, sop_id, no_urut, isi_chunk, halaman, bagian)
+    VALUES
+        (%s, %s, %s, %s, %s, %s)
+"""
+
+
+class SopBatchWriter:
+    """
+    Penampung baris SOP + turunannya, di-flush per batch.
+
+    Pemakaian:
+        writer = SopBatchWriter(conn, dokumen_id)
+        writer.add_sop(sop_row, komponen_rows, step_rows, chunk_rows)
+        ...
+        writer.commit()  # flush sisa batch + 1x commit
+    """
+
+    def __init__(self, conn, dokumen_id: int, batch_size: int = BATCH_SIZE,
+                 replace_existing: bool = False):
+        self.conn = conn
+        self.cur = conn.cursor(buffered=True)
+        self.dokumen_id = dokumen_id
+        self.batch_size = max(1, batch_size)
+        # True: SOP lama dengan kode_sop yang sama (beserta chunk-nya) dihapus
+        # dulu sebelum insert, supaya re-index tidak bentrok / menduplikasi.
+        self.replace_existing = replace_existing
+
+        self._sop_rows = []       # tuple kolom SQL_INSERT_SOP
+        self._komponen_rows = []  # (kode_sop, jenis, judul, isi, halaman)
+        self._step_rows = []      # (kode_sop, no_urut, deskripsi)
+        self._chunk_rows = []     # (kode_sop | None, no_urut, isi_chunk, halaman, bagian)
+
+        # kode_sop -> id untuk SOP yang sudah di-insert lewat writer ini
+        self.sop_ids: dict[str, int] = {}
+        self.total_rows = 0
+
+    # -------------------------
+    # penampung
+    # -------------------------
+
+    def pending(self) -> int:
+        return (
+            len(self._sop_rows)
+            + len(self._komponen_rows)
+            + len(self._step_rows)
+            + len(self._chunk_rows)
+        )
+
+    def add_sop(self, sop: dict, komponen: list[dict], steps: list[dict],
+                chunks: list[dict]):
+        """
+        Tampung 1 SOP beserta komponen, langkah, dan chunk-nya.
+
+        sop      : kode_sop, judul_sop, unit_layanan_id, kategori_layanan,
+                   sasaran_layanan, file_url
+        komponen : jenis, judul, isi, halaman
+        steps    : no_urut, deskripsi
+        chunks   : no_urut, isi_chunk, halaman, bagian
+        """
+        kode_sop = sop["kode_sop"]
+        self._sop_rows.append(
+            (
+                kode_sop,
+                sop["judul_sop"],
+                sop["unit_layanan_id"],
+                sop.get("kategori_layanan"),
+                sop.get("sasaran_layanan"),
+                sop.get("file_url"),
+            )
+        )
+        for k in komponen:
+            self._komponen_rows.append(
+                (kode_sop, k["jenis"], k["judul"], k["isi"], k["halaman"])
+            )
+        for st in steps:
+            self._step_rows.append((kode_sop, st["no_urut"], st["deskripsi"]))
+        for c in chunks:
+            self._chunk_rows.append(
+                (kode_sop, c["no_urut"], c["isi_chunk"], c["halaman"], c["bagian"])
+            )
+
+        if self.pending() >= self.batch_size:
+            self.flush()
+
+    def add_chunk(self, no_urut: int, isi_chunk: str, halaman: int,
+                  bagian: str | None, kode_sop: str | None = None):
+        """Tampung 1 chunk dokumen (opsional terkait SOP lewat kode_sop)."""
+        self._chunk_rows.append((kode_sop, no_urut, isi_chunk, halaman, bagian))
+        if self.pending() >= self.batch_size:
+            self.flush()
+
+    # -------------------------
+    # flush / commit
+    # -------------------------
+
+    def _executemany(self, sql: str, rows: list[tuple]):
+        for i in range(0, len(rows), self.batch_size):
+            self.cur.executemany(sql, rows[i:i + self.batch_size])
+        self.total_rows += len(rows)
+
+    def _delete_existing_sops(self, kode_list: list[str]):
+        """Hapus SOP dengan kode_sop yang akan di-insert ulang (per batch)."""
+        for i in range(0, len(kode_list), self.batch_size):
+            part = kode_list[i:i + self.batch_size]
+            placeholders = ", ".join(["%s"] * len(part))
+            self.cur.execute(
+                f"""
+                DELETE FROM dokumen_chunk
+                WHERE sop_id IN (SELECT id FROM sop WHERE kode_sop IN ({placeholders}))
+                """,
+                tuple(part),
+            )
+            # sop_komponen & sop_step ikut terhapus via ON DELETE CASCADE
+            self.cur.execute(
+                f"DELETE FROM sop WHERE kode_sop IN ({placeholders})", tuple(part)
+            )
+
+    def _resolve_sop_ids(self, kode_list: list[str]):
+        """Ambil id SOP untuk banyak kode_sop sekaligus (1 query per batch)."""
+        todo = [k for k in dict.fromkeys(kode_list) if k not in self.sop_ids]
+        for i in range(0, len(todo), self.batch_size):
+            part = todo[i:i + self.batch_size]
+            placeholders = ", ".join(["%s"] * len(part))
+            self.cur.execute(
+                f"SELECT id, kode_sop FROM sop WHERE kode_sop IN ({placeholders})",
+                tuple(part),
+            )
+            for sop_id, kode_sop in self.cur.fetchall():
+                self.sop_ids[kode_sop] = sop_id
+
+        missing = [k for k in todo if k not in self.sop_ids]
+        if missing:
+            raise RuntimeError(f"sop_id tidak ditemukan untuk kode_sop: {missing}")
+
+    def _sop_id(self, kode_sop: str | None):
+        return None if kode_sop is None else self.sop_ids[kode_sop]
+
+    def flush(self):
+        """Kirim semua baris yang tertampung ke DB (tanpa commit)."""
+        if not self.pending():
+            return
+
+        if self._sop_rows:
+            if self.replace_existing:
+                kode_list = [r[0] for r in self._sop_rows]
+                self._delete_existing_sops(kode_list)
+                for k in kode_list:
+                    self.sop_ids.pop(k, None)
+            self._executemany(SQL_INSERT_SOP, self._sop_rows)
+
+        kode_refs = [r[0] for r in self._komponen_rows]
+        kode_refs += [r[0] for r in self._step_rows]
+        kode_refs += [r[0] for r in self._chunk_rows if r[0] is not None]
+        kode_refs += [r[0] for r in self._sop_rows]
+        self._resolve_sop_ids(kode_refs)
+
+        if self._komponen_rows:
+            self._executemany(
+                SQL_INSERT_KOMPONEN,
+                [(self._sop_id(k), *rest) for k, *rest in self._komponen_rows],
+            )
+        if self._step_rows:
+            self._executemany(
+                SQL_INSERT_STEP,
+                [(self._sop_id(k), *rest) for k, *rest in self._step_rows],
+            )
+        if self._chunk_rows:
+            self._executemany(
+                SQL_INSERT_CHUNK,
+                [
+                    (self.dokumen_id, self._sop_id(k), *rest)
+                    for k, *rest in self._chunk_rows
+                ],
+            )
+
+        self._sop_rows.clear()
+        self._komponen_rows.clear()
+        self._step_rows.clear()
+        self._chunk_rows.clear()
+
+    def commit(self):
+        """Flush sisa batch lalu commit transaksi dokumen."""
+        self.flush()
+        self.conn.commit()
+
+    def rollback(self):
+        self._sop_rows.clear()
+        self._komponen_rows.clear()
+        self._step_rows.clear()
+        self._chunk_rows.clear()
+        self.conn.rollback()
+
+    def close(self):
+        self.cur.close()
@@ -1,5 +1,11 @@
+import argparse
+import heapq
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import mysql.connector
 from difflib import SequenceMatcher
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
@@ -19,6 +25,9 @@ SIMILARITY_THRESHOLD = 0.90
 # Nama file output Excel
 OUTPUT_EXCEL = "duplikasi_nama_dosen.xlsx"
 
+# Ukuran blok (baris x kolom) perkalian matriks saat mencari kandidat
+BLOCK_SIZE = 2048
+
 
 def normalize_name(name: str) -> str:
     """
@@ -63,7 +72,178 @@ def similarity(a: str, b: str) -> float:
     return SequenceMatcher(None, a, b).ratio()
 
 
-def find_similar_names(dosen_list, threshold: float):
+# ==============================
+# PENCARIAN KANDIDAT
+# ==============================
+#
+# SequenceMatcher.ratio() = 2*M / (len_a + len_b), dengan M = jumlah karakter
+# yang cocok. M tidak pernah melebihi irisan multiset karakter kedua nama
+# (= quick_ratio), dan irisan itu tidak melebihi min(len_a, len_b).
+# Pasangan yang batas atasnya < threshold PASTI tidak lolos, jadi hasil akhir
+# identik dengan membandingkan semua pasangan.
+#
+# Irisan multiset = dot product vektor biner "karakter c kemunculan ke-k",
+# sehingga quick_ratio semua pasangan bisa dihitung sekaligus dengan
+# perkalian matriks (BLAS) per blok, hanya untuk pasangan yang panjangnya
+# berdekatan (nama diurutkan berdasarkan panjang).
+
+def _max_partner_len(length: int, threshold: float) -> float:
+    """Panjang maksimal pasangan supaya 2*min/(la+lb) masih bisa >= threshold."""
+    if threshold <= 0:
+        return float("inf")
+    return (2 - threshold) / threshold * length
+
+
+def _occurrence_matrix(names: list[str]) -> np.ndarray:
+    """Matriks biner (n x token): token = (karakter, kemunculan ke-k)."""
+    lengths = np.fromiter((len(n) for n in names), dtype=np.int64, count=len(names))
+    codes = np.frombuffer("".join(names).encode("utf-32-le"), dtype=np.uint32)
+    alphabet, char_idx = np.unique(codes, return_inverse=True)
+
+    counts = np.zeros((len(names), max(1, len(alphabet))), dtype=np.int64)
+    np.add.at(counts, (np.repeat(np.arange(len(names)), lengths), char_idx), 1)
+
+    # kolom untuk karakter c: (c, 1), (c, 2), ..., (c, max kemunculan c)
+    columns = [
+        counts[:, c] >= k
+        for c in range(counts.shape[1])
+        for k in range(1, int(counts[:, c].max(initial=0)) + 1)
+    ]
+    if not columns:
+        return np.zeros((len(names), 1), dtype=np.float32)
+    return np.stack(columns, axis=1).astype(np.float32)
+
+
+def _block_candidates(occ, lengths, row_start, row_end, col_end,
+                      threshold: float) -> np.ndarray:
+    """
+    Pasangan (r, c) posisi urut-panjang dengan row_start <= r < row_end,
+    r < c < col_end dan quick_ratio >= threshold.
+    """
+    found = []
+    rows = occ[row_start:row_end]
+    row_len = lengths[row_start:row_end]
+    # saringan float32 in-place: 2*irisan - t*len_c >= t*len_r (dengan toleransi)
+    row_need = (threshold * row_len - 1e-3).astype(np.float32)[:, None]
+    for col_start in range(row_start, col_end, BLOCK_SIZE):
+        col_stop = min(col_end, col_start + BLOCK_SIZE)
+        inter = rows @ occ[col_start:col_stop].T
+        score = inter * np.float32(2)
+        score -= (threshold * lengths[col_start:col_stop]).astype(np.float32)
+        r, c = np.nonzero(score >= row_need)
+
+        # cek ulang persis seperti quick_ratio (float64) untuk yang lolos
+        total = row_len[r] + lengths[col_start + c]
+        exact = 2.0 * inter[r, c].astype(np.float64) / total >= threshold
+        r = r[exact] + row_start
+        c = c[exact] + col_start
+        keep = r < c
+        found.append(np.stack([r[keep], c[keep]], axis=1))
+    if not found:
+        return np.zeros((0, 2), dtype=np.int64)
+    return np.concatenate(found)
+
+
+def _prepare(names: list[str]):
+    """
+    Urutkan nama (yang tidak kosong) berdasarkan panjang → (order, lengths, occ).
+    Sorted neighborhood: tiap blok baris hanya dibandingkan dengan kolom yang
+    panjangnya masih dalam jangkauan.
+    """
+    valid = [i for i, name in enumerate(names) if name]
+    order = np.array(sorted(valid, key=lambda i: len(names[i])), dtype=np.int64)
+    lengths = np.array([len(names[i]) for i in order], dtype=np.float64)
+    occ = _occurrence_matrix([names[i] for i in order])
+    return order, lengths, occ
+
+
+def _shards(lengths: np.ndarray, threshold: float, rows: int = BLOCK_SIZE):
+    """Bagi ruang pasangan per blok baris → [(row_start, row_end, col_end)]."""
+    shards = []
+    for row_start in range(0, len(lengths), rows):
+        row_end = min(len(lengths), row_start + rows)
+        max_len = _max_partner_len(lengths[row_end - 1], threshold)
+        col_end = int(np.searchsorted(lengths, max_len + 1e-9, side="right"))
+        shards.append((row_start, row_end, col_end))
+    return shards
+
+
+def _shard_candidates(prepared, shard, threshold: float) -> np.ndarray:
+    """Kandidat 1 shard dalam indeks asli (i < j), terurut (i, j)."""
+    order, lengths, occ = prepared
+    pairs = order[_block_candidates(occ, lengths, *shard, threshold)]
+    pairs.sort(axis=1)
+    return pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+
+# ==============================
+# SKORING (SERIAL / PARALEL)
+# ==============================
+
+# Diisi oleh _init_worker di tiap worker process
+_worker_names = None
+_worker_prepared = None
+
+
+def _init_worker(names: list[str]):
+    global _worker_names, _worker_prepared
+    _worker_names = names
+    _worker_prepared = _prepare(names)
+
+
+def _score_shard(shard, threshold: float):
+    """
+    Hitung SequenceMatcher untuk kandidat 1 shard.
+    Return (matches [(i, j, sim)] terurut (i, j), jumlah kandidat).
+    """
+    pairs = _shard_candidates(_worker_prepared, shard, threshold)
+    matches = []
+    for i, j in pairs.tolist():
+        sim = similarity(_worker_names[i], _worker_names[j])
+        if sim >= threshold:
+            matches.append((i, j, sim))
+    return matches, len(pairs)
+
+
+def iter_matches(names: list[str], threshold: float, workers: int = 1,
+                 stats: dict | None = None):
+    """
+    Semua (i, j, similarity) dengan similarity >= threshold, terurut (i, j).
+
+    workers > 1: shard (blok baris) dikerjakan di process pool; hasil tiap
+    shard dikirim balik begitu selesai lalu digabung (merge) berdasarkan
+    (i, j), jadi urutannya sama persis dengan mode serial.
+    stats (opsional) diisi jumlah shard & kandidat yang di-skor.
+    """
+    stats = stats if stats is not None else {}
+    stats.update({"shard": 0, "kandidat": 0})
+
+    if workers <= 1:
+        _init_worker(names)
+        shards = _shards(_worker_prepared[1], threshold)
+        results = [_score_shard(shard, threshold) for shard in shards]
+    else:
+        lengths = np.array(sorted(len(n) for n in names if n), dtype=np.float64)
+        # shard lebih kecil supaya beban antar worker merata
+        rows = max(64, min(BLOCK_SIZE, -(-len(lengths) // (workers * 4))))
+        shards = _shards(lengths, threshold, rows)
+        results = []
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(names,)
+        ) as executor:
+            futures = [executor.submit(_score_shard, shard, threshold) for shard in shards]
+            for done, future in enumerate(as_completed(futures), start=1):
+                results.append(future.result())
+                print(f"  shard {done}/{len(shards)} selesai", end="\r")
+        if shards:
+            print()
+
+    stats["shard"] = len(shards)
+    stats["kandidat"] = sum(n for _, n in results)
+    yield from heapq.merge(*(matches for matches, _ in results))
+
+
+def find_similar_names(dosen_list, threshold: float, workers: int = 1):
     """
     Cari pasangan nama dosen yang mirip di atas 'threshold'.
     Mengembalikan list dict:
@@ -74,30 +254,26 @@ def find_similar_names(dosen_list, threshold: float):
       "nama_2": ...,
       "similarity": ... (0.0 - 1.0)
     }
+
+    Hasil (isi & urutan) sama dengan membandingkan semua pasangan; hanya
+    kandidat yang lolos saringan quick_ratio yang dihitung dengan
+    SequenceMatcher. workers > 1: skoring dibagi ke process pool.
     """
     results = []
-    n = len(dosen_list)
-
-    for i in range(n):
-        for j in range(i + 1, n):
-            d1 = dosen_list[i]
-            d2 = dosen_list[j]
-
-            if not d1["nama_norm"] or not d2["nama_norm"]:
-                continue
-
-            sim = similarity(d1["nama_norm"], d2["nama_norm"])
+    names = [d["nama_norm"] for d in dosen_list]
 
-            if sim >= threshold:
-                results.append(
-                    {
-                        "id_1": d1["id"],
-                        "nama_1": d1["nama"],
-                        "id_2": d2["id"],
-                        "nama_2": d2["nama"],
-                        "similarity": sim,
-                    }
-                )
+    for i, j, sim in iter_matches(names, threshold, workers):
+        d1 = dosen_list[i]
+        d2 = dosen_list[j]
+        results.append(
+            {
+                "id_1": d1["id"],
+                "nama_1": d1["nama"],
+                "id_2": d2["id"],
+                "nama_2": d2["nama"],
+                "similarity": sim,
+            }
+        )
 
     results.sort(key=lambda x: x["similarity"], reverse=True)
     return results
@@ -151,7 +327,63 @@ def save_to_excel(pairs, threshold: float, output_path: str):
     print(f"File Excel berhasil dibuat: {output_path}")
 
 
-def main():
+# ==============================
+# BENCHMARK
+# ==============================
+
+BENCHMARK_SIZES = (1_000, 10_000, 100_000)
+
+_SUKU_KATA = ["an", "di", "ra", "sa", "ti", "wa", "ni", "ma", "ru", "li", "ya", "har",
+              "su", "ko", "bu", "dan", "me", "gi", "na", "lo", "fa", "zul", "rah", "in"]
+_MARGA = ["siregar", "nasution", "lubis", "harahap", "tarigan", "ginting", "sembiring",
+          "simanjuntak", "sitompul", "pohan", "daulay", "hasibuan", "rangkuti", "batubara"]
+_GELAR = ["", "", "dr. ", "prof. dr. ", "ir. "]
+_GELAR_BELAKANG = ["", ", s.t., m.t.", ", m.si", ", s.e., m.m.", ", ph.d", ", m.kom"]
+
+
+def synthetic_names(n: int, seed: int = 0, dup_rate: float = 0.03) -> list[str]:
+    """
+    Nama dosen sintetis (sudah ternormalisasi) untuk benchmark. Sekitar
+    dup_rate bagian adalah salinan nama sebelumnya dengan 1-2 salah ketik.
+    """
+    rng = random.Random(seed)
+    names = []
+    for _ in range(n):
+        if names and rng.random() < dup_rate:
+            chars = list(rng.choice(names))
+            for _ in range(rng.randint(1, 2)):
+                chars[rng.randrange(len(chars))] = rng.choice("aiueonrst")
+            names.append("".join(chars))
+            continue
+        depan = " ".join(
+            "".join(rng.choice(_SUKU_KATA) for _ in range(rng.randint(2, 3)))
+            for _ in range(rng.randint(1, 2))
+        )
+        names.append(
+            f"{rng.choice(_GELAR)}{depan} {rng.choice(_MARGA)}{rng.choice(_GELAR_BELAKANG)}"
+        )
+    return names
+
+
+def run_benchmark(sizes=BENCHMARK_SIZES, workers: int = 1,
+                  threshold: float = SIMILARITY_THRESHOLD):
+    """Cetak pasangan/detik (terhadap semua n*(n-1)/2 pasangan) per ukuran data."""
+    print(f"Benchmark threshold={threshold}, workers={workers}")
+    print(f"{'n':>8} {'pasangan':>14} {'kandidat':>10} {'mirip':>8} {'detik':>8} {'pasangan/detik':>16}")
+    for n in sizes:
+        names = synthetic_names(n)
+        stats = {}
+        start = time.perf_counter()
+        matches = sum(1 for _ in iter_matches(names, threshold, workers, stats))
+        elapsed = time.perf_counter() - start
+        total_pairs = n * (n - 1) // 2
+        print(
+            f"{n:>8} {total_pairs:>14,} {stats['kandidat']:>10,} {matches:>8,} "
+            f"{elapsed:>8.2f} {total_pairs / elapsed:>16,.0f}"
+        )
+
+
+def main(workers: int = 1):
     print("Menghubungkan ke database...")
     conn = mysql.connector.connect(**DB_CONFIG)
 
@@ -161,8 +393,7 @@ def main():
         print(f"Total dosen: {len(dosen_list)}")
 
         print(f"\nMencari nama dosen yang mirip (threshold >= {SIMILARITY_THRESHOLD * 100:.0f}%)...")
-        similar_pairs = find_similar_names(dosen_list, SIMILARITY_THRESHOLD)
-
+        similar_pairs = find_similar_names(dosen_list, SIMILARITY_THRESHOLD, workers)
         print(f"Ditemukan {len(similar_pairs)} pasangan nama yang mirip.\n")
 
         # Tampilkan ringkas di console (opsional)
@@ -182,4 +413,27 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Cari nama dosen yang mirip / duplikat.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Jumlah proses untuk skoring pasangan (default: %(default)s = serial)",
+    )
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="Jalankan benchmark dengan nama sintetis, tanpa database",
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=list(BENCHMARK_SIZES),
+        help="Jumlah nama sintetis untuk --benchmark (default: %(default)s)",
+    )
+    args = parser.parse_args()
+    if args.benchmark:
+        run_benchmark(args.sizes, max(1, args.workers))
+    else:
+        main(max(1, args.workers))
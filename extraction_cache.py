@@ -0,0 +1,216 @@
+"""
+Cache hasil ekstraksi pdfplumber di disk.
+
+extract_words, find_tables (+ isi & bbox sel tabel) dan extract_text per
+halaman disimpan ke file biner terkompresi, dengan kunci:
+
+    (hash file PDF, nomor halaman, versi ekstraktor)
+
+sehingga run berikutnya (debug_sop.py, re-index setelah mengubah parser
+seperti KOMPONEN_MAPPING, dsb.) tidak perlu mengulang analisis layout.
+Naikkan EXTRACTOR_VERSION kalau cara ekstraksi diubah; versi pdfplumber
+otomatis ikut jadi bagian kunci.
+
+Format file (per halaman): zlib(pickle(dict)) dengan layout kolom:
+- words : {"text": [str], "box": array('d') x0, top, x1, bottom berurutan}
+- tables: {"bbox": array('d') 4 angka per tabel, "rows": [rows per tabel],
+           "cells": [array('d') 4 angka per sel, per tabel]}
+- text  : str
+"""
+
+import os
+import pickle
+import zlib
+from array import array
+
+import pdfplumber
+
+from fingerprint_store import file_hash
+
+EXTRACTOR_VERSION = "1"
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "ekstraksi")
+
+WORD_BOX_KEYS = ("x0", "top", "x1", "bottom")
+
+
+def extractor_key() -> str:
+    return f"v{EXTRACTOR_VERSION}-pdfplumber{pdfplumber.__version__}"
+
+
+# =========================
+# (DE)SERIALISASI KOLOM
+# =========================
+
+def _words_to_columns(words: list[dict]) -> dict:
+    box = array("d")
+    for w in words:
+        box.extend(w[k] for k in WORD_BOX_KEYS)
+    return {"text": [w["text"] for w in words], "box": box}
+
+
+def _columns_to_words(cols: dict) -> list[dict]:
+    box = cols["box"]
+    words = []
+    for i, text in enumerate(cols["text"]):
+        x0, top, x1, bottom = box[i * 4:i * 4 + 4]
+        words.append({"text": text, "x0": x0, "top": top, "x1": x1, "bottom": bottom})
+    return words
+
+
+def _tables_to_columns(tables: list[dict]) -> dict:
+    bbox = array("d")
+    for t in tables:
+        bbox.extend(t["bbox"])
+    return {
+        "bbox": bbox,
+        "rows": [t["rows"] for t in tables],
+        "cells": [array("d", [v for cell in t["cells"] for v in cell]) for t in tables],
+    }
+
+
+def _columns_to_tables(cols: dict) -> list[dict]:
+    bbox = cols["bbox"]
+    tables = []
+    for i, rows in enumerate(cols["rows"]):
+        flat = cols["cells"][i]
+        tables.append(
+            {
+                "bbox": tuple(bbox[i * 4:i * 4 + 4]),
+                "rows": rows,
+                "cells": [tuple(flat[j:j + 4]) for j in range(0, len(flat), 4)],
+            }
+        )
+    return tables
+
+
+# =========================
+# CACHE
+# =========================
+
+class CachedPage:
+    """
+    Hasil ekstraksi 1 halaman. Setiap artefak dihitung dari PDF hanya
+    kalau belum ada di cache, lalu disimpan kembali.
+    """
+
+    def __init__(self, cache: "ExtractionCache", page_no: int):
+        self.cache = cache
+        self.page_no = page_no  # 1-based
+        self._data = cache._load(page_no)
+        self._dirty = False
+        self._page = None
+
+    def _pdf_page(self):
+        if self._page is None:
+            self._page = self.cache.pdf.pages[self.page_no - 1]
+        return self._page
+
+    def extract_words(self) -> list[dict]:
+        if "words" not in self._data:
+            words = self._pdf_page().extract_words()
+            self._data["words"] = _words_to_columns(words)
+            self._dirty = True
+        return _columns_to_words(self._data["words"])
+
+    def tables(self) -> list[dict]:
+        """Semua tabel halaman (urutan find_tables): {"bbox", "rows", "cells"}."""
+        if "tables" not in self._data:
+            tables = [
+                {"bbox": tuple(t.bbox), "rows": t.extract(), "cells": t.cells}
+                for t in self._pdf_page().find_tables()
+            ]
+            self._data["tables"] = _tables_to_columns(tables)
+            self._dirty = True
+        return _columns_to_tables(self._data["tables"])
+
+    def extract_text(self) -> str:
+        if "text" not in self._data:
+            self._data["text"] = self._pdf_page().extract_text() or ""
+            self._dirty = True
+        return self._data["text"]
+
+    def save(self):
+        if self._dirty:
+            self.cache._store(self.page_no, self._data)
+            self._dirty = False
+
+    def close(self):
+        """Simpan ke cache lalu buang cache layout halaman pdfplumber."""
+        self.save()
+        if self._page is not None:
+            self._page.close()
+            self._page = None
+
+
+class ExtractionCache:
+    """
+    Pemakaian:
+        cache = ExtractionCache(pdf_path)
+        page = cache.page(9)
+        words = page.extract_words(); tables = page.tables()
+        page.close()  # simpan artefak baru ke cache
+        cache.close()
+
+    PDF baru dibuka kalau ada halaman yang belum ter-cache.
+    enabled=False: selalu extract dari PDF dan tidak menulis cache.
+    """
+
+    def __init__(self, pdf_path: str, pdf=None, pdf_hash: str | None = None,
+                 cache_dir: str = CACHE_DIR, enabled: bool = True):
+        self.pdf_path = pdf_path
+        self._pdf = pdf
+        self._own_pdf = pdf is None
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+        self.pdf_hash = pdf_hash
+        if enabled:
+            self.pdf_hash = pdf_hash or file_hash(pdf_path)
+            self.dir = os.path.join(cache_dir, self.pdf_hash, extractor_key())
+        else:
+            self.dir = None
+
+    @property
+    def pdf(self):
+        if self._pdf is None:
+            self._pdf = pdfplumber.open(self.pdf_path)
+        return self._pdf
+
+    def _path(self, page_no: int) -> str:
+        return os.path.join(self.dir, f"p{page_no:05d}.bin")
+
+    def _load(self, page_no: int) -> dict:
+        if not self.enabled:
+            return {}
+        try:
+            with open(self._path(page_no), "rb") as f:
+                data = pickle.loads(zlib.decompress(f.read()))
+            self.hits += 1
+            return data
+        except FileNotFoundError:
+            self.misses += 1
+            return {}
+        except (OSError, zlib.error, pickle.UnpicklingError, EOFError):
+            # file rusak/terpotong → anggap miss, nanti ditulis ulang
+            self.misses += 1
+            return {}
+
+    def _store(self, page_no: int, data: dict):
+        if not self.enabled:
+            return
+        os.makedirs(self.dir, exist_ok=True)
+        path = self._path(page_no)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(zlib.compress(pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL), 6))
+        os.replace(tmp, path)  # atomik, aman untuk worker paralel
+
+    def page(self, page_no: int) -> CachedPage:
+        return CachedPage(self, page_no)
+
+    def close(self):
+        if self._own_pdf and self._pdf is not None:
+            self._pdf.close()
+            self._pdf = None
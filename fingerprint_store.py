@@ -0,0 +1,160 @@
+"""
+Penyimpanan sidik jari (hash) isi dokumen untuk re-indexing inkremental.
+
+- dokumen_fingerprint : hash seluruh file per dokumen_kb.id. Kalau sama
+                        dengan run sebelumnya, dokumen dilewati total.
+- dokumen_halaman     : hash isi per halaman (+ sop_id untuk halaman yang
+                        menjadi awal sebuah SOP). Dipakai untuk menentukan
+                        halaman mana yang perlu di-extract ulang.
+
+Hash halaman diambil dari content stream mentah PDF (teks, garis tabel,
+dsb. semuanya ada di sana), jadi menghitungnya jauh lebih murah daripada
+extract_words / find_tables, tapi tetap berubah kalau isi halaman berubah.
+"""
+
+import hashlib
+
+from pdfminer.pdftypes import resolve1
+
+SQL_CREATE_FINGERPRINT = """
+CREATE TABLE IF NOT EXISTS dokumen_fingerprint (
+    dokumen_id INT NOT NULL,
+    file_hash CHAR(64) NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (dokumen_id),
+    CONSTRAINT fk_fingerprint_dokumen_kb
+      FOREIGN KEY (dokumen_id) REFERENCES dokumen_kb(id)
+      ON UPDATE CASCADE ON DELETE CASCADE
+) ENGINE=InnoDB
+  DEFAULT CHARSET=utf8mb4
+  COLLATE=utf8mb4_unicode_ci;
+"""
+
+SQL_CREATE_HALAMAN = """
+CREATE TABLE IF NOT EXISTS dokumen_halaman (
+    dokumen_id INT NOT NULL,
+    halaman INT NOT NULL,
+    content_hash CHAR(40) NOT NULL,
+    sop_id INT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (dokumen_id, halaman),
+    CONSTRAINT fk_halaman_dokumen_kb
+      FOREIGN KEY (dokumen_id) REFERENCES dokumen_kb(id)
+      ON UPDATE CASCADE ON DELETE CASCADE
+) ENGINE=InnoDB
+  DEFAULT CHARSET=utf8mb4
+  COLLATE=utf8mb4_unicode_ci;
+"""
+
+
+def ensure_fingerprint_tables(cur):
+    """Buat tabel dokumen_fingerprint & dokumen_halaman kalau belum ada."""
+    cur.execute(SQL_CREATE_FINGERPRINT)
+    cur.execute(SQL_CREATE_HALAMAN)
+
+
+# =========================
+# HASH
+# =========================
+
+def file_hash(path: str) -> str:
+    """sha256 isi file (dibaca per blok supaya hemat memori)."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def page_hash(page) -> str:
+    """
+    sha1 isi 1 halaman pdfplumber dari content stream mentahnya
+    (ditambah ukuran halaman), tanpa analisis layout.
+    """
+    h = hashlib.sha1()
+    h.update(repr(tuple(page.bbox)).encode())
+    for stream in page.page_obj.contents:
+        h.update(resolve1(stream).get_data())
+    return h.hexdigest()
+
+
+# =========================
+# DB HELPER
+# =========================
+
+def get_file_hash(cur, dokumen_id: int) -> str | None:
+    cur.execute(
+        "SELECT file_hash FROM dokumen_fingerprint WHERE dokumen_id = %s",
+        (dokumen_id,),
+    )
+    row = cur.fetchone()
+    if not row:
+        return None
+    return row["file_hash"] if isinstance(row, dict) else row[0]
+
+
+def save_file_hash(cur, dokumen_id: int, value: str):
+    cur.execute(
+        """
+        INSERT INTO dokumen_fingerprint (dokumen_id, file_hash)
+        VALUES (%s, %s)
+        ON DUPLICATE KEY UPDATE file_hash = VALUES(file_hash)
+        """,
+        (dokumen_id, value),
+    )
+
+
+def load_page_hashes(cur, dokumen_id: int) -> dict[int, tuple[str, int | None]]:
+    """Return {halaman: (content_hash, sop_id)} dari run sebelumnya."""
+    cur.execute(
+        "SELECT halaman, content_hash, sop_id FROM dokumen_halaman WHERE dokumen_id = %s",
+        (dokumen_id,),
+    )
+    result = {}
+    for row in cur.fetchall():
+        if isinstance(row, dict):
+            row = (row["halaman"], row["content_hash"], row["sop_id"])
+        result[row[0]] = (row[1], row[2])
+    return result
+
+
+def save_page_hashes(cur, dokumen_id: int, pages: dict[int, tuple[str, int | None]]):
+    """Upsert {halaman: (content_hash, sop_id)} sekaligus."""
+    if not pages:
+        return
+    cur.executemany(
+        """
+        INSERT INTO dokumen_halaman (dokumen_id, halaman, content_hash, sop_id)
+        VALUES (%s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            content_hash = VALUES(content_hash),
+            sop_id = VALUES(sop_id)
+        """,
+        [(dokumen_id, hal, h, sop_id) for hal, (h, sop_id) in sorted(pages.items())],
+    )
+
+
+def delete_page_hashes(cur, dokumen_id: int, halaman_list):
+    halaman_list = sorted(halaman_list)
+    if not halaman_list:
+        return
+    placeholders = ", ".join(["%s"] * len(halaman_list))
+    cur.execute(
+        f"DELETE FROM dokumen_halaman WHERE dokumen_id = %s AND halaman IN ({placeholders})",
+        (dokumen_id, *halaman_list),
+    )
+
+
+def diff_pages(current: dict[int, str], stored: dict[int, tuple[str, int | None]]):
+    """
+    Bandingkan hash halaman sekarang dengan yang tersimpan.
+    Return (changed, removed): halaman baru/berubah dan halaman yang hilang.
+    """
+    changed = sorted(
+        hal for hal, h in current.items()
+        if hal not in stored or stored[hal][0] != h
+    )
+    removed = sorted(hal for hal in stored if hal not in current)
+    return changed, removed
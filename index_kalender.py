@@ -11,8 +11,16 @@ Strategi:
 5. Potong teks halaman menjadi beberapa chunk (max ~800 karakter)
 6. Simpan chunk ke dokumen_chunk
 7. Update dokumen_kb.status_indexing menjadi 'siap_embedding'
+8. Tahap embedding (asisten-mhs-api: python -m app.vector_index build)
+   mengisi dokumen_chunk.embedding_id lalu menandai dokumen 'sukses'
+
+Re-indexing bersifat inkremental: hash file & hash tiap halaman disimpan
+(lihat fingerprint_store.py). Dokumen yang file-nya tidak berubah dilewati,
+dan hanya halaman yang berubah yang di-extract ulang & chunk-nya diganti.
+Jalankan dengan --refresh untuk memeriksa ulang dokumen yang sudah di-index.
 """
 
+import argparse
 import os
 import re
 from typing import List
@@ -20,6 +28,19 @@ from typing import List
 import mysql.connector
 import pdfplumber
 
+from extraction_cache import ExtractionCache
+from fingerprint_store import (
+    delete_page_hashes,
+    diff_pages,
+    ensure_fingerprint_tables,
+    file_hash,
+    get_file_hash,
+    load_page_hashes,
+    page_hash,
+    save_file_hash,
+    save_page_hashes,
+)
+
 # ======================
 # KONFIGURASI (EDIT)
 # ======================
@@ -31,8 +52,12 @@ DB_CONFIG = {
     "database": "asisten_mhs",
 }
 
-# Root project-mu, supaya digabung dengan kolom `url` di dokumen_kb
-BASE_PROJECT_DIR = r"D:\ANGGI\joki\DANI\chatbot-va-usu"  # <-- GANTI sesuai path kamu
+# Root project chatbot, supaya digabung dengan path file di dokumen_kb
+# (bisa diganti lewat env CHATBOT_BASE_DIR)
+BASE_PROJECT_DIR = os.environ.get(
+    "CHATBOT_BASE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "chatbot-va-usu"),
+)
 
 STATUS_BELUM = "belum"
 STATUS_SIAP_EMBEDDING = "siap_embedding"
@@ -41,6 +66,10 @@ STATUS_GAGAL = "gagal"
 # Batas maksimal panjang chunk (karakter)
 MAX_CHARS_PER_CHUNK = 700
 
+# Halaman PDF kalender yang berisi agenda (1-based, inklusif)
+START_PAGE = 3
+END_PAGE = 7
+
 
 # ======================
 # FUNGSI UTIL
@@ -117,6 +146,19 @@ def get_pending_kalender_docs(cursor):
     return cursor.fetchall()
 
 
+def get_all_kalender_docs(cursor):
+    """Semua dokumen kalender (untuk refresh inkremental)."""
+    cursor.execute(
+        """
+        SELECT * FROM dokumen_kb
+        WHERE tipe = 'kalender_akademik'
+          AND status_indexing <> %s
+        """,
+        (STATUS_GAGAL,)
+    )
+    return cursor.fetchall()
+
+
 def update_status_indexing(cursor, dokumen_id: int, status: str):
     cursor.execute(
         "UPDATE dokumen_kb SET status_indexing = %s WHERE id = %s",
@@ -139,10 +181,119 @@ def insert_chunk(cursor, dokumen_id: int, sop_id, no_urut: int,
     )
 
 
+def delete_page_chunks(cursor, dokumen_id: int, halaman_list):
+    """Hapus chunk milik halaman-halaman tertentu dari satu dokumen."""
+    halaman_list = sorted(halaman_list)
+    if not halaman_list:
+        return
+    placeholders = ", ".join(["%s"] * len(halaman_list))
+    cursor.execute(
+        f"DELETE FROM dokumen_chunk WHERE dokumen_id = %s AND halaman IN ({placeholders})",
+        (dokumen_id, *halaman_list),
+    )
+
+
+def renumber_chunks(cursor, dokumen_id: int):
+    """Rapikan no_urut chunk dokumen (urut halaman, lalu urutan insert)."""
+    cursor.execute(
+        "SELECT id FROM dokumen_chunk WHERE dokumen_id = %s ORDER BY halaman, id",
+        (dokumen_id,),
+    )
+    rows = cursor.fetchall()
+    ids = [r["id"] if isinstance(r, dict) else r[0] for r in rows]
+    cursor.executemany(
+        "UPDATE dokumen_chunk SET no_urut = %s WHERE id = %s",
+        [(no, chunk_id) for no, chunk_id in enumerate(ids, start=1)],
+    )
+
+
+def page_chunks(page, detect=detect_bagian) -> tuple[str, List[str]]:
+    """Extract teks 1 halaman (CachedPage) → (bagian, daftar chunk)."""
+    raw_text = page.extract_text() or ""
+    if not raw_text.strip():
+        return "", []
+
+    cleaned = normalize_whitespace(raw_text)
+    if not cleaned:
+        return "", []
+
+    bagian = detect(cleaned.upper())
+    return bagian, chunk_text(cleaned, MAX_CHARS_PER_CHUNK)
+
+
 # ======================
 # PROSES UTAMA PER DOKUMEN
 # ======================
 
+def index_kalender_document(cursor, dokumen_id: int, pdf_path: str, sop_id=None,
+                            start_page: int = START_PAGE, end_page: int | None = END_PAGE,
+                            detect=detect_bagian) -> dict:
+    """
+    Chunk halaman start_page..end_page (None = sampai akhir) sebuah PDF ke
+    dokumen_chunk, hanya untuk halaman yang berubah. Tidak commit dan tidak
+    mengubah status_indexing; itu tugas pemanggil.
+
+    detect: fungsi teks UPPERCASE → bagian (kalender: detect_bagian).
+    Return ringkasan: halaman, halaman_berubah, chunk, dilewati.
+    """
+    pdf_hash = file_hash(pdf_path)
+    if get_file_hash(cursor, dokumen_id) == pdf_hash:
+        print("  [SKIP] File tidak berubah sejak indexing terakhir.")
+        return {"halaman": 0, "halaman_berubah": 0, "chunk": 0, "dilewati": True}
+
+    stored = load_page_hashes(cursor, dokumen_id)
+    n_chunks = 0
+    with pdfplumber.open(pdf_path) as pdf:
+        last_page = len(pdf.pages) if end_page is None else min(end_page, len(pdf.pages))
+        # HANYA PROSES HALAMAN start_page s.d. end_page
+        pages = {
+            page_num: pdf.pages[page_num - 1]
+            for page_num in range(start_page, last_page + 1)
+        }
+        current = {page_num: page_hash(page) for page_num, page in pages.items()}
+        changed, removed = diff_pages(current, stored)
+        print(f"  Halaman berubah: {changed} | halaman hilang: {removed}")
+
+        # chunk lama milik halaman berubah/hilang diganti
+        delete_page_chunks(cursor, dokumen_id, changed + removed)
+
+        # teks halaman diambil dari cache ekstraksi kalau sudah pernah di-extract
+        cache = ExtractionCache(pdf_path, pdf=pdf, pdf_hash=pdf_hash)
+        no_urut_global = 1
+        for page_num in changed:
+            page = cache.page(page_num)
+            bagian, chunks = page_chunks(page, detect)
+            page.save()
+
+            for c in chunks:
+                insert_chunk(
+                    cursor,
+                    dokumen_id=dokumen_id,
+                    sop_id=sop_id,
+                    no_urut=no_urut_global,
+                    isi_chunk=c,
+                    halaman=page_num,
+                    bagian=bagian,
+                )
+                no_urut_global += 1
+            n_chunks += len(chunks)
+
+    if changed or removed:
+        renumber_chunks(cursor, dokumen_id)
+
+    delete_page_hashes(cursor, dokumen_id, removed)
+    save_page_hashes(
+        cursor, dokumen_id, {hal: (h, None) for hal, h in current.items()}
+    )
+    save_file_hash(cursor, dokumen_id, pdf_hash)
+    return {
+        "halaman": len(current),
+        "halaman_berubah": len(changed),
+        "chunk": n_chunks,
+        "dilewati": False,
+    }
+
+
 def process_document(conn, doc: dict):
     cursor = conn.cursor(dictionary=True)
 
@@ -161,37 +312,12 @@ def process_document(conn, doc: dict):
         return
 
     try:
-        no_urut_global = 1
-
-        import pdfplumber
-        with pdfplumber.open(pdf_path) as pdf:
-            for page_num, page in enumerate(pdf.pages, start=1):
-                # HANYA PROSES HALAMAN 3 s.d. 7
-                if page_num < 3 or page_num > 7:
-                    continue
-
-                raw_text = page.extract_text() or ""
-                if not raw_text.strip():
-                    continue
-
-                cleaned = normalize_whitespace(raw_text)
-                if not cleaned:
-                    continue
-
-                bagian = detect_bagian(cleaned.upper())
-                chunks = chunk_text(cleaned, MAX_CHARS_PER_CHUNK)
-
-                for c in chunks:
-                    insert_chunk(
-                        cursor,
-                        dokumen_id=dokumen_id,
-                        sop_id=sop_id,
-                        no_urut=no_urut_global,
-                        isi_chunk=c,
-                        halaman=page_num,
-                        bagian=bagian,
-                    )
-                    no_urut_global += 1
+        stats = index_kalender_document(cursor, dokumen_id, pdf_path, sop_id=sop_id)
+        if stats["dilewati"]:
+            if doc.get("status_indexing") == STATUS_BELUM:
+                update_status_indexing(cursor, dokumen_id, STATUS_SIAP_EMBEDDING)
+                conn.commit()
+            return
 
         update_status_indexing(cursor, dokumen_id, STATUS_SIAP_EMBEDDING)
         conn.commit()
@@ -204,14 +330,15 @@ def process_document(conn, doc: dict):
         cursor.close()
 
 
-def main():
+def main(refresh: bool = False):
     conn = get_db_connection()
     cur = conn.cursor(dictionary=True)
-    docs = get_pending_kalender_docs(cur)
+    ensure_fingerprint_tables(cur)
+    docs = get_all_kalender_docs(cur) if refresh else get_pending_kalender_docs(cur)
     cur.close()
 
     if not docs:
-        print("Tidak ada dokumen kalender_akademik dengan status_indexing = 'belum'.")
+        print("Tidak ada dokumen kalender_akademik yang perlu diproses.")
         conn.close()
         return
 
@@ -224,4 +351,12 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Indexing kalender akademik ke dokumen_chunk.")
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Periksa ulang semua dokumen kalender (bukan hanya yang 'belum'); "
+             "dokumen/halaman yang tidak berubah dilewati",
+    )
+    args = parser.parse_args()
+    main(refresh=args.refresh)
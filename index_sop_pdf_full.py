@@ -1,13 +1,37 @@
+import argparse
+import bisect
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
 import pdfplumber
 import mysql.connector
-import re
+
+from db_writer import BATCH_SIZE, SopBatchWriter
+from extraction_cache import ExtractionCache
+from fingerprint_store import (
+    delete_page_hashes,
+    diff_pages,
+    ensure_fingerprint_tables,
+    file_hash,
+    get_file_hash,
+    load_page_hashes,
+    page_hash,
+    save_file_hash,
+    save_page_hashes,
+)
 
 # =========================
 # KONFIGURASI
 # =========================
 
-PDF_PATH = r"D:\ANGGI\dani\chatbot-va-usu\storage\dokumen\SOP-ULT-2023.pdf"
-DOKUMEN_ID = 1  # id di tabel dokumen_kb untuk SOP-ULT-2023.pdf
+# Root project chatbot (tempat folder storage/), bisa diganti lewat env
+BASE_PROJECT_DIR = os.environ.get(
+    "CHATBOT_BASE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "chatbot-va-usu"),
+)
+PDF_PATH = os.path.join(BASE_PROJECT_DIR, "storage", "dokumen", "SOP-ULT-2023.pdf")
+DOKUMEN_ID = 1  # id di tabel dokumen_kb untuk SOP-ULT-2023.pdf (default CLI)
 
 DB_CONFIG = {
     "host": "localhost",
@@ -20,6 +44,11 @@ DB_CONFIG = {
 START_PAGE = 9
 END_PAGE = 120
 
+# Jumlah proses untuk analisis halaman (deteksi judul + ekstraksi tabel).
+# 1 = serial seperti biasa; >1 = halaman dibagi ke process pool, lalu hasilnya
+# digabung kembali sesuai urutan halaman sebelum diproses state machine SOP.
+PAGE_WORKERS = 1
+
 
 # =========================
 # FUNGSI BANTU
@@ -160,6 +189,144 @@ def detect_judul_with_y(page) -> tuple[str | None, float | None]:
     return None, None
 
 
+def analyze_page(page, page_no_display: int) -> dict:
+    """
+    Analisis 1 halaman: judul SOP (+ posisi Y) dan semua tabelnya.
+
+    page adalah CachedPage (extraction_cache), jadi extract_words / tabel
+    diambil dari cache kalau sudah pernah dihitung untuk PDF yang sama.
+    Hasilnya hanya berisi data biasa (str/float/list) supaya bisa dikirim
+    antar-proses. Tabel sudah di-extract dan diurutkan berdasarkan posisi top.
+    """
+    title, title_y = detect_judul_with_y(page)
+    table_objs = sorted(page.tables(), key=lambda t: t["bbox"][1])  # sort by top
+
+    tables = [{"bbox": t["bbox"], "rows": t["rows"]} for t in table_objs]
+    return {
+        "halaman": page_no_display,
+        "judul": title,
+        "judul_y": title_y,
+        "tabel": tables,
+    }
+
+
+# Cache ekstraksi yang dibuka oleh tiap worker process (diisi oleh _init_page_worker)
+_worker_cache = None
+
+
+def _init_page_worker(pdf_path: str, pdf_hash: str, use_cache: bool):
+    global _worker_cache
+    _worker_cache = ExtractionCache(pdf_path, pdf_hash=pdf_hash, enabled=use_cache)
+
+
+def _analyze_page_in_worker(page_idx: int) -> dict:
+    page = _worker_cache.page(page_idx + 1)
+    result = analyze_page(page, page_idx + 1)
+    page.close()  # simpan ke cache + buang cache layout, worker memproses banyak halaman
+    return result
+
+
+def iter_page_results(cache: ExtractionCache, page_indices, workers: int = 1):
+    """
+    Hasil analyze_page untuk page_indices, SELALU dalam urutan halaman.
+
+    workers > 1: analisis dijalankan paralel di process pool (tiap worker
+    membuka cache/PDF sendiri); executor.map menjaga urutan hasil sehingga
+    tahap merge (state machine SOP) tetap deterministik.
+    """
+    page_indices = list(page_indices)
+
+    if workers <= 1 or len(page_indices) <= 1:
+        for page_idx in page_indices:
+            page = cache.page(page_idx + 1)
+            result = analyze_page(page, page_idx + 1)
+            page.save()
+            yield result
+        return
+
+    chunksize = max(1, len(page_indices) // (workers * 4))
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_page_worker,
+        initargs=(cache.pdf_path, cache.pdf_hash, cache.enabled),
+    ) as executor:
+        yield from executor.map(
+            _analyze_page_in_worker, page_indices, chunksize=chunksize
+        )
+
+
+def build_sop_rows(sop_dict: dict, kode_sop: str, judul_sop: str,
+                   unit_layanan_id: int):
+    """
+    Ubah 1 SOP hasil parsing menjadi baris-baris DB.
+
+    Return (sop_row, komponen_rows, step_rows, chunk_rows) dalam bentuk dict,
+    siap ditampung oleh SopBatchWriter.add_sop.
+    """
+    halaman_awal = sop_dict["halaman_awal"]
+    komponen_text = sop_dict["komponen_text"]
+
+    # tanpa deskripsi_singkat & tanpa tanggal_berlaku & tanpa halaman_pdf
+    sop_row = {
+        "kode_sop": kode_sop,
+        "judul_sop": judul_sop,
+        "unit_layanan_id": unit_layanan_id,
+        "kategori_layanan": None,  # diisi kemudian via UPDATE
+        "sasaran_layanan": None,   # diisi kemudian via UPDATE
+        "file_url": "storage/dokumen/sop/SOP-ULT-2023.pdf",
+    }
+    komponen_rows = []
+    step_rows = []
+    chunk_rows = []
+
+    no_chunk = 1
+
+    # sop_komponen + chunk komponen
+    for jenis, teks in komponen_text.items():
+        if not teks:
+            continue
+
+        mapping_cfg = KOMPONEN_MAPPING.get(jenis, {})
+        judul_komp = mapping_cfg.get("judul_komp", jenis)
+
+        isi = norm(teks)
+
+        komponen_rows.append(
+            {"jenis": jenis, "judul": judul_komp, "isi": isi, "halaman": halaman_awal}
+        )
+        chunk_rows.append(
+            {
+                "no_urut": no_chunk,
+                "isi_chunk": f"{judul_sop} - {judul_komp}: {isi}",
+                "halaman": halaman_awal,
+                "bagian": jenis,
+            }
+        )
+        no_chunk += 1
+
+    # sop_step dari sistem_prosedur + chunk langkah
+    sistem_text = komponen_text.get("sistem_prosedur", "")
+    step_no = 1
+    for langkah in split_langkah(sistem_text):
+        langkah = norm(langkah)
+        if not langkah:
+            continue
+
+        step_rows.append({"no_urut": step_no, "deskripsi": langkah})
+        chunk_rows.append(
+            {
+                "no_urut": no_chunk,
+                "isi_chunk": f"{judul_sop} - Langkah {step_no}: {langkah}",
+                "halaman": halaman_awal,
+                "bagian": "langkah",
+            }
+        )
+        no_chunk += 1
+        step_no += 1
+
+    return sop_row, komponen_rows, step_rows, chunk_rows
+
+
 def get_or_create_unit_ult(cur) -> int:
     """Pastikan ada unit_layanan 'Unit Layanan Terpadu', return id-nya."""
     cur.execute(
@@ -177,281 +344,350 @@ def get_or_create_unit_ult(cur) -> int:
     return cur.lastrowid
 
 
+def process_table_into(sop_dict: dict, tbl: dict):
+    """Parse 1 tabel (hasil analyze_page) dan gabungkan ke komponen_text SOP."""
+    rows = tbl["rows"]
+    if not rows:
+        return
+
+    header_row = rows[0]
+    komponen_idx = 1
+    uraian_idx = 2
+    start_row = 0
+
+    header_text = " ".join((c or "") for c in header_row).lower()
+    if "komponen" in header_text or "uraian" in header_text:
+        for i, cell in enumerate(header_row):
+            cell_l = (cell or "").lower()
+            if "komponen" in cell_l:
+                komponen_idx = i
+            if "uraian" in cell_l:
+                uraian_idx = i
+        start_row = 1  # skip header
+
+    for row in rows[start_row:]:
+        if len(row) <= max(komponen_idx, uraian_idx):
+            continue
+
+        komponen = norm(row[komponen_idx])
+        uraian = norm(row[uraian_idx])
+
+        if not komponen or not uraian:
+            continue
+
+        jenis = map_komponen_to_jenis(komponen)
+        if jenis is None:
+            continue
+
+        prev = sop_dict["komponen_text"].get(jenis, "")
+        if prev:
+            if uraian not in prev:
+                sop_dict["komponen_text"][jenis] = (prev + " " + uraian).strip()
+        else:
+            sop_dict["komponen_text"][jenis] = uraian
+
+
+def iter_sops(page_results):
+    """
+    State machine SOP: gabungkan hasil analisis halaman (urut halaman)
+    menjadi SOP utuh. Yield dict SOP setiap kali sebuah SOP selesai:
+    {"judul", "no", "halaman_awal", "komponen_text"}.
+    """
+    current_sop = None
+    sop_counter = 0  # hanya untuk log; kode_sop pakai nomor di judul
+
+    for page_result in page_results:
+        page_no_display = page_result["halaman"]
+        title = page_result["judul"]
+        title_y = page_result["judul_y"]
+        table_objs = page_result["tabel"]
+
+        print(f"[PAGE] {page_no_display} | title={title} | title_y={title_y}")
+
+        # ----- KASUS: halaman mengandung judul SOP baru -----
+        if title:
+            # parsing nomor SOP dari judul
+            m_no = re.match(r"\s*(\d+)\.", title)
+            no_sop = int(m_no.group(1)) if m_no else None
+
+            if current_sop is not None:
+                # sudah ada SOP sebelumnya; judul baru berarti SOP lama selesai
+                # tabel di atas judul baru → milik SOP lama
+                for t in table_objs:
+                    t_bottom = t["bbox"][3]
+                    if title_y is not None and t_bottom <= title_y:
+                        process_table_into(current_sop, t)
+                yield current_sop
+
+            # mulai SOP baru
+            current_sop = {
+                "judul": title,
+                "no": no_sop,
+                "halaman_awal": page_no_display,
+                "komponen_text": {k: "" for k in KOMPONEN_MAPPING.keys()},
+            }
+            sop_counter += 1
+            print(f"  [NEW] SOP no {no_sop} (#{sop_counter}) dimulai di halaman ini.")
+
+            # tabel di bawah judul baru (top >= title_y) → milik SOP baru
+            for t in table_objs:
+                t_top = t["bbox"][1]
+                if title_y is None or t_top >= title_y:
+                    process_table_into(current_sop, t)
+            continue
+
+        # ----- KASUS: halaman TANPA judul SOP baru -----
+        if current_sop is not None:
+            # semua tabel di halaman ini milik SOP yang sedang aktif
+            for t in table_objs:
+                process_table_into(current_sop, t)
+
+    # SOP terakhir
+    if current_sop is not None:
+        yield current_sop
+
+
+def write_sop(writer: SopBatchWriter, sop_dict: dict, urutan: int,
+              unit_ult_id: int) -> str:
+    """Tampung 1 SOP ke writer (sop, sop_komponen, sop_step, dokumen_chunk). Return kode_sop."""
+    raw_title = sop_dict["judul"]
+    halaman_awal = sop_dict["halaman_awal"]
+    komponen_text = sop_dict["komponen_text"]
+    no_sop = sop_dict["no"]
+
+    # Bersihkan nomor di depan judul untuk field judul_sop
+    m = re.match(r"^\s*(\d+)[\.\)]\s*(.*)$", raw_title)
+    if m:
+        judul_sop = m.group(2).strip()
+    else:
+        judul_sop = raw_title.strip()
+
+    if no_sop is None:
+        no_sop = urutan
+    kode_sop = f"SOP-ULT-{no_sop:03d}"
+
+    missing = [j for j, v in komponen_text.items() if not v]
+    print(
+        f"[FLUSH] SOP no {no_sop} (#{urutan}): {judul_sop} "
+        f"(hal {halaman_awal}) | missing komponen: {missing}"
+    )
+
+    sop_row, komponen_rows, step_rows, chunk_rows = build_sop_rows(
+        sop_dict, kode_sop, judul_sop, unit_ult_id
+    )
+    writer.add_sop(sop_row, komponen_rows, step_rows, chunk_rows)
+    return kode_sop
+
+
+def delete_sops(cur, sop_ids):
+    """Hapus SOP lama beserta chunk-nya (sop_komponen & sop_step ikut via CASCADE)."""
+    sop_ids = sorted(set(sop_ids))
+    if not sop_ids:
+        return
+    placeholders = ", ".join(["%s"] * len(sop_ids))
+    cur.execute(
+        f"DELETE FROM dokumen_chunk WHERE sop_id IN ({placeholders})", tuple(sop_ids)
+    )
+    cur.execute(f"DELETE FROM sop WHERE id IN ({placeholders})", tuple(sop_ids))
+
+
+# =========================
+# MODE INDEXING
+# =========================
+
+def index_all_pages(cache, cur, writer, unit_ult_id, page_indices, workers):
+    """
+    Indexing penuh: hapus semua chunk dokumen ini lalu proses semua halaman.
+    SOP lama dokumen ini yang tidak ditulis ulang (hilang / ganti nomor di
+    PDF baru) ikut dihapus beserta komponen & step-nya.
+    Return {halaman_awal: sop_id} untuk setiap SOP.
+    """
+    cur.execute(
+        """
+        SELECT sop_id FROM dokumen_halaman WHERE dokumen_id = %s AND sop_id IS NOT NULL
+        UNION
+        SELECT sop_id FROM dokumen_chunk WHERE dokumen_id = %s AND sop_id IS NOT NULL
+        """,
+        (writer.dokumen_id, writer.dokumen_id),
+    )
+    old_sop_ids = {row[0] for row in cur.fetchall()}
+    cur.execute("DELETE FROM dokumen_chunk WHERE dokumen_id = %s", (writer.dokumen_id,))
+
+    starts = {}
+    page_results = iter_page_results(cache, page_indices, workers)
+    for urutan, sop_dict in enumerate(iter_sops(page_results), start=1):
+        starts[sop_dict["halaman_awal"]] = write_sop(writer, sop_dict, urutan, unit_ult_id)
+
+    writer.flush()
+    page_sop = {hal: writer.sop_ids[kode] for hal, kode in starts.items()}
+    delete_sops(cur, old_sop_ids - set(page_sop.values()))
+    return page_sop
+
+
+def index_changed_pages(cache, cur, writer, unit_ult_id, workers,
+                        current_hashes, stored):
+    """
+    Indexing inkremental: hanya SOP yang menyentuh halaman berubah/hilang
+    yang di-parse ulang. Halaman lain tidak di-extract sama sekali.
+
+    Sebuah halaman p bisa berisi tabel milik SOP yang judulnya terakhir
+    muncul sebelum p (tabel di atas judul) dan milik SOP yang dimulai di p.
+    SOP-SOP itu (versi lama dan versi baru) dihapus lalu dibangun ulang
+    dari halaman awalnya sampai halaman judul SOP berikutnya.
+
+    Return {halaman_awal: sop_id} untuk semua SOP dokumen (lama + baru).
+    """
+    changed, removed = diff_pages(current_hashes, stored)
+    print(f"Halaman berubah: {changed} | halaman hilang: {removed}")
+
+    analyzed = {}
+
+    def analyze(halaman_list):
+        todo = [h for h in halaman_list if h not in analyzed]
+        for r in iter_page_results(cache, [h - 1 for h in todo], workers):
+            analyzed[r["halaman"]] = r
+
+    analyze(changed)
+
+    old_titles = sorted(h for h, (_, sop_id) in stored.items() if sop_id is not None)
+    new_titles = sorted(
+        h for h in current_hashes
+        if (h in analyzed and analyzed[h]["judul"])
+        or (h not in analyzed and stored[h][1] is not None)
+    )
+
+    def owners(titles, p):
+        """Halaman awal SOP yang bisa memiliki tabel di halaman p."""
+        i = bisect.bisect_right(titles, p)
+        result = set(titles[max(0, i - 2):i])
+        return result if p in titles else set(titles[i - 1:i])
+
+    affected_old, affected_new = set(), set()
+    for p in changed + removed:
+        affected_old |= owners(old_titles, p)
+        affected_new |= owners(new_titles, p)
+
+    delete_sops(cur, [stored[h][1] for h in affected_old])
+
+    last_page = max(current_hashes)
+    starts = {}
+    for s in sorted(affected_new):
+        i = bisect.bisect_right(new_titles, s)
+        end = new_titles[i] if i < len(new_titles) else last_page
+        segment = list(range(s, end + 1))
+        analyze(segment)
+
+        sop_dict = next(iter_sops(analyzed[h] for h in segment))
+        starts[s] = write_sop(writer, sop_dict, new_titles.index(s) + 1, unit_ult_id)
+
+    writer.flush()
+    page_sop = {h: stored[h][1] for h in new_titles if h not in starts}
+    page_sop.update({h: writer.sop_ids[kode] for h, kode in starts.items()})
+    return page_sop
+
+
 # =========================
 # MAIN INDEXING
 # =========================
 
-def main():
-    conn = mysql.connector.connect(**DB_CONFIG)
+def index_sop_document(conn, dokumen_id: int, pdf_path: str,
+                       workers: int = PAGE_WORKERS, batch_size: int = BATCH_SIZE,
+                       full: bool = False, use_cache: bool = True) -> dict:
+    """
+    Index 1 dokumen SOP (PDF) ke tabel sop, sop_komponen, sop_step dan
+    dokumen_chunk. Semua baris dokumen ini ditulis dalam 1 transaksi yang
+    TIDAK di-commit di sini; pemanggil yang commit (bersama update status
+    dokumen_kb).
+
+    Return ringkasan: halaman, sop, baris, dilewati.
+    """
     cur = conn.cursor(buffered=True)
 
+    ensure_fingerprint_tables(cur)
     unit_ult_id = get_or_create_unit_ult(cur)
     conn.commit()
 
-    with pdfplumber.open(PDF_PATH) as pdf:
+    pdf_hash = file_hash(pdf_path)
+    if not full and get_file_hash(cur, dokumen_id) == pdf_hash:
+        print("Dokumen tidak berubah sejak indexing terakhir, dilewati.")
+        cur.close()
+        return {"halaman": 0, "sop": 0, "baris": 0, "dilewati": True}
+
+    # semua baris SOP ditampung & dikirim per batch; 1 commit untuk 1 dokumen.
+    # replace_existing: SOP dengan kode_sop sama diganti, bukan diduplikasi.
+    writer = SopBatchWriter(
+        conn, dokumen_id, batch_size=batch_size, replace_existing=True
+    )
+
+    with pdfplumber.open(pdf_path) as pdf:
         num_pages = len(pdf.pages)
         print(f"PDF memiliki {num_pages} halaman.")
 
-        current_sop = None
-        sop_counter = 0  # hanya untuk log; kode_sop pakai nomor di judul
-
-        def flush_current_sop():
-            """Simpan SOP aktif ke DB (sop, sop_komponen, sop_step, dokumen_chunk)."""
-            nonlocal sop_counter, current_sop
+        page_indices = range(START_PAGE - 1, min(END_PAGE, num_pages))
+        if workers > 1:
+            print(f"Analisis halaman paralel dengan {workers} worker.")
 
-            if not current_sop:
-                return
+        current_hashes = {idx + 1: page_hash(pdf.pages[idx]) for idx in page_indices}
+        stored = load_page_hashes(cur, dokumen_id)
 
-            raw_title = current_sop["judul"]
-            halaman_awal = current_sop["halaman_awal"]
-            komponen_text = current_sop["komponen_text"]
-            no_sop = current_sop["no"]
+        # hasil extract_words / find_tables diambil dari cache disk kalau ada
+        cache = ExtractionCache(pdf_path, pdf=pdf, pdf_hash=pdf_hash, enabled=use_cache)
+        if full or not stored:
+            page_sop = index_all_pages(
+                cache, cur, writer, unit_ult_id, page_indices, workers
+            )
+        else:
+            page_sop = index_changed_pages(
+                cache, cur, writer, unit_ult_id, workers, current_hashes, stored
+            )
+        if use_cache and workers <= 1:
+            print(f"Cache ekstraksi: {cache.hits} hit, {cache.misses} miss.")
+
+    # simpan sidik jari halaman & file untuk run berikutnya
+    delete_page_hashes(cur, dokumen_id, set(stored) - set(current_hashes))
+    save_page_hashes(
+        cur,
+        dokumen_id,
+        {hal: (h, page_sop.get(hal)) for hal, h in current_hashes.items()},
+    )
+    save_file_hash(cur, dokumen_id, pdf_hash)
 
-            # Bersihkan nomor di depan judul untuk field judul_sop
-            m = re.match(r"^\s*(\d+)[\.\)]\s*(.*)$", raw_title)
-            if m:
-                judul_sop = m.group(2).strip()
-            else:
-                judul_sop = raw_title.strip()
+    writer.flush()
+    writer.close()
+    cur.close()
+    return {
+        "halaman": len(current_hashes),
+        "sop": len(page_sop),
+        "baris": writer.total_rows,
+        "dilewati": False,
+    }
 
-            sop_counter += 1
-            if no_sop is None:
-                no_sop = sop_counter
-            kode_sop = f"SOP-ULT-{no_sop:03d}"
-
-            missing = [j for j, v in komponen_text.items() if not v]
-            print(
-                f"[FLUSH] SOP no {no_sop} (#{sop_counter}): {judul_sop} "
-                f"(hal {halaman_awal}) | missing komponen: {missing}"
-            )
 
-                        # 1) insert ke sop (tanpa deskripsi_singkat & tanpa tanggal_berlaku & tanpa halaman_pdf)
-            cur.execute(
-                """
-                INSERT INTO sop
-                    (kode_sop, judul_sop, unit_layanan_id,
-                     kategori_layanan, sasaran_layanan,
-                     file_url)
-                VALUES
-                    (%s, %s, %s,
-                     %s, %s,
-                     %s)
-                """,
-                (
-                    kode_sop,
-                    judul_sop,
-                    unit_ult_id,
-                    None,   # kategori_layanan (diisi kemudian via UPDATE)
-                    None,   # sasaran_layanan (diisi kemudian via UPDATE)
-                    "storage/dokumen/sop/SOP-ULT-2023.pdf",
-                ),
-            )
-            sop_id = cur.lastrowid
-
-            no_chunk = 1
-
-            # 2) sop_komponen + chunk komponen
-            for jenis, teks in komponen_text.items():
-                if not teks:
-                    continue
-
-                mapping_cfg = KOMPONEN_MAPPING.get(jenis, {})
-                judul_komp = mapping_cfg.get("judul_komp", jenis)
-
-                isi = norm(teks)
-
-                # sop_komponen
-                cur.execute(
-                    """
-                    INSERT INTO sop_komponen (sop_id, jenis, judul, isi, halaman)
-                    VALUES (%s, %s, %s, %s, %s)
-                    """,
-                    (sop_id, jenis, judul_komp, isi, halaman_awal),
-                )
-
-                # dokumen_chunk untuk komponen
-                isi_chunk = f"{judul_sop} - {judul_komp}: {isi}"
-                cur.execute(
-                    """
-                    INSERT INTO dokumen_chunk
-                        (dokumen_id, sop_id, no_urut, isi_chunk, halaman, bagian)
-                    VALUES
-                        (%s, %s, %s, %s, %s, %s)
-                    """,
-                    (DOKUMEN_ID, sop_id, no_chunk, isi_chunk, halaman_awal, jenis),
-                )
-                no_chunk += 1
-
-            # 3) sop_step dari sistem_prosedur + chunk langkah
-            sistem_text = komponen_text.get("sistem_prosedur", "")
-            langkah_list = split_langkah(sistem_text)
-            step_no = 1
-            for langkah in langkah_list:
-                langkah = norm(langkah)
-                if not langkah:
-                    continue
-
-                # sop_step
-                cur.execute(
-                    """
-                    INSERT INTO sop_step (sop_id, no_urut, deskripsi)
-                    VALUES (%s, %s, %s)
-                    """,
-                    (sop_id, step_no, langkah),
-                )
-
-                # dokumen_chunk untuk langkah
-                isi_step_chunk = f"{judul_sop} - Langkah {step_no}: {langkah}"
-                cur.execute(
-                    """
-                    INSERT INTO dokumen_chunk
-                        (dokumen_id, sop_id, no_urut, isi_chunk, halaman, bagian)
-                    VALUES
-                        (%s, %s, %s, %s, %s, %s)
-                    """,
-                    (
-                        DOKUMEN_ID,
-                        sop_id,
-                        no_chunk,
-                        isi_step_chunk,
-                        halaman_awal,
-                        "langkah",
-                    ),
-                )
-                no_chunk += 1
-                step_no += 1
-
-            conn.commit()
-            current_sop = None
-
-        # =========================
-        # LOOP HALAMAN START_PAGE–END_PAGE
-        # =========================
-        for page_idx in range(START_PAGE - 1, min(END_PAGE, num_pages)):
-            page_no_display = page_idx + 1
-            page = pdf.pages[page_idx]
-
-            title, title_y = detect_judul_with_y(page)
-            table_objs = page.find_tables()
-            table_objs = sorted(table_objs, key=lambda t: t.bbox[1])  # sort by top
-
-            print(f"[PAGE] {page_no_display} | title={title} | title_y={title_y}")
-
-            def process_table_into(sop_dict, tbl_obj):
-                """Parse 1 tabel dan gabungkan ke komponen_text SOP yang diberikan."""
-                rows = tbl_obj.extract()
-                if not rows:
-                    return
-
-                header_row = rows[0]
-                komponen_idx = 1
-                uraian_idx = 2
-                start_row = 0
-
-                header_text = " ".join((c or "") for c in header_row).lower()
-                if "komponen" in header_text or "uraian" in header_text:
-                    for i, cell in enumerate(header_row):
-                        cell_l = (cell or "").lower()
-                        if "komponen" in cell_l:
-                            komponen_idx = i
-                        if "uraian" in cell_l:
-                            uraian_idx = i
-                    start_row = 1  # skip header
-
-                for row in rows[start_row:]:
-                    if len(row) <= max(komponen_idx, uraian_idx):
-                        continue
-
-                    komponen = norm(row[komponen_idx])
-                    uraian = norm(row[uraian_idx])
-
-                    if not komponen or not uraian:
-                        continue
-
-                    jenis = map_komponen_to_jenis(komponen)
-                    if jenis is None:
-                        continue
-
-                    prev = sop_dict["komponen_text"].get(jenis, "")
-                    if prev:
-                        if uraian not in prev:
-                            sop_dict["komponen_text"][jenis] = (
-                                prev + " " + uraian
-                            ).strip()
-                    else:
-                        sop_dict["komponen_text"][jenis] = uraian
-
-            # ----- KASUS: halaman mengandung judul SOP baru -----
-            if title:
-                # parsing nomor SOP dari judul
-                m_no = re.match(r"\s*(\d+)\.", title)
-                no_sop = int(m_no.group(1)) if m_no else None
-
-                if current_sop is None:
-                    # SOP pertama dimulai di halaman ini
-                    current_sop = {
-                        "judul": title,
-                        "no": no_sop,
-                        "halaman_awal": page_no_display,
-                        "komponen_text": {k: "" for k in KOMPONEN_MAPPING.keys()},
-                    }
-                    sop_counter += 1
-                    print(f"  [NEW] SOP no {no_sop} (#{sop_counter}) dimulai di halaman ini.")
-
-                    # semua tabel dengan top >= title_y dianggap milik SOP ini
-                    for t in table_objs:
-                        t_top = t.bbox[1]
-                        if title_y is None or t_top >= title_y:
-                            process_table_into(current_sop, t)
-                    continue
-
-                else:
-                    # sudah ada SOP sebelumnya; judul baru berarti SOP lama selesai
-                    # 1) tabel di atas judul baru → milik SOP lama
-                    for t in table_objs:
-                        t_top, t_bottom = t.bbox[1], t.bbox[3]
-                        if title_y is not None and t_bottom <= title_y:
-                            process_table_into(current_sop, t)
-
-                    # 2) flush SOP lama
-                    flush_current_sop()
-
-                    # 3) mulai SOP baru
-                    current_sop = {
-                        "judul": title,
-                        "no": no_sop,
-                        "halaman_awal": page_no_display,
-                        "komponen_text": {k: "" for k in KOMPONEN_MAPPING.keys()},
-                    }
-                    sop_counter += 1
-                    print(f"  [NEW] SOP no {no_sop} (#{sop_counter}) dimulai di halaman ini.")
-
-                    # 4) tabel di bawah judul baru → milik SOP baru
-                    for t in table_objs:
-                        t_top = t.bbox[1]
-                        if title_y is None or t_top >= title_y:
-                            process_table_into(current_sop, t)
-                    continue
-
-            # ----- KASUS: halaman TANPA judul SOP baru -----
-            if not title and current_sop is not None:
-                # semua tabel di halaman ini milik SOP yang sedang aktif
-                for t in table_objs:
-                    process_table_into(current_sop, t)
+def main(workers: int = PAGE_WORKERS, batch_size: int = BATCH_SIZE,
+         full: bool = False, use_cache: bool = True,
+         pdf_path: str = PDF_PATH, dokumen_id: int = DOKUMEN_ID):
+    conn = mysql.connector.connect(**DB_CONFIG)
 
-        # flush SOP terakhir
-        flush_current_sop()
+    stats = index_sop_document(
+        conn, dokumen_id, pdf_path,
+        workers=workers, batch_size=batch_size, full=full, use_cache=use_cache,
+    )
+    if stats["dilewati"]:
+        conn.close()
+        return
 
-    # update status dokumen_kb
+    # update status dokumen_kb, commit bersama seluruh baris SOP dokumen ini
+    cur = conn.cursor()
     cur.execute(
         """
         UPDATE dokumen_kb
         SET status_indexing = 'sukses'
         WHERE id = %s
         """,
-        (DOKUMEN_ID,),
+        (dokumen_id,),
     )
     conn.commit()
+    print(f"Total baris ditulis: {stats['baris']}")
 
     cur.close()
     conn.close()
@@ -459,4 +695,46 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Indexing SOP-ULT PDF ke database.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=PAGE_WORKERS,
+        help="Jumlah proses untuk analisis halaman (default: %(default)s = serial)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=BATCH_SIZE,
+        help="Jumlah baris per batch insert ke DB (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Abaikan sidik jari halaman dan index ulang seluruh dokumen",
+    )
+    parser.add_argument(
+        "--pdf",
+        default=PDF_PATH,
+        help="Path file PDF SOP (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--dokumen-id",
+        type=int,
+        default=DOKUMEN_ID,
+        help="id dokumen_kb untuk PDF ini (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Jangan pakai cache ekstraksi di disk (selalu extract dari PDF)",
+    )
+    args = parser.parse_args()
+    main(
+        workers=args.workers,
+        batch_size=args.batch_size,
+        full=args.full,
+        use_cache=not args.no_cache,
+        pdf_path=args.pdf,
+        dokumen_id=args.dokumen_id,
+    )
@@ -0,0 +1,418 @@
+"""
+Daemon indexing dokumen_kb.
+
+Alur:
+1. Polling dokumen_kb dengan status_indexing = 'belum' (pakai index
+   idx_dokumen_kb_status, jadi murah walau dijalankan tiap beberapa detik)
+2. Klaim dokumen secara atomik: UPDATE ... SET status_indexing = 'proses'
+   WHERE id = ? AND status_indexing = 'belum'. Hanya satu daemon yang
+   berhasil mengklaim (rowcount = 1), jadi aman dijalankan lebih dari satu.
+3. Pilih extractor berdasarkan kolom kategori (SOP, kalender, PDF umum)
+4. Jalankan beberapa dokumen sekaligus di process pool berukuran tetap
+5. Tulis status akhir + ringkasan waktu ke catatan, dalam transaksi yang
+   sama dengan hasil indexing. Extractor yang menghasilkan dokumen_chunk
+   berakhir di 'siap_embedding' (seperti index_kalender.main); status
+   'sukses' baru diberikan oleh `python -m app.vector_index build` setelah
+   chunk-nya punya embedding. Gagal -> 'gagal'.
+
+Extractor baru cukup didaftarkan dengan @register_extractor("kategori").
+"""
+
+import argparse
+import os
+import signal
+import socket
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+
+import mysql.connector
+
+import index_kalender
+import index_sop_pdf_full
+from fingerprint_store import ensure_fingerprint_tables
+
+# ======================
+# KONFIGURASI
+# ======================
+
+DB_CONFIG = {
+    "host": "localhost",
+    "user": "root",
+    "password": "",
+    "database": "asisten_mhs",
+}
+
+# Root project chatbot; kolom file_path di dokumen_kb relatif terhadap folder ini
+BASE_PROJECT_DIR = os.environ.get(
+    "CHATBOT_BASE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "chatbot-va-usu"),
+)
+
+# Jumlah dokumen yang diproses bersamaan (1 proses per dokumen)
+MAX_WORKERS = 2
+
+# Jeda polling saat antrian kosong (detik)
+POLL_INTERVAL = 2.0
+
+# Dokumen yang tertahan di 'proses' lebih lama dari ini (mis. daemon mati
+# di tengah jalan) dikembalikan ke 'belum' saat daemon start. 0 = nonaktif.
+RECLAIM_AFTER = 30 * 60
+
+STATUS_BELUM = "belum"
+STATUS_PROSES = "proses"
+STATUS_SIAP_EMBEDDING = "siap_embedding"
+STATUS_SUKSES = "sukses"
+STATUS_GAGAL = "gagal"
+
+# Panjang maksimal catatan (kolom TEXT, tapi jangan simpan traceback utuh)
+MAX_CATATAN = 2000
+
+
+# ======================
+# REGISTRY EXTRACTOR
+# ======================
+
+# kategori (sudah dinormalisasi) -> fungsi extractor
+EXTRACTORS = {}
+
+# fungsi extractor -> status akhir dokumen kalau extractor berhasil
+FINAL_STATUS = {}
+
+# dipakai kalau kategori tidak dikenal tapi file-nya PDF
+DEFAULT_PDF_EXTRACTOR = "pdf"
+
+
+def normalize_kategori(kategori) -> str:
+    return "_".join((kategori or "").strip().lower().split())
+
+
+def register_extractor(*kategori_list, final_status: str = STATUS_SIAP_EMBEDDING):
+    """
+    Daftarkan extractor untuk satu/lebih nilai kategori dokumen_kb.
+
+    Signature extractor: fn(conn, doc: dict, path: str) -> dict ringkasan.
+    Extractor TIDAK boleh commit hasil indexing; daemon yang commit bersama
+    update status_indexing & catatan.
+
+    final_status: status setelah extractor berhasil. Default 'siap_embedding'
+    (extractor menulis dokumen_chunk yang masih perlu di-embed); pakai
+    STATUS_SUKSES hanya untuk extractor yang tidak menghasilkan chunk.
+    """
+    def decorator(fn):
+        for kategori in kategori_list:
+            EXTRACTORS[normalize_kategori(kategori)] = fn
+        FINAL_STATUS[fn] = final_status
+        return fn
+    return decorator
+
+
+def get_extractor(doc: dict):
+    """Return (nama, fungsi) extractor untuk dokumen, atau (None, None)."""
+    kategori = normalize_kategori(doc.get("kategori"))
+    if kategori in EXTRACTORS:
+        return kategori, EXTRACTORS[kategori]
+    if (doc.get("file_path") or "").lower().endswith(".pdf"):
+        return DEFAULT_PDF_EXTRACTOR, EXTRACTORS[DEFAULT_PDF_EXTRACTOR]
+    return None, None
+
+
+@register_extractor("sop")
+def extract_sop(conn, doc: dict, path: str) -> dict:
+    # worker daemon sudah berupa proses terpisah → analisis halaman serial
+    return index_sop_pdf_full.index_sop_document(conn, doc["id"], path, workers=1)
+
+
+@register_extractor("kalender", "kalender_akademik")
+def extract_kalender(conn, doc: dict, path: str) -> dict:
+    cur = conn.cursor(dictionary=True)
+    try:
+        return index_kalender.index_kalender_document(cur, doc["id"], path)
+    finally:
+        cur.close()
+
+
+@register_extractor("pdf", "umum")
+def extract_pdf(conn, doc: dict, path: str) -> dict:
+    """PDF umum: semua halaman di-chunk tanpa deteksi bagian."""
+    cur = conn.cursor(dictionary=True)
+    try:
+        return index_kalender.index_kalender_document(
+            cur, doc["id"], path, start_page=1, end_page=None, detect=lambda _: None
+        )
+    finally:
+        cur.close()
+
+
+# ======================
+# DB HELPER
+# ======================
+
+def get_db_connection():
+    return mysql.connector.connect(**DB_CONFIG)
+
+
+def ensure_schema(cursor):
+    """
+    Siapkan skema yang dipakai extractor di DB lama: tabel
+    dokumen_fingerprint & dokumen_halaman, dan nilai 'siap_embedding'
+    di ENUM dokumen_kb.status_indexing (sama seperti vector_index.ensure_schema).
+    """
+    ensure_fingerprint_tables(cursor)
+    cursor.execute(
+        """
+        SELECT COLUMN_TYPE AS column_type FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE()
+          AND TABLE_NAME = 'dokumen_kb' AND COLUMN_NAME = 'status_indexing'
+        """
+    )
+    row = cursor.fetchone()
+    status_type = (row["column_type"] if isinstance(row, dict) else row[0]) if row else None
+    if isinstance(status_type, bytes):
+        status_type = status_type.decode()
+    if status_type and STATUS_SIAP_EMBEDDING not in status_type:
+        cursor.execute(
+            """
+            ALTER TABLE dokumen_kb MODIFY status_indexing
+            ENUM('belum','proses','siap_embedding','sukses','gagal') NOT NULL DEFAULT 'belum'
+            """
+        )
+
+
+def fetch_pending_ids(cursor, limit: int) -> list[int]:
+    cursor.execute(
+        """
+        SELECT id FROM dokumen_kb
+        WHERE status_indexing = %s
+        ORDER BY id
+        LIMIT %s
+        """,
+        (STATUS_BELUM, limit),
+    )
+    return [row["id"] if isinstance(row, dict) else row[0] for row in cursor.fetchall()]
+
+
+def claim_document(cursor, dokumen_id: int, catatan: str) -> bool:
+    """Ubah 'belum' → 'proses'. False kalau sudah diklaim proses lain."""
+    cursor.execute(
+        """
+        UPDATE dokumen_kb
+        SET status_indexing = %s, catatan = %s
+        WHERE id = %s AND status_indexing = %s
+        """,
+        (STATUS_PROSES, catatan, dokumen_id, STATUS_BELUM),
+    )
+    return cursor.rowcount == 1
+
+
+def finish_document(cursor, dokumen_id: int, status: str, catatan: str):
+    cursor.execute(
+        """
+        UPDATE dokumen_kb
+        SET status_indexing = %s, catatan = %s
+        WHERE id = %s
+        """,
+        (status, catatan[:MAX_CATATAN], dokumen_id),
+    )
+
+
+def reclaim_stale(cursor, older_than: int) -> int:
+    """Kembalikan dokumen 'proses' yang terlalu lama ke 'belum'."""
+    cursor.execute(
+        """
+        UPDATE dokumen_kb
+        SET status_indexing = %s
+        WHERE status_indexing = %s
+          AND updated_at < NOW() - INTERVAL %s SECOND
+        """,
+        (STATUS_BELUM, STATUS_PROSES, older_than),
+    )
+    return cursor.rowcount
+
+
+def resolve_path(file_path: str) -> str:
+    if os.path.isabs(file_path):
+        return file_path
+    return os.path.join(BASE_PROJECT_DIR, file_path.replace("/", os.sep))
+
+
+# ======================
+# WORKER
+# ======================
+
+def now_str() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def format_stats(stats: dict) -> str:
+    if stats.get("dilewati"):
+        return "file tidak berubah, dilewati"
+    return " ".join(f"{k}={v}" for k, v in stats.items() if k != "dilewati")
+
+
+def run_document(dokumen_id: int, claimed_at: float) -> dict:
+    """
+    Index 1 dokumen yang sudah diklaim (dijalankan di worker process).
+    Hasil indexing + status akhir + catatan di-commit dalam 1 transaksi.
+    """
+    t_start = time.perf_counter()
+    antri = time.time() - claimed_at
+    conn = get_db_connection()
+    cur = conn.cursor(dictionary=True)
+    nama = None
+    try:
+        cur.execute("SELECT * FROM dokumen_kb WHERE id = %s", (dokumen_id,))
+        doc = cur.fetchone()
+        nama, extractor = get_extractor(doc)
+        if extractor is None:
+            raise ValueError(f"tidak ada extractor untuk kategori {doc.get('kategori')!r}")
+
+        path = resolve_path(doc.get("file_path") or "")
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"file tidak ditemukan: {path}")
+
+        print(f"[MULAI] dokumen {dokumen_id} ({nama}) {path}")
+        t0 = time.perf_counter()
+        stats = extractor(conn, doc, path)
+        t_ekstraksi = time.perf_counter() - t0
+
+        status = FINAL_STATUS.get(extractor, STATUS_SIAP_EMBEDDING)
+        total = time.perf_counter() - t_start
+        catatan = (
+            f"[{now_str()}] {status} ({nama}) | antri {antri:.1f}s, "
+            f"ekstraksi {t_ekstraksi:.2f}s, total {total:.2f}s | {format_stats(stats)}"
+        )
+        finish_document(cur, dokumen_id, status, catatan)
+        conn.commit()
+        print(f"[OK] dokumen {dokumen_id}: {catatan}")
+        return {"id": dokumen_id, "status": status, "durasi": total}
+    except Exception as e:
+        conn.rollback()
+        total = time.perf_counter() - t_start
+        catatan = (
+            f"[{now_str()}] {STATUS_GAGAL} ({nama or '-'}) setelah {total:.2f}s: "
+            f"{type(e).__name__}: {e}"
+        )
+        print(f"[ERROR] dokumen {dokumen_id}: {catatan}")
+        traceback.print_exc()
+        finish_document(cur, dokumen_id, STATUS_GAGAL, catatan)
+        conn.commit()
+        return {"id": dokumen_id, "status": STATUS_GAGAL, "durasi": total}
+    finally:
+        cur.close()
+        conn.close()
+
+
+# ======================
+# MAIN LOOP
+# ======================
+
+def run(max_workers: int = MAX_WORKERS, poll_interval: float = POLL_INTERVAL,
+        once: bool = False, reclaim_after: int = RECLAIM_AFTER):
+    """
+    Loop utama: klaim dokumen sebanyak slot worker yang kosong, tunggu
+    salah satu selesai (atau poll_interval habis), ulangi.
+    once=True: berhenti begitu antrian kosong & semua dokumen selesai.
+    """
+    conn = get_db_connection()
+    cur = conn.cursor(dictionary=True)
+    worker_name = f"{socket.gethostname()}:{os.getpid()}"
+
+    # sekali saat start, supaya worker tidak gagal di tabel/status yang belum ada
+    ensure_schema(cur)
+    conn.commit()
+
+    if reclaim_after:
+        n = reclaim_stale(cur, reclaim_after)
+        conn.commit()
+        if n:
+            print(f"{n} dokumen 'proses' yang tertahan dikembalikan ke 'belum'.")
+
+    stop = False
+
+    def handle_stop(signum, frame):
+        nonlocal stop
+        print("Berhenti setelah dokumen yang sedang berjalan selesai...")
+        stop = True
+
+    signal.signal(signal.SIGINT, handle_stop)
+    signal.signal(signal.SIGTERM, handle_stop)
+
+    print(f"Daemon indexing jalan ({max_workers} worker, poll {poll_interval}s).")
+    running = {}  # future -> dokumen_id
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        while True:
+            free = max_workers - len(running)
+            if free > 0 and not stop:
+                for dokumen_id in fetch_pending_ids(cur, free):
+                    claimed = claim_document(
+                        cur, dokumen_id, f"[{now_str()}] diproses oleh {worker_name}"
+                    )
+                    conn.commit()
+                    if claimed:
+                        fut = pool.submit(run_document, dokumen_id, time.time())
+                        running[fut] = dokumen_id
+            else:
+                # snapshot baru untuk polling berikutnya (REPEATABLE READ)
+                conn.commit()
+
+            if not running:
+                if once or stop:
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            done, _ = wait(running, timeout=poll_interval, return_when=FIRST_COMPLETED)
+            for fut in done:
+                dokumen_id = running.pop(fut)
+                try:
+                    fut.result()
+                except Exception as e:
+                    # worker mati sebelum sempat menulis status
+                    finish_document(
+                        cur, dokumen_id, STATUS_GAGAL,
+                        f"[{now_str()}] {STATUS_GAGAL}: worker error {type(e).__name__}: {e}",
+                    )
+                    conn.commit()
+
+    cur.close()
+    conn.close()
+    print("Daemon indexing berhenti.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Daemon indexing dokumen_kb (status_indexing = 'belum')."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=MAX_WORKERS,
+        help="Jumlah dokumen yang diproses bersamaan (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=POLL_INTERVAL,
+        help="Jeda polling antrian dalam detik (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Proses antrian yang ada lalu berhenti (untuk cron / manual)",
+    )
+    parser.add_argument(
+        "--reclaim-after",
+        type=int,
+        default=RECLAIM_AFTER,
+        help="Detik sebelum dokumen 'proses' dianggap tertahan (0 = nonaktif, "
+             "default: %(default)s)",
+    )
+    args = parser.parse_args()
+    run(
+        max_workers=max(1, args.workers),
+        poll_interval=args.poll_interval,
+        once=args.once,
+        reclaim_after=args.reclaim_after,
+    )
@@ -75,8 +75,12 @@ CREATE TABLE IF NOT EXISTS classes (
     updated_at     TIMESTAMPTZ DEFAULT now(),
     CHECK (end_time > start_time)
 );
-CREATE INDEX IF NOT EXISTS idx_classes_term ON classes(term_code, day, start_time);
-CREATE INDEX IF NOT EXISTS idx_classes_lecturer ON classes(lecturer_id);
+-- index lama 1-2 kolom digantikan index komposit (filter + urutan keyset) di bawah
+DROP INDEX IF EXISTS idx_classes_term;
+DROP INDEX IF EXISTS idx_classes_lecturer;
+CREATE INDEX IF NOT EXISTS idx_classes_term_day_start ON classes(term_code, day, start_time, id);
+CREATE INDEX IF NOT EXISTS idx_classes_term_start ON classes(term_code, start_time, id);
+CREATE INDEX IF NOT EXISTS idx_classes_lecturer_term ON classes(lecturer_id, term_code, start_time);
 
 CREATE TABLE IF NOT EXISTS enrollments (
     student_npm    VARCHAR(20) REFERENCES students(npm) ON DELETE CASCADE,
@@ -99,7 +103,9 @@ CREATE TABLE IF NOT EXISTS exams (
     updated_at     TIMESTAMPTZ DEFAULT now(),
     CHECK (end_time > start_time)
 );
-CREATE INDEX IF NOT EXISTS idx_exams_term ON exams(term_code, date);
+DROP INDEX IF EXISTS idx_exams_term;
+CREATE INDEX IF NOT EXISTS idx_exams_term_date ON exams(term_code, date, start_time, id);
+CREATE INDEX IF NOT EXISTS idx_exams_course_term ON exams(course_id, term_code);
 
 CREATE TABLE IF NOT EXISTS events (
     id             UUID PRIMARY KEY DEFAULT gen_random_uuid(),
@@ -115,8 +121,11 @@ CREATE TABLE IF NOT EXISTS events (
     created_at     TIMESTAMPTZ DEFAULT now(),
     updated_at     TIMESTAMPTZ DEFAULT now()
 );
-CREATE INDEX IF NOT EXISTS idx_events_date ON events(date);
-CREATE INDEX IF NOT EXISTS idx_events_category ON events(category);
+DROP INDEX IF EXISTS idx_events_date;
+DROP INDEX IF EXISTS idx_events_category;
+CREATE INDEX IF NOT EXISTS idx_events_date_id ON events(date, id);
+CREATE INDEX IF NOT EXISTS idx_events_category_date ON events(category, date, id);
+CREATE INDEX IF NOT EXISTS idx_events_npm_date ON events(related_npm, date);
 
 -- ========== LAYANAN (SOP-ULT) ==========
 CREATE TABLE IF NOT EXISTS services (
@@ -169,9 +178,14 @@ CREATE TABLE IF NOT EXISTS tickets (
     created_at     TIMESTAMPTZ DEFAULT now(),
     updated_at     TIMESTAMPTZ DEFAULT now()
 );
-CREATE INDEX IF NOT EXISTS idx_tickets_student ON tickets(student_npm);
+-- index lama 1 kolom digantikan index komposit (filter + urutan keyset) di bawah
+DROP INDEX IF EXISTS idx_tickets_student;
+DROP INDEX IF EXISTS idx_tickets_status;
+CREATE INDEX IF NOT EXISTS idx_tickets_npm_status_created ON tickets(student_npm, status, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_tickets_npm_created ON tickets(student_npm, created_at, id);
 CREATE INDEX IF NOT EXISTS idx_tickets_service ON tickets(service_id);
-CREATE INDEX IF NOT EXISTS idx_tickets_status ON tickets(status);
+CREATE INDEX IF NOT EXISTS idx_tickets_status_created ON tickets(status, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_tickets_created ON tickets(created_at, id);
 
 CREATE TABLE IF NOT EXISTS ticket_logs (
     id             UUID PRIMARY KEY DEFAULT gen_random_uuid(),
@@ -181,7 +195,8 @@ CREATE TABLE IF NOT EXISTS ticket_logs (
     message        TEXT,
     created_at     TIMESTAMPTZ DEFAULT now()
 );
-CREATE INDEX IF NOT EXISTS idx_ticket_logs_ticket ON ticket_logs(ticket_id);
+DROP INDEX IF EXISTS idx_ticket_logs_ticket;
+CREATE INDEX IF NOT EXISTS idx_ticket_logs_ticket_created ON ticket_logs(ticket_id, created_at);
 
 -- ========== AUTH (sederhana) ==========
 CREATE TABLE IF NOT EXISTS users (
@@ -1,6 +1,25 @@
-import pandas as pd
-import numpy as np
+"""
+Gabungkan baris dosen yang namanya sama (setelah normalisasi) menjadi satu.
+
+Baris dengan index terkecil jadi master; program_studi-* dari semua baris
+duplikat digabung ke master (urutan muncul dipertahankan, tanpa dobel) dan
+baris lainnya dihapus. Hasil & log perubahan (sheet changes + deleted_rows)
+disimpan ke Excel, atau Parquet kalau nama file berakhiran .parquet.
+
+Penggabungan dikerjakan per kolom, bukan per baris: hanya baris yang
+duplikat yang di-melt ke bentuk panjang (master, baris, urutan, program),
+dedup dengan drop_duplicates, lalu di-pivot balik ke kolom program_studi-*.
+
+Contoh:
+    python dosen_duplikat.py
+    python dosen_duplikat.py --input dosen.parquet --output dosen_dedup.parquet --log dosen_dedup_log.parquet
+"""
+
+import argparse
 import re
+from pathlib import Path
+
+import pandas as pd
 
 # =======================
 # KONFIGURASI FILE
@@ -12,22 +31,26 @@ OUTPUT_LOG_FILE = "informasi_dosen_dengan_fakultas_dedup_log.xlsx"  # file log p
 # Nama kolom nama dosen
 NAMA_DOSEN_COL = "nama_dosen"
 
+LOG_COLUMNS = [
+    "nama_dosen",
+    "nama_dosen_norm",
+    "index_master_df",
+    "row_excel_master",
+    "index_duplikat_lain_df",
+    "rows_excel_duplikat_lain",
+    "program_studi_master_before",
+    "program_studi_duplikat_lain",
+    "program_studi_final_after_merge",
+]
+
 
-def normalize_name(name: str) -> str:
+def normalize_names(names: pd.Series) -> pd.Series:
     """
-    Normalisasi nama supaya perbandingan 100% lebih 'fair':
-    - ke lowercase
-    - hilangkan spasi berlebih di tengah
-    - strip spasi di awal/akhir
+    Normalisasi nama supaya perbandingan 100% lebih 'fair' (per kolom):
+    lowercase, spasi berlebih di tengah & di awal/akhir dibuang, kosong -> "".
     """
-    if pd.isna(name):
-        return ""
-    if not isinstance(name, str):
-        name = str(name)
-    name = name.lower().strip()
-    # ganti banyak spasi dengan satu spasi
-    name = " ".join(name.split())
-    return name
+    text = names.astype(object).where(names.notna(), "").astype(str)
+    return text.str.lower().str.split().str.join(" ")
 
 
 def detect_program_studi_columns(df: pd.DataFrame):
@@ -45,31 +68,76 @@ def detect_program_studi_columns(df: pd.DataFrame):
     return prog_cols
 
 
-def get_program_list_from_row(row, prog_cols):
+def program_long(df: pd.DataFrame, prog_cols, master: pd.Series) -> pd.DataFrame:
     """
-    Ambil daftar program studi dari satu baris (hanya yang tidak kosong).
-    Kembalikan list string.
+    Bentuk panjang (master, idx, urutan, program) dari sel program_studi
+    yang terisi, urut master -> baris -> kolom. Teks di-strip (kosong
+    dibuang), nilai non-teks dijadikan string apa adanya.
     """
-    values = []
-    for col in prog_cols:
-        if col not in row:
-            continue
-        v = row[col]
-        if pd.isna(v):
-            continue
-        if isinstance(v, str):
-            if v.strip() == "":
-                continue
-            values.append(v.strip())
-        else:
-            # kalau bukan string, tetap dimasukkan, tapi dalam bentuk string
-            values.append(str(v))
-    return values
+    long = (
+        df.loc[master.index, prog_cols]
+        .astype(object)
+        .set_axis(range(len(prog_cols)), axis=1)
+        .rename_axis("idx")
+        .reset_index()
+        .melt(id_vars="idx", var_name="urutan", value_name="program")
+    )
+    long = long[long["program"].notna()]
+    is_text = long["program"].map(lambda v: isinstance(v, str)).astype(bool)
+    program = long["program"].astype(str)
+    long["program"] = program.where(~is_text, program.str.strip())
+    long = long[~(is_text & (long["program"] == ""))]
+    long.insert(0, "master", long["idx"].map(master))
+    return long.sort_values(["master", "idx", "urutan"], kind="stable").reset_index(drop=True)
+
+
+def join_by_master(values: pd.Series, masters: pd.Series, index, sep: str) -> pd.Series:
+    """Gabung nilai per master jadi satu string (master tanpa nilai -> "")."""
+    return values.astype(str).groupby(masters).agg(sep.join).reindex(index, fill_value="")
+
+
+def read_table(path: str) -> pd.DataFrame:
+    if Path(path).suffix.lower() == ".parquet":
+        return pd.read_parquet(path)
+    return pd.read_excel(path)
+
+
+def to_parquet_safe(df: pd.DataFrame, path) -> None:
+    # kolom object bisa campur angka & teks (mis. NIP) -> simpan sebagai string
+    out = df.copy()
+    for col in out.columns[out.dtypes == object]:
+        out[col] = out[col].astype("string")
+    out.to_parquet(path, index=False)
+
+
+def write_table(df: pd.DataFrame, path: str) -> None:
+    if Path(path).suffix.lower() == ".parquet":
+        to_parquet_safe(df, path)
+    else:
+        df.to_excel(path, index=False)
+
+
+def write_log(log_df: pd.DataFrame, deleted_rows_df: pd.DataFrame, path: str) -> None:
+    """Excel: sheet changes & deleted_rows. Parquet: <nama>_changes.parquet & <nama>_deleted_rows.parquet."""
+    target = Path(path)
+    if target.suffix.lower() == ".parquet":
+        to_parquet_safe(log_df, target.with_name(f"{target.stem}_changes.parquet"))
+        to_parquet_safe(deleted_rows_df, target.with_name(f"{target.stem}_deleted_rows.parquet"))
+        return
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        log_df.to_excel(writer, sheet_name="changes", index=False)
+        deleted_rows_df.to_excel(writer, sheet_name="deleted_rows", index=False)
 
 
 def main():
-    print(f"Membaca file: {INPUT_FILE}")
-    df = pd.read_excel(INPUT_FILE)
+    parser = argparse.ArgumentParser(description="Gabungkan baris dosen dengan nama yang sama.")
+    parser.add_argument("--input", default=INPUT_FILE, help="file asal (.xlsx / .parquet)")
+    parser.add_argument("--output", default=OUTPUT_FIXED_FILE, help="file hasil (.xlsx / .parquet)")
+    parser.add_argument("--log", default=OUTPUT_LOG_FILE, help="file log perubahan (.xlsx / .parquet)")
+    args = parser.parse_args()
+
+    print(f"Membaca file: {args.input}")
+    df = read_table(args.input)
 
     if NAMA_DOSEN_COL not in df.columns:
         raise ValueError(f"Kolom '{NAMA_DOSEN_COL}' tidak ditemukan di file Excel!")
@@ -85,114 +153,57 @@ def main():
     print("Kolom program_studi terdeteksi:", program_cols)
 
     # Tambah kolom normalisasi nama dosen
-    df["__nama_norm"] = df[NAMA_DOSEN_COL].apply(normalize_name)
-
-    # Log perubahan gabungan
-    changes_log = []
-    rows_to_drop = []
-    merged_programs_for_master = {}  # index_master -> list program gabungan
-    master_before_programs = {}      # index_master -> list program sebelum gabung
-
-    max_program_count_overall = len(program_cols)
-
-    # Group berdasarkan nama yang sudah dinormalisasi
-    grouped = df.groupby("__nama_norm", dropna=False)
-
-    for nama_norm, group in grouped:
-        # Abaikan nama kosong
-        if nama_norm == "" or pd.isna(nama_norm):
-            continue
-
-        if len(group) <= 1:
-            # tidak ada duplikat
-            continue
-
-        # Ada lebih dari 1 baris dengan nama_norm yang sama → kandidat duplikat
-        group_indices = list(group.index)
-        # Anggap baris pertama berdasarkan index sebagai master
-        group_indices.sort()
-        master_idx = group_indices[0]
-        other_indices = group_indices[1:]
-
-        master_row = df.loc[master_idx]
-        master_name = master_row[NAMA_DOSEN_COL]
-
-        # Program studi awal (sebelum penggabungan)
-        master_programs = get_program_list_from_row(master_row, program_cols)
-        master_before_programs[master_idx] = list(master_programs)  # simpan untuk log
-
-        # Kumpulkan semua program_studi dari baris lain
-        all_other_programs = []
-
-        for idx in other_indices:
-            row = df.loc[idx]
-            progs = get_program_list_from_row(row, program_cols)
-            all_other_programs.extend(progs)
-            rows_to_drop.append(idx)
-
-        # Gabungkan semua program studi (master + lainnya),
-        # dan hilangkan duplikat sambil mempertahankan urutan muncul.
-        merged_programs = []
-        for p in master_programs + all_other_programs:
-            if p not in merged_programs:
-                merged_programs.append(p)
-
-        merged_programs_for_master[master_idx] = merged_programs
-
-        # Catat jumlah maksimum program yang diperlukan secara global
-        if len(merged_programs) > max_program_count_overall:
-            max_program_count_overall = len(merged_programs)
-
-        # Siapkan log perubahan per kelompok nama
-        changes_log.append(
-            {
-                "nama_dosen": master_name,
-                "nama_dosen_norm": nama_norm,
-                "index_master_df": master_idx,
-                "row_excel_master": int(df.loc[master_idx, "__row_index_original"]),
-                "index_duplikat_lain_df": ",".join(map(str, other_indices)),
-                "rows_excel_duplikat_lain": ",".join(
-                    str(int(df.loc[i, "__row_index_original"])) for i in other_indices
-                ),
-                "program_studi_master_before": "|".join(master_programs),
-                "program_studi_duplikat_lain": "|".join(all_other_programs),
-                "program_studi_final_after_merge": "|".join(merged_programs),
-            }
-        )
+    df["__nama_norm"] = normalize_names(df[NAMA_DOSEN_COL])
+
+    # Baris duplikat: nama_norm tidak kosong & muncul > 1 kali. Master = index terkecil.
+    nama_norm = df["__nama_norm"]
+    is_dup = (nama_norm != "") & nama_norm.map(nama_norm.value_counts()).gt(1)
+    dup_index = df.index[is_dup].to_series()
+    master = dup_index.groupby(nama_norm[is_dup]).transform("min")
 
     # Kalau tidak ada duplikat, tinggal simpan apa adanya
-    if not merged_programs_for_master:
+    if master.empty:
         print("Tidak ditemukan nama dosen yang duplikat (100% sama setelah normalisasi).")
-        print(f"Menyimpan file tanpa perubahan ke: {OUTPUT_FIXED_FILE}")
-        df.drop(columns=["__nama_norm", "__row_index_original"], errors="ignore").to_excel(
-            OUTPUT_FIXED_FILE, index=False
-        )
+        print(f"Menyimpan file tanpa perubahan ke: {args.output}")
+        write_table(df.drop(columns=["__nama_norm", "__row_index_original"], errors="ignore"), args.output)
 
         # Log kosong
-        log_df = pd.DataFrame(columns=[
-            "nama_dosen",
-            "nama_dosen_norm",
-            "index_master_df",
-            "row_excel_master",
-            "index_duplikat_lain_df",
-            "rows_excel_duplikat_lain",
-            "program_studi_master_before",
-            "program_studi_duplikat_lain",
-            "program_studi_final_after_merge",
-        ])
-        deleted_rows_df = pd.DataFrame(columns=df.columns)
-
-        with pd.ExcelWriter(OUTPUT_LOG_FILE, engine="openpyxl") as writer:
-            log_df.to_excel(writer, sheet_name="changes", index=False)
-            deleted_rows_df.to_excel(writer, sheet_name="deleted_rows", index=False)
-
-        print(f"Log perubahan (kosong) disimpan ke: {OUTPUT_LOG_FILE}")
+        write_log(pd.DataFrame(columns=LOG_COLUMNS), pd.DataFrame(columns=df.columns), args.log)
+        print(f"Log perubahan (kosong) disimpan ke: {args.log}")
         return
 
+    # ================================
+    # GABUNG PROGRAM STUDI PER MASTER
+    # ================================
+    long = program_long(df, program_cols, master)
+    merged = long.drop_duplicates(["master", "program"], keep="first").copy()
+    merged["posisi"] = merged.groupby("master").cumcount()
+
+    masters = master.unique()  # urut index
+    others = master[master.index != master.values]
+    from_master = long["idx"] == long["master"]
+
+    log_df = pd.DataFrame({
+        "nama_dosen": df.loc[masters, NAMA_DOSEN_COL].values,
+        "nama_dosen_norm": nama_norm[masters].values,
+        "index_master_df": masters,
+        "row_excel_master": df.loc[masters, "__row_index_original"].astype(int).values,
+        "index_duplikat_lain_df": join_by_master(others.index.to_series(), others, masters, ",").values,
+        "rows_excel_duplikat_lain": join_by_master(others.index.to_series() + 2, others, masters, ",").values,
+        "program_studi_master_before": join_by_master(
+            long.loc[from_master, "program"], long.loc[from_master, "master"], masters, "|").values,
+        "program_studi_duplikat_lain": join_by_master(
+            long.loc[~from_master, "program"], long.loc[~from_master, "master"], masters, "|").values,
+        "program_studi_final_after_merge": join_by_master(merged["program"], merged["master"], masters, "|").values,
+    }, columns=LOG_COLUMNS)
+    # urutan log sama seperti groupby nama_norm
+    log_df = log_df.sort_values("nama_dosen_norm", kind="stable").reset_index(drop=True)
+
     # ================================
     # PASTIKAN KOLUM PROGRAM_STUDI CUKUP
     # ================================
     # Jika total program studi gabungan > jumlah kolom sekarang, tambahkan kolom baru.
+    max_program_count_overall = max(len(program_cols), int(merged["posisi"].max() + 1) if len(merged) else 0)
     current_prog_count = len(program_cols)
     if max_program_count_overall > current_prog_count:
         print(
@@ -208,23 +219,18 @@ def main():
     # ==================================
     # TULISKAN HASIL GABUNGAN KE MASTER
     # ==================================
-    for master_idx, merged_programs in merged_programs_for_master.items():
-        # Kosongkan dulu semua kolom program_studi di baris master
-        for col in program_cols:
-            df.at[master_idx, col] = pd.NA
-
-        # Isi ulang dari kiri dengan daftar program studi gabungan
-        for i, p in enumerate(merged_programs):
-            if i >= len(program_cols):
-                # Ini tidak seharusnya terjadi karena kita sudah menambah kolom di atas
-                break
-            col = program_cols[i]
-            df.at[master_idx, col] = p
+    # pivot balik: 1 baris per master, kolom ke-i = program ke-i (sisanya kosong)
+    wide = (
+        merged.pivot(index="master", columns="posisi", values="program")
+        .reindex(index=masters, columns=range(len(program_cols)))
+    )
+    df[program_cols] = df[program_cols].astype(object)
+    df.loc[masters, program_cols] = wide.to_numpy(dtype=object)
 
     # ================================
     # SIAPKAN DATA YANG DIHAPUS
     # ================================
-    rows_to_drop_unique = sorted(set(rows_to_drop))
+    rows_to_drop_unique = sorted(others.index)
     print(f"Total baris duplikat yang akan dihapus: {len(rows_to_drop_unique)}")
 
     deleted_rows_df = df.loc[rows_to_drop_unique].copy()
@@ -241,21 +247,17 @@ def main():
         if tmp_col in deleted_rows_df.columns:
             deleted_rows_df = deleted_rows_df.drop(columns=[tmp_col])
 
-    print(f"Menyimpan file hasil deduplikasi ke: {OUTPUT_FIXED_FILE}")
-    df_dedup.to_excel(OUTPUT_FIXED_FILE, index=False)
+    print(f"Menyimpan file hasil deduplikasi ke: {args.output}")
+    write_table(df_dedup, args.output)
 
     # ================================
     # SIMPAN LOG PERUBAHAN & DATA DIHAPUS
     # ================================
-    log_df = pd.DataFrame(changes_log)
-
-    print(f"Menyimpan log perubahan ke: {OUTPUT_LOG_FILE}")
-    with pd.ExcelWriter(OUTPUT_LOG_FILE, engine="openpyxl") as writer:
-        log_df.to_excel(writer, sheet_name="changes", index=False)
-        deleted_rows_df.to_excel(writer, sheet_name="deleted_rows", index=False)
+    print(f"Menyimpan log perubahan ke: {args.log}")
+    write_log(log_df, deleted_rows_df, args.log)
 
     print("Selesai ✅")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,7 +1,24 @@
-import pandas as pd
-import mysql.connector
+"""
+Isi tabel dosen_prodi dari Excel informasi dosen.
+
+Semua lookup dilakukan di memori: tabel dosen & prodi dimuat sekali,
+dosen dicocokkan (prioritas NIDN -> NIP -> nama ternormalisasi) dan prodi
+dipetakan lewat merge pandas, lalu relasi ditulis dengan INSERT IGNORE
+multi-row per batch dalam 1 transaksi. Nama prodi yang tidak sama persis
+dengan DB ("S1 Ilmu Komputer", "Magister Kehutanan", salah ketik kecil)
+dicocokkan lewat ProdiResolver (prodi_resolver.py) dengan petunjuk kolom
+fakultas; hanya hasil dengan skor >= MIN_CONFIDENCE yang dipakai.
+"""
+
+import re
+import time
 from pathlib import Path
 
+import mysql.connector
+import pandas as pd
+
+from prodi_resolver import MIN_CONFIDENCE, ProdiResolver
+
 # ==========================
 # KONFIGURASI
 # ==========================
@@ -15,6 +32,13 @@ DB_CONFIG = {
 
 EXCEL_PATH = "informasi_dosen_dengan_fakultas.xlsx"  # sesuaikan nama file (dedup / fixed)
 
+BATCH_SIZE = 1000  # baris per INSERT multi-row
+
+SQL_INSERT_DOSEN_PRODI = """
+    INSERT IGNORE INTO dosen_prodi (dosen_id, prodi_id, is_homebase)
+    VALUES (%s, %s, %s)
+"""
+
 
 def norm(s: str | None) -> str | None:
     """Normalisasi nama (lowercase + buang spasi double)."""
@@ -25,6 +49,14 @@ def norm(s: str | None) -> str | None:
     return s or None
 
 
+def norm_id(s) -> str | None:
+    """NIP/NIDN sebagai teks (nol di depan tetap), kosong -> None."""
+    if s is None or (isinstance(s, float) and pd.isna(s)):
+        return None
+    s = str(s).strip()
+    return s or None
+
+
 def get_connection():
     return mysql.connector.connect(**DB_CONFIG)
 
@@ -60,8 +92,6 @@ def detect_program_studi_columns(df: pd.DataFrame) -> list[str]:
     Deteksi semua kolom yang namanya diawali 'program_studi-'
     dan urutkan berdasarkan angka di belakangnya.
     """
-    import re
-
     cols = [c for c in df.columns if str(c).startswith("program_studi-")]
 
     def col_key(c):
@@ -72,6 +102,60 @@ def detect_program_studi_columns(df: pd.DataFrame) -> list[str]:
     return cols
 
 
+def key_map(df: pd.DataFrame, column: str, normalize, key: str) -> pd.DataFrame:
+    """
+    Peta kunci -> id dari tabel DB (kolom key, id_<key>). Kunci kosong
+    dibuang; kunci ganda diambil id terkecil (seperti hasil SELECT ... LIMIT 1).
+    """
+    out = pd.DataFrame({key: df[column].map(normalize), f"id_{key}": df["id"]})
+    return (
+        out.dropna(subset=[key])
+        .sort_values(f"id_{key}")
+        .drop_duplicates(key, keep="first")
+    )
+
+
+def resolve_dosen(df: pd.DataFrame, dosen: pd.DataFrame) -> pd.Series:
+    """dosen_id per baris Excel (NaN kalau tidak ketemu): NIDN -> NIP -> nama_dosen."""
+    def column(name):
+        return df[name] if name in df.columns else pd.Series(None, index=df.index, dtype=object)
+
+    rows = pd.DataFrame({
+        "nidn": column("NIDN").map(norm_id),
+        "nip": column("NIP").map(norm_id),
+        "nama": column("nama_dosen").map(norm),
+    }, index=df.index)
+    merged = rows.reset_index(names="baris")
+    for key, column_db, normalize in (("nidn", "nidn", norm_id), ("nip", "nip", norm_id), ("nama", "nama_dosen", norm)):
+        merged = merged.merge(key_map(dosen, column_db, normalize, key), on=key, how="left")
+    dosen_id = merged["id_nidn"].fillna(merged["id_nip"]).fillna(merged["id_nama"])
+    dosen_id.index = merged["baris"]
+    return dosen_id
+
+
+def program_rows(df: pd.DataFrame, program_cols: list[str]) -> pd.DataFrame:
+    """Bentuk panjang (baris, urutan, nama_prodi) untuk semua sel program_studi-* yang terisi."""
+    long = (
+        df[program_cols]
+        .set_axis(range(1, len(program_cols) + 1), axis=1)
+        .rename_axis("baris")
+        .reset_index()
+        .melt(id_vars="baris", var_name="urutan", value_name="nama_prodi")
+        .dropna(subset=["nama_prodi"])
+    )
+    long["nama_prodi"] = long["nama_prodi"].astype(str).str.strip()
+    long = long[long["nama_prodi"] != ""]
+    long["key"] = long["nama_prodi"].map(norm)
+    return long.sort_values(["baris", "urutan"], kind="stable")
+
+
+def resolve_prodi(rows: pd.DataFrame, resolver: ProdiResolver) -> pd.Series:
+    """Match (atau None) per baris untuk pasangan (nama_prodi, fakultas); tiap pasangan unik di-resolve sekali."""
+    pairs = list(zip(rows["nama_prodi"], rows["fakultas"]))
+    matches = {pair: resolver.resolve(*pair) for pair in set(pairs)}
+    return pd.Series([matches[pair] for pair in pairs], index=rows.index, dtype=object)
+
+
 def main():
     # 1. pastikan file Excel ada
     path = Path(EXCEL_PATH)
@@ -79,8 +163,9 @@ def main():
         print(f"[ERROR] File {EXCEL_PATH} tidak ditemukan.")
         return
 
-    # 2. baca Excel
-    df = pd.read_excel(path)
+    # 2. baca Excel (NIP/NIDN sebagai teks supaya nol di depan tidak hilang)
+    t0 = time.perf_counter()
+    df = pd.read_excel(path, dtype={"NIP": str, "NIDN": str})
 
     # cek kolom dasar yang kita pakai
     base_required_cols = ["nama_dosen", "NIP", "NIDN"]
@@ -98,122 +183,103 @@ def main():
 
     # 3. koneksi DB
     conn = get_connection()
-    cur = conn.cursor(dictionary=True, buffered=True)
+    cur = conn.cursor(buffered=True)
 
     # 4. pastikan tabel dosen_prodi ada
     ensure_dosen_prodi_table(cur)
     conn.commit()
 
-    # 5. load semua prodi -> mapping normalisasi(nama_prodi) -> id
+    # 5. muat dosen & prodi sekali (2 query untuk seluruh file)
+    cur.execute("SELECT id, nidn, nip, nama_dosen FROM dosen")
+    dosen = pd.DataFrame(cur.fetchall(), columns=["id", "nidn", "nip", "nama_dosen"])
     cur.execute("SELECT id, nama_prodi FROM prodi")
-    prodi_rows = cur.fetchall()
-    prodi_map = {}
-    for r in prodi_rows:
-        key = norm(r["nama_prodi"])
-        if key:
-            prodi_map[key] = r["id"]
-    print(f"Loaded {len(prodi_map)} prodi dari tabel prodi.")
-
-    # 6. proses per baris Excel
+    prodi = key_map(
+        pd.DataFrame(cur.fetchall(), columns=["id", "nama_prodi"]), "nama_prodi", norm, "key"
+    ).rename(columns={"id_key": "prodi_id"})
+    resolver = ProdiResolver.from_cursor(cur)
+    print(f"Loaded {len(dosen)} dosen & {len(prodi)} prodi dari database.")
+
+    # 6. cocokkan dosen & prodi untuk semua baris sekaligus
     total = len(df)
+    dosen_id = resolve_dosen(df, dosen)
+    found = dosen_id.notna()
+
+    rows = program_rows(df.loc[found], program_cols)
+    rows["dosen_id"] = rows["baris"].map(dosen_id)
+    rows = rows.merge(prodi, on="key", how="left")
+
+    # nama prodi yang tidak sama persis -> resolver (alias / kanonik / fuzzy)
+    fakultas = df["fakultas"] if "fakultas" in df.columns else pd.Series(None, index=df.index, dtype=object)
+    rows["fakultas"] = rows["baris"].map(fakultas.fillna("").astype(str))
+    missing = rows[rows["prodi_id"].isna()]
+    match = resolve_prodi(missing, resolver)
+    resolver.save()
+    accepted = match.map(lambda m: m is not None and m.score >= MIN_CONFIDENCE).astype(bool)
+    rows.loc[accepted[accepted].index, "prodi_id"] = match[accepted].map(lambda m: m.prodi_id)
+    fuzzy_prodi = missing.loc[accepted].assign(match=match[accepted])
+    nf_prodi = missing.loc[~accepted].assign(match=match[~accepted])
+
+    pairs = (
+        rows.dropna(subset=["prodi_id"])
+        .sort_values(["baris", "urutan"], kind="stable")
+        .drop_duplicates(["dosen_id", "prodi_id"], keep="first")  # sama seperti INSERT IGNORE berurutan
+    )
+    values = list(zip(
+        pairs["dosen_id"].astype(int).tolist(),
+        pairs["prodi_id"].astype(int).tolist(),
+        (pairs["urutan"] == 1).astype(int).tolist(),
+    ))
+
+    # 7. tulis per batch, 1 commit
     inserted = 0
-    not_found_prodi = 0
-    not_found_dosen = 0
-    log_nf_prodi = []
-    log_nf_dosen = []
-
-    for idx, row in df.iterrows():
-        nama_dosen = str(row.get("nama_dosen", "")).strip()
-        nip = row.get("NIP")
-        nidn = row.get("NIDN")
-
-        # cari dosen_id: prioritas NIDN -> NIP -> nama_dosen
-        dosen_id = None
-
-        if nidn and not pd.isna(nidn):
-            cur.execute("SELECT id FROM dosen WHERE nidn = %s", (str(nidn),))
-            r = cur.fetchone()
-            if r:
-                dosen_id = r["id"]
-
-        if dosen_id is None and nip and not pd.isna(nip):
-            cur.execute("SELECT id FROM dosen WHERE nip = %s", (str(nip),))
-            r = cur.fetchone()
-            if r:
-                dosen_id = r["id"]
-
-        if dosen_id is None and nama_dosen:
-            cur.execute("SELECT id FROM dosen WHERE nama_dosen = %s", (nama_dosen,))
-            r = cur.fetchone()
-            if r:
-                dosen_id = r["id"]
-
-        if dosen_id is None:
-            not_found_dosen += 1
-            log_nf_dosen.append(
-                f"Baris {idx+2}: DOSEN tidak ketemu -> nama='{nama_dosen}', NIP='{nip}', NIDN='{nidn}'"
-            )
-            continue
-
-        # proses semua kolom program_studi-* yang terdeteksi
-        for i, col in enumerate(program_cols, start=1):
-            if col not in df.columns:
-                continue
-
-            nama_prodi_excel = row.get(col)
-            if pd.isna(nama_prodi_excel):
-                continue
-
-            nama_prodi_excel = str(nama_prodi_excel).strip()
-            if not nama_prodi_excel:
-                continue
-
-            key = norm(nama_prodi_excel)
-            prodi_id = prodi_map.get(key)
-
-            if not prodi_id:
-                not_found_prodi += 1
-                log_nf_prodi.append(
-                    f"Baris {idx+2}: PRODI tidak ketemu -> '{nama_prodi_excel}' (dosen: {nama_dosen})"
-                )
-                continue
-
-            is_homebase = 1 if i == 1 else 0
-
-            # INSERT IGNORE: kalau kombinasi sudah ada tidak error
-            cur.execute(
-                """
-                INSERT IGNORE INTO dosen_prodi (dosen_id, prodi_id, is_homebase)
-                VALUES (%s, %s, %s)
-                """,
-                (dosen_id, prodi_id, is_homebase)
-            )
-            if cur.rowcount > 0:
-                inserted += 1
-
-        if (idx + 1) % 50 == 0:
-            conn.commit()
-            print(f"Progress {idx+1}/{total} baris...")
-
+    for start in range(0, len(values), BATCH_SIZE):
+        cur.executemany(SQL_INSERT_DOSEN_PRODI, values[start:start + BATCH_SIZE])
+        inserted += max(cur.rowcount, 0)
     conn.commit()
     cur.close()
     conn.close()
 
-    # 7. ringkasan
+    not_found_dosen = int((~found).sum())
+    not_found_prodi = len(nf_prodi)
+    log_nf_dosen = [
+        f"Baris {idx+2}: DOSEN tidak ketemu -> nama='{str(r.get('nama_dosen', '')).strip()}', "
+        f"NIP='{r.get('NIP')}', NIDN='{r.get('NIDN')}'"
+        for idx, r in df.loc[~found].head(20).iterrows()
+    ]
+    nama_dosen = df["nama_dosen"].astype(str).str.strip() if "nama_dosen" in df.columns else None
+    log_nf_prodi = [
+        f"Baris {r.baris+2}: PRODI tidak ketemu -> '{r.nama_prodi}'"
+        f" (dosen: {nama_dosen[r.baris] if nama_dosen is not None else ''})"
+        + (f"; terdekat: '{r.match.nama_prodi}' skor {r.match.score}" if r.match is not None else "")
+        for r in nf_prodi.head(20).itertuples()
+    ]
+    log_fuzzy_prodi = [
+        f"'{nama}' -> '{m.nama_prodi}' (skor {m.score}, {m.metode})"
+        for nama, m in fuzzy_prodi.drop_duplicates("nama_prodi")[["nama_prodi", "match"]].head(20).itertuples(index=False)
+    ]
+
+    # 8. ringkasan
     print("==== RINGKASAN ====")
     print(f"Total baris Excel         : {total}")
     print(f"Relasi dosen_prodi dibuat : {inserted}")
     print(f"Dosen tidak ketemu di DB  : {not_found_dosen}")
+    print(f"Prodi via resolver        : {len(fuzzy_prodi)}")
     print(f"Prodi tidak ketemu di DB  : {not_found_prodi}")
+    print(f"Waktu                     : {time.perf_counter() - t0:.2f} detik")
 
     if log_nf_dosen:
         print("\nContoh DOSEN tidak ketemu (max 20):")
-        for line in log_nf_dosen[:20]:
+        for line in log_nf_dosen:
+            print(" -", line)
+
+    if log_fuzzy_prodi:
+        print("\nContoh PRODI via resolver (max 20, cek kalau ragu):")
+        for line in log_fuzzy_prodi:
             print(" -", line)
 
     if log_nf_prodi:
         print("\nContoh PRODI tidak ketemu (max 20):")
-        for line in log_nf_prodi[:20]:
+        for line in log_nf_prodi:
             print(" -", line)
 
 
@@ -0,0 +1,292 @@
+"""
+Pencocokan nama program studi (teks bebas dari Excel) ke prodi.id.
+
+Tahapan resolve(nama, fakultas):
+1. Alias: nama ternormalisasi persis sama dengan nama_prodi di DB atau
+   alias manual di prodi_alias.csv (kolom alias, prodi_id)   -> skor 1.0
+2. Kanonik: jenjang + nama bidang sama persis, apa pun penulisannya
+   ("S1 Ilmu Komputer" = "Program Studi S1 Ilmu Komputer" = "Sarjana
+   Ilmu Komputer")                                            -> skor 0.97
+3. Fuzzy: jenjang (S1/S2/Magister/Sp-1/...) dipisah dari nama bidang, lalu
+   kandidat diambil dari index trigram karakter + token nama bidang.
+   Skor = kemiripan nama (0.7 Dice trigram + 0.3 Dice token) x kecocokan
+   jenjang x kecocokan fakultas; kalau dua kandidat teratas hampir sama,
+   skor diturunkan (ambigu).
+
+Nama tanpa jenjang ("Ilmu Komputer") cenderung ke jenjang Sarjana, kecuali
+petunjuk fakultas mengarah ke prodi lain. Index & hasil resolve disimpan
+di .cache/prodi_resolver.pkl dan dipakai ulang selama isi tabel prodi,
+alias dan versi resolver tidak berubah.
+
+Pemakaian cepat (DB dari DB_CONFIG dosen_prodi_insert.py):
+    python prodi_resolver.py "S1 Ilmu Komputer" "Magister Kehutanan" --fakultas "Fakultas Kehutanan"
+"""
+
+import argparse
+import csv
+import hashlib
+import os
+import pickle
+import re
+import unicodedata
+from collections import defaultdict
+from typing import NamedTuple
+
+RESOLVER_VERSION = "1"
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_PATH = os.path.join(BASE_DIR, ".cache", "prodi_resolver.pkl")
+ALIAS_PATH = os.path.join(BASE_DIR, "prodi_alias.csv")
+
+MIN_CONFIDENCE = 0.75   # di bawah ini dianggap tidak ketemu
+MAX_CANDIDATES = 12     # kandidat trigram yang dinilai penuh per query
+AMBIGUOUS_MARGIN = 0.02
+
+SQL_PRODI = """
+    SELECT p.id, p.nama_prodi, p.jenjang, f.nama_fakultas, f.singkatan
+    FROM prodi p
+    LEFT JOIN fakultas f ON f.id = p.fakultas_id
+    ORDER BY p.id
+"""
+
+# kolom prodi.jenjang -> kode jenjang
+JENJANG_DB = {
+    "diploma": "D3",
+    "sarjana": "S1",
+    "sarjana terapan": "D4",
+    "magister": "S2",
+    "doktoral": "S3",
+    "profesi": "PROFESI",
+    "spesialis 1": "SP1",
+    "spesialis 2": "SP2",
+    "ners spesialis": "SPNERS",
+}
+
+# frasa jenjang di nama (sudah dinormalisasi), dicocokkan dari yang terpanjang
+JENJANG_FRASA = {
+    "sarjana terapan": "D4", "diploma iv": "D4", "diploma 4": "D4", "d iv": "D4", "d4": "D4",
+    "diploma iii": "D3", "diploma 3": "D3", "d iii": "D3", "d3": "D3", "diploma": "D3",
+    "sarjana": "S1", "s1": "S1",
+    "magister": "S2", "s2": "S2",
+    "doktoral": "S3", "doktor": "S3", "s3": "S3",
+    "spesialis 1": "SP1", "spesialis i": "SP1", "sp 1": "SP1", "sp1": "SP1",
+    "spesialis 2": "SP2", "spesialis ii": "SP2", "sp 2": "SP2", "sp2": "SP2",
+    "spesialis": "SP1",
+    "pendidikan profesi": "PROFESI", "profesi": "PROFESI",
+}
+_JENJANG_RE = re.compile(
+    r"\b(" + "|".join(re.escape(f) for f in sorted(JENJANG_FRASA, key=len, reverse=True)) + r")\b"
+)
+
+FILLER = {"program", "studi", "prodi", "ps", "departemen", "dan", "jurusan"}
+
+
+class Match(NamedTuple):
+    prodi_id: int
+    nama_prodi: str
+    score: float
+    metode: str  # alias / kanonik / fuzzy / ambigu
+
+
+def normalize(value) -> str:
+    """lowercase, tanpa aksen & tanda baca, spasi tunggal ("Sp-1" -> "sp 1")."""
+    if value is None or (isinstance(value, float) and value != value):
+        return ""
+    value = unicodedata.normalize("NFKD", str(value).lower())
+    value = value.encode("ascii", "ignore").decode("ascii")
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", value).split())
+
+
+def split_jenjang(name: str) -> tuple[str | None, str]:
+    """(kode jenjang | None, nama bidang) dari nama yang sudah dinormalisasi."""
+    jenjang = None
+    m = _JENJANG_RE.search(name)
+    if m:
+        jenjang = JENJANG_FRASA[m.group(1)]
+    stripped = _JENJANG_RE.sub(" ", name)
+    tokens = [t for t in stripped.split() if t not in FILLER]
+    return jenjang, " ".join(tokens)
+
+
+def trigrams(value: str) -> set[str]:
+    padded = f"  {value} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def dice(a: set, b: set) -> float:
+    return 2 * len(a & b) / (len(a) + len(b)) if a and b else 0.0
+
+
+class ProdiResolver:
+    def __init__(self, rows, aliases: dict[str, int] | None = None):
+        """rows: (id, nama_prodi, jenjang, nama_fakultas, singkatan)."""
+        rows = [tuple(r) for r in rows]
+        aliases = dict(aliases or {})
+        self.key = hashlib.sha1(
+            repr((RESOLVER_VERSION, rows, sorted(aliases.items()))).encode("utf-8")
+        ).hexdigest()
+
+        self.prodi = {}                   # id -> (nama_prodi, jenjang, bidang, fakultas keys)
+        self.alias = {}                   # nama ternormalisasi -> id (None = ambigu)
+        self.canonical = {}               # (jenjang, bidang) -> id (None = ambigu)
+        self.by_bidang = defaultdict(list)
+        self.gram_index = defaultdict(set)   # trigram -> {bidang}
+        self.token_index = defaultdict(set)  # token -> {bidang}
+        self.memo = {}                    # (nama, fakultas) -> Match | None
+
+        for prodi_id, nama, jenjang_db, fakultas, singkatan in rows:
+            name = normalize(nama)
+            jenjang_nama, bidang = split_jenjang(name)
+            jenjang = JENJANG_DB.get(normalize(jenjang_db), jenjang_nama)
+            fakultas_keys = {k for k in (normalize(fakultas), normalize(singkatan)) if k}
+            self.prodi[prodi_id] = (nama, jenjang, bidang, fakultas_keys)
+            self.by_bidang[bidang].append(prodi_id)
+            self._add_unique(self.alias, name, prodi_id)
+            self._add_unique(self.canonical, (jenjang, bidang), prodi_id)
+
+        for bidang in self.by_bidang:
+            for gram in trigrams(bidang):
+                self.gram_index[gram].add(bidang)
+            for token in bidang.split():
+                self.token_index[token].add(bidang)
+
+        for alias, prodi_id in aliases.items():
+            if prodi_id in self.prodi:
+                self.alias[normalize(alias)] = prodi_id  # alias manual menang
+
+    @staticmethod
+    def _add_unique(index: dict, key, prodi_id: int):
+        if key in index and index[key] != prodi_id:
+            index[key] = None  # bentuk yang sama dipakai >1 prodi: serahkan ke jalur fuzzy
+        else:
+            index[key] = prodi_id
+
+    # -------------------------
+    # resolve
+    # -------------------------
+
+    def resolve(self, nama, fakultas=None) -> Match | None:
+        """Kandidat terbaik (bisa di bawah MIN_CONFIDENCE) atau None kalau tidak ada sama sekali."""
+        memo_key = (str(nama), str(fakultas or ""))
+        if memo_key not in self.memo:
+            self.memo[memo_key] = self._resolve(normalize(nama), normalize(fakultas))
+        return self.memo[memo_key]
+
+    def _resolve(self, name: str, fakultas: str) -> Match | None:
+        if not name:
+            return None
+        prodi_id = self.alias.get(name)
+        if prodi_id is not None:
+            return Match(prodi_id, self.prodi[prodi_id][0], 1.0, "alias")
+
+        jenjang, bidang = split_jenjang(name)
+        prodi_id = self.canonical.get((jenjang, bidang))
+        if prodi_id is not None:
+            return Match(prodi_id, self.prodi[prodi_id][0], 0.97, "kanonik")
+
+        grams = trigrams(bidang)
+        tokens = set(bidang.split())
+
+        shared = defaultdict(int)
+        for gram in grams:
+            for cand in self.gram_index.get(gram, ()):
+                shared[cand] += 1
+        for token in tokens:
+            for cand in self.token_index.get(token, ()):
+                shared[cand] += 2
+        top = sorted(shared, key=shared.get, reverse=True)[:MAX_CANDIDATES]
+
+        scored = []
+        for cand in top:
+            sim = 0.7 * dice(grams, trigrams(cand)) + 0.3 * dice(tokens, set(cand.split()))
+            for prodi_id in self.by_bidang[cand]:
+                scored.append((sim * self._context(prodi_id, jenjang, fakultas), prodi_id))
+        if not scored:
+            return None
+
+        scored.sort(key=lambda s: (-s[0], s[1]))
+        best, prodi_id = scored[0]
+        metode = "fuzzy"
+        if len(scored) > 1 and best - scored[1][0] < AMBIGUOUS_MARGIN:
+            best *= 0.8
+            metode = "ambigu"
+        return Match(prodi_id, self.prodi[prodi_id][0], round(min(best, 0.99), 3), metode)
+
+    def _context(self, prodi_id: int, jenjang: str | None, fakultas: str) -> float:
+        """Faktor kecocokan jenjang & fakultas untuk satu kandidat."""
+        _, cand_jenjang, _, cand_fakultas = self.prodi[prodi_id]
+        if jenjang is None:
+            factor = 0.9 if cand_jenjang == "S1" else 0.85
+        else:
+            factor = 1.0 if jenjang == cand_jenjang else 0.6
+        if fakultas:
+            factor *= 1.0 if fakultas in cand_fakultas else 0.9
+        return factor
+
+    # -------------------------
+    # cache antar-run
+    # -------------------------
+
+    @classmethod
+    def load(cls, rows, aliases: dict[str, int] | None = None, path: str = CACHE_PATH) -> "ProdiResolver":
+        """Index dari cache kalau isi prodi/alias sama, kalau tidak dibangun ulang."""
+        fresh = cls(rows, aliases)
+        try:
+            with open(path, "rb") as f:
+                cached = pickle.load(f)
+            if isinstance(cached, cls) and cached.key == fresh.key:
+                return cached
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            pass
+        return fresh
+
+    @classmethod
+    def from_cursor(cls, cur, alias_path: str = ALIAS_PATH, path: str = CACHE_PATH) -> "ProdiResolver":
+        cur.execute(SQL_PRODI)
+        rows = [tuple(r.values()) if isinstance(r, dict) else tuple(r) for r in cur.fetchall()]
+        return cls.load(rows, load_aliases(alias_path), path)
+
+    def save(self, path: str = CACHE_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+
+def load_aliases(path: str = ALIAS_PATH) -> dict[str, int]:
+    """Alias manual (CSV: alias, prodi_id). File tidak ada -> kosong."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8", newline="") as f:
+        return {
+            row["alias"]: int(row["prodi_id"])
+            for row in csv.DictReader(f)
+            if row.get("alias") and row.get("prodi_id")
+        }
+
+
+if __name__ == "__main__":
+    import mysql.connector
+
+    from dosen_prodi_insert import DB_CONFIG
+
+    parser = argparse.ArgumentParser(description="Cocokkan nama program studi ke tabel prodi.")
+    parser.add_argument("nama", nargs="+")
+    parser.add_argument("--fakultas", default=None)
+    args = parser.parse_args()
+
+    conn = mysql.connector.connect(**DB_CONFIG)
+    cur = conn.cursor()
+    resolver = ProdiResolver.from_cursor(cur)
+    cur.close()
+    conn.close()
+
+    for nama in args.nama:
+        m = resolver.resolve(nama, args.fakultas)
+        if m is None:
+            print(f"{nama!r}: tidak ada kandidat")
+        else:
+            status = "OK" if m.score >= MIN_CONFIDENCE else "RAGU"
+            print(f"{nama!r}: [{status}] {m.nama_prodi} (id={m.prodi_id}, skor={m.score}, {m.metode})")
+    resolver.save()
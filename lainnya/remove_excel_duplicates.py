@@ -3,7 +3,7 @@
 """
 remove_excel_duplicates.py
 
-Remove duplicate rows from an .xlsx file across one or all sheets.
+Remove duplicate rows from .xlsx files across one or all sheets.
 
 Features:
 - Process all sheets automatically.
@@ -12,23 +12,41 @@ Features:
 - Choose which duplicate to keep: first, last, or none (drop all duplicates).
 - Overwrite the original file with --inplace or write to a new file (default adds _deduped suffix).
 - Prints a summary of rows removed per sheet.
+- Several inputs at once: files, directories (their *.xlsx) and glob patterns.
+  Files and sheets are processed concurrently in a process pool (--workers);
+  each file gets its own summary, followed by a total (and --report CSV).
+- --stream: constant-memory mode for very large exports. Rows are read one
+  by one (openpyxl read-only) and written with a write-only workbook; only a
+  set of 16-byte key digests is kept for --keep first, while --keep last/none
+  spill (digest, row) pairs to a temporary SQLite file and make a second pass.
 
 Usage examples:
   python remove_excel_duplicates.py input.xlsx
   python remove_excel_duplicates.py input.xlsx --subset "Email,Phone"
   python remove_excel_duplicates.py input.xlsx --by-index "0,2,3" --ignore-case --trim
   python remove_excel_duplicates.py input.xlsx --keep last --inplace
+  python remove_excel_duplicates.py siakad_export.xlsx --stream --subset "NIM" --trim
+  python remove_excel_duplicates.py dataset/ --trim --ignore-case --report dedup_report.csv
+  python remove_excel_duplicates.py "dataset/*.xlsx" "exports/**/*.xlsx" --workers 4
 
 Requirements:
   pip install pandas openpyxl
 """
 
 import argparse
+import csv
+import glob
+import hashlib
 import os
+import sqlite3
 import sys
-from typing import List, Optional
+import tempfile
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import pandas as pd
+from openpyxl import Workbook, load_workbook
 
 def parse_list_arg(arg: Optional[str]) -> Optional[List[str]]:
     if arg is None or arg.strip() == "":
@@ -104,10 +122,373 @@ def deduplicate_sheet(
 
     return deduped
 
+# --- Streaming mode ----------------------------------------------------------
+
+SPILL_BATCH = 10_000  # (digest, row) pairs per executemany in the spill file
+
+
+def header_names(header: tuple) -> List[str]:
+    """Column names like pandas: empty -> 'Unnamed: i', repeated -> 'name.1'."""
+    names, seen = [], {}
+    for i, value in enumerate(header):
+        name = f"Unnamed: {i}" if value is None or str(value).strip() == "" else str(value)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def sheet_rows(ws) -> Iterator[tuple]:
+    """Header row, then every data row padded/truncated to the header width.
+
+    Blank rows are kept like pandas does, except trailing ones (only counted
+    until the next non-blank row shows up).
+    """
+    rows = ws.iter_rows(values_only=True)
+    header = next(rows, None)
+    if header is None:
+        return
+    width = len(header)
+    blank = (None,) * width
+    yield header
+    pending_blank = 0
+    for row in rows:
+        if all(v is None for v in row):
+            pending_blank += 1
+            continue
+        for _ in range(pending_blank):
+            yield blank
+        pending_blank = 0
+        if len(row) < width:
+            row = row + (None,) * (width - len(row))
+        yield row[:width]
+
+
+def row_digest(row: tuple, key_idx: List[int], trim: bool, ignore_case: bool) -> bytes:
+    key = []
+    for i in key_idx:
+        v = row[i]
+        if v is not None:
+            if isinstance(v, float) and v.is_integer():
+                v = int(v)  # 1.0 and 1 compare equal, as in pandas
+            # pandas mode turns object columns into strings, so 221401001 and
+            # '221401001' are the same key there too
+            v = str(v)
+            if trim:
+                v = v.strip()
+            if ignore_case:
+                v = v.casefold()
+        key.append(v)
+    return hashlib.blake2b(repr(key).encode("utf-8"), digest_size=16).digest()
+
+
+def key_indices(names: List[str], subset: Optional[List[str]], by_index: Optional[List[int]]) -> List[int]:
+    if subset:
+        missing = [c for c in subset if c not in names]
+        if missing:
+            raise KeyError(f"Subset columns not found: {missing}. Available: {names}")
+        return [names.index(c) for c in subset]
+    if by_index:
+        for idx in by_index:
+            if idx < 0 or idx >= len(names):
+                raise IndexError(f"Column index {idx} out of range for sheet with {len(names)} columns")
+        return list(by_index)
+    return list(range(len(names)))
+
+
+def keep_rows_from_spill(digests: Iterator[Tuple[bytes, int]], keep: str, workdir: str) -> Iterator[int]:
+    """Spill (digest, row) to SQLite, then yield the row numbers to keep in ascending order."""
+    db = sqlite3.connect(os.path.join(workdir, "keys.sqlite"))
+    try:
+        db.execute("PRAGMA journal_mode=OFF")
+        db.execute("PRAGMA synchronous=OFF")
+        db.execute("PRAGMA temp_store=FILE")
+        db.execute("DROP TABLE IF EXISTS k")
+        db.execute("CREATE TABLE k (digest BLOB NOT NULL, row INTEGER NOT NULL)")
+        batch = []
+        for pair in digests:
+            batch.append(pair)
+            if len(batch) >= SPILL_BATCH:
+                db.executemany("INSERT INTO k VALUES (?, ?)", batch)
+                batch.clear()
+        db.executemany("INSERT INTO k VALUES (?, ?)", batch)
+        db.commit()
+        if keep == "last":
+            sql = "SELECT MAX(row) AS r FROM k GROUP BY digest ORDER BY r"
+        else:  # none: only keys that occur exactly once
+            sql = "SELECT MIN(row) AS r FROM k GROUP BY digest HAVING COUNT(*) = 1 ORDER BY r"
+        for (row,) in db.execute(sql):
+            yield row
+    finally:
+        db.close()
+
+
+def stream_deduplicate(
+    input_path: str,
+    output_path: str,
+    subset: Optional[List[str]],
+    by_index: Optional[List[int]],
+    keep: str,
+    trim: bool,
+    ignore_case: bool,
+) -> List[Tuple[str, int, int, int]]:
+    """Deduplicate every sheet without loading it; returns (sheet, before, after, removed) per sheet."""
+    summary = []
+    out_wb = Workbook(write_only=True)
+    # Write next to the target first so --inplace never truncates the file still being read.
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    src = load_workbook(input_path, read_only=True, data_only=True)
+    try:
+        with tempfile.TemporaryDirectory(prefix="dedup_") as workdir:
+            # check the key columns of every sheet (headers only) before writing anything
+            key_idx_by_sheet = {}
+            for sheet in src.sheetnames:
+                header = next(src[sheet].iter_rows(max_row=1, values_only=True), None)
+                if header is not None:
+                    try:
+                        key_idx_by_sheet[sheet] = key_indices(header_names(header), subset, by_index)
+                    except (KeyError, IndexError) as e:
+                        raise RuntimeError(f"Sheet '{sheet}': {e}") from e
+
+            for sheet in src.sheetnames:
+                out_ws = out_wb.create_sheet(title=sheet)
+                rows = sheet_rows(src[sheet])
+                header = next(rows, None)
+                if header is None:
+                    summary.append((sheet, 0, 0, 0))
+                    continue
+                key_idx = key_idx_by_sheet[sheet]
+                out_ws.append(header)
+
+                before = after = 0
+                if keep == "first":
+                    seen = set()
+                    for row in rows:
+                        before += 1
+                        digest = row_digest(row, key_idx, trim, ignore_case)
+                        if digest in seen:
+                            continue
+                        seen.add(digest)
+                        out_ws.append(row)
+                        after += 1
+                    seen.clear()
+                else:
+                    # pass 1: digests to disk; pass 2: re-read the sheet and keep the selected rows
+                    digests = (
+                        (row_digest(row, key_idx, trim, ignore_case), n)
+                        for n, row in enumerate(rows)
+                    )
+                    keep_rows = keep_rows_from_spill(digests, keep, workdir)
+                    next_keep = next(keep_rows, None)
+                    second = sheet_rows(src[sheet])
+                    next(second)  # header
+                    for n, row in enumerate(second):
+                        before += 1
+                        if n == next_keep:
+                            out_ws.append(row)
+                            after += 1
+                            next_keep = next(keep_rows, None)
+                    keep_rows.close()
+                summary.append((sheet, before, after, before - after))
+        out_wb.save(tmp_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        src.close()
+    os.replace(tmp_path, output_path)
+    return summary
+
+
+# --- Multiple files / process pool ------------------------------------------
+
+GLOB_CHARS = set("*?[")
+
+
+def expand_inputs(patterns: List[str]) -> List[str]:
+    """Files, directories (their *.xlsx) and glob patterns -> unique paths, in order.
+
+    Excel lock files (~$...) and *_deduped outputs of earlier runs are skipped
+    when they come from a directory or a glob.
+    """
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            found = sorted(glob.glob(os.path.join(pattern, "*.xlsx")))
+        elif GLOB_CHARS & set(pattern):
+            found = sorted(glob.glob(pattern, recursive=True))
+        else:
+            paths.append(pattern)
+            continue
+        paths += [
+            p for p in found
+            if os.path.isfile(p)
+            and not os.path.basename(p).startswith("~$")
+            and not os.path.splitext(p)[0].endswith("_deduped")
+        ]
+    unique, seen = [], set()
+    for p in paths:
+        key = os.path.abspath(p)
+        if key not in seen:
+            seen.add(key)
+            unique.append(p)
+    return unique
+
+
+def dedupe_sheet_task(
+    input_path: str,
+    sheet: str,
+    subset: Optional[List[str]],
+    by_index: Optional[List[int]],
+    keep: str,
+    trim: bool,
+    ignore_case: bool,
+) -> Tuple[pd.DataFrame, int]:
+    """One sheet (runs in a worker): deduplicated frame and the row count before."""
+    df = pd.read_excel(input_path, sheet_name=sheet, engine="openpyxl")
+    if subset:
+        subset_cols = subset
+    elif by_index:
+        subset_cols = get_subset_by_index(df, by_index)
+    else:
+        subset_cols = None  # use all columns
+    out_df = deduplicate_sheet(df, subset_cols=subset_cols, keep=keep, trim=trim, ignore_case=ignore_case)
+    return out_df, len(df)
+
+
+def write_workbook_task(output_path: str, frames: List[Tuple[str, pd.DataFrame]]) -> None:
+    with pd.ExcelWriter(output_path, engine="openpyxl") as writer:
+        for sheet, frame in frames:
+            frame.to_excel(writer, sheet_name=sheet, index=False)
+
+
+class InlineExecutor:
+    """Executor-like object that runs each task right away (one worker, no pool)."""
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def make_executor(workers: int, tasks: int):
+    workers = max(1, min(workers, tasks))
+    return InlineExecutor() if workers == 1 else ProcessPoolExecutor(max_workers=workers)
+
+
+def print_file_result(result: dict) -> None:
+    if result["error"]:
+        print(f"ERROR: {result['input']}: {result['error']}", file=sys.stderr)
+        return
+    print(f"Saved: {result['output']}")
+    for (sheet, before, after, removed) in result["sheets"]:
+        print(f"[{sheet}] rows: {before} -> {after} (removed {removed})")
+
+
+def run_pandas(files: List[str], outputs: Dict[str, str], options: dict, workers: int) -> Dict[str, dict]:
+    """Every sheet of every file is a pool task; a file is written once all its sheets are done."""
+    results = {path: {"input": path, "output": outputs[path], "sheets": [], "error": None} for path in files}
+    sheet_names = {}
+    for path in files:
+        try:
+            with pd.ExcelFile(path, engine="openpyxl") as xls:
+                sheet_names[path] = xls.sheet_names
+        except Exception as e:
+            results[path]["error"] = f"Failed to open Excel file. {e}"
+            continue
+        if not sheet_names[path]:
+            results[path]["error"] = "No sheets found in the workbook."
+            del sheet_names[path]
+
+    tasks = sum(len(sheets) for sheets in sheet_names.values())
+    with make_executor(workers, tasks) as pool:
+        sheet_futures = {
+            pool.submit(dedupe_sheet_task, path, sheet, **options): (path, sheet)
+            for path, sheets in sheet_names.items()
+            for sheet in sheets
+        }
+        pending = {path: len(sheets) for path, sheets in sheet_names.items()}
+        done_frames = {path: {} for path in sheet_names}
+        write_futures = {}
+
+        for future in as_completed(sheet_futures):
+            path, sheet = sheet_futures[future]
+            result = results[path]
+            try:
+                done_frames[path][sheet] = future.result()
+            except Exception as e:
+                result["error"] = result["error"] or f"Sheet '{sheet}': {e}"
+            pending[path] -= 1
+            if pending[path] or result["error"]:
+                continue
+            frames = done_frames.pop(path)
+            for sheet_name in sheet_names[path]:
+                out_df, before = frames[sheet_name]
+                result["sheets"].append((sheet_name, before, len(out_df), before - len(out_df)))
+            write_futures[pool.submit(
+                write_workbook_task, result["output"], [(name, frames[name][0]) for name in sheet_names[path]]
+            )] = path
+
+        for future in as_completed(write_futures):
+            result = results[write_futures[future]]
+            try:
+                future.result()
+            except Exception as e:
+                result["error"] = f"Failed to write output workbook: {e}"
+            print_file_result(result)
+
+    for path in files:
+        if results[path]["error"] and not results[path]["sheets"]:
+            print_file_result(results[path])
+    return results
+
+
+def run_stream(files: List[str], outputs: Dict[str, str], options: dict, workers: int) -> Dict[str, dict]:
+    """One pool task per file; sheets of a file stay sequential so memory per worker stays constant."""
+    results = {path: {"input": path, "output": outputs[path], "sheets": [], "error": None} for path in files}
+    with make_executor(workers, len(files)) as pool:
+        futures = {pool.submit(stream_deduplicate, path, outputs[path], **options): path for path in files}
+        for future in as_completed(futures):
+            result = results[futures[future]]
+            try:
+                result["sheets"] = future.result()
+            except Exception as e:
+                result["error"] = str(e)
+            print_file_result(result)
+    return results
+
+
+def write_report(path: str, files: List[str], results: Dict[str, dict]) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["input", "output", "sheet", "rows_before", "rows_after", "removed", "error"])
+        for file in files:
+            result = results[file]
+            if result["error"]:
+                writer.writerow([file, result["output"], "", "", "", "", result["error"]])
+            for (sheet, before, after, removed) in result["sheets"]:
+                writer.writerow([file, result["output"], sheet, before, after, removed, ""])
+
+
 def main():
-    parser = argparse.ArgumentParser(description="Remove duplicate rows from an Excel file (.xlsx).")
-    parser.add_argument("input", help="Path to input .xlsx file")
-    parser.add_argument("-o", "--output", help="Path to output .xlsx file (default: <input> with _deduped suffix)")
+    parser = argparse.ArgumentParser(description="Remove duplicate rows from Excel files (.xlsx).")
+    parser.add_argument("inputs", nargs="+", metavar="input",
+                        help="Input .xlsx file(s), directories (all *.xlsx inside) or glob patterns")
+    parser.add_argument("-o", "--output",
+                        help="Path to output .xlsx file, single input only (default: <input> with _deduped suffix)")
     parser.add_argument("--subset", help="Comma-separated column NAMES to consider for duplicates (e.g., 'Email,Phone')")
     parser.add_argument("--by-index", help="Comma-separated column INDICES (0-based) to consider (e.g., '0,2,3')")
     parser.add_argument("--keep", choices=["first", "last", "none"], default="first",
@@ -115,79 +496,61 @@ def main():
     parser.add_argument("--trim", action="store_true", help="Trim whitespace on text columns before comparing")
     parser.add_argument("--ignore-case", action="store_true", help="Make text comparison case-insensitive")
     parser.add_argument("--inplace", action="store_true", help="Overwrite the input file")
+    parser.add_argument("--stream", action="store_true",
+                        help="Constant-memory mode for very large files (values only, formatting is not kept)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes for files/sheets (default: CPU count, 1 = no pool)")
+    parser.add_argument("--report", help="Write a per-sheet CSV report for all inputs to this path")
 
     args = parser.parse_args()
 
-    input_path = args.input
-    output_path = pick_output_path(input_path, args.output, args.inplace)
+    files = expand_inputs(args.inputs)
+    if not files:
+        print("ERROR: No .xlsx files matched the given inputs.", file=sys.stderr)
+        sys.exit(1)
+    if args.output and len(files) > 1:
+        print("ERROR: --output can only be used with a single input file.", file=sys.stderr)
+        sys.exit(1)
 
-    if not os.path.exists(input_path):
-        print(f"ERROR: Input file not found: {input_path}", file=sys.stderr)
+    missing = [path for path in files if not os.path.exists(path)]
+    if missing:
+        for path in missing:
+            print(f"ERROR: Input file not found: {path}", file=sys.stderr)
         sys.exit(1)
 
     # Validate subset/by-index options
-    subset_cols = None
     if args.subset and args.by_index:
         print("ERROR: Use either --subset or --by-index, not both.", file=sys.stderr)
         sys.exit(1)
 
-    try:
-        xls = pd.ExcelFile(input_path, engine="openpyxl")
-    except Exception as e:
-        print(f"ERROR: Failed to open Excel file. {e}", file=sys.stderr)
+    options = {
+        "subset": parse_list_arg(args.subset),
+        "by_index": [int(x) for x in parse_list_arg(args.by_index)] if args.by_index else None,
+        "keep": args.keep,
+        "trim": args.trim,
+        "ignore_case": args.ignore_case,
+    }
+    outputs = {path: pick_output_path(path, args.output, args.inplace) for path in files}
+
+    started = time.perf_counter()
+    run = run_stream if args.stream else run_pandas
+    results = run(files, outputs, options, args.workers)
+    elapsed = time.perf_counter() - started
+
+    failed = [path for path in files if results[path]["error"]]
+    if len(files) > 1:
+        sheets = [row for path in files for row in results[path]["sheets"] if not results[path]["error"]]
+        before = sum(row[1] for row in sheets)
+        after = sum(row[2] for row in sheets)
+        print(
+            f"Total: {len(files) - len(failed)}/{len(files)} files, {len(sheets)} sheets, "
+            f"rows: {before} -> {after} (removed {before - after}) in {elapsed:.1f}s"
+        )
+    if args.report:
+        write_report(args.report, files, results)
+        print(f"Report: {args.report}")
+    if failed:
         sys.exit(1)
 
-    sheet_names = xls.sheet_names
-    if not sheet_names:
-        print("ERROR: No sheets found in the workbook.", file=sys.stderr)
-        sys.exit(1)
-
-    deduped_frames = {}
-    summary = []
-
-    for sheet in sheet_names:
-        df = pd.read_excel(xls, sheet_name=sheet)
-
-        # Decide subset columns for this sheet
-        if args.subset:
-            subset_cols = parse_list_arg(args.subset)
-        elif args.by_index:
-            idxs = [int(x) for x in parse_list_arg(args.by_index)]
-            subset_cols = get_subset_by_index(df, idxs)
-        else:
-            subset_cols = None  # use all columns
-
-        before = len(df)
-        try:
-            out_df = deduplicate_sheet(
-                df,
-                subset_cols=subset_cols,
-                keep=args.keep,
-                trim=args.trim,
-                ignore_case=args.ignore_case,
-            )
-        except Exception as e:
-            print(f"ERROR: Sheet '{sheet}': {e}", file=sys.stderr)
-            sys.exit(1)
-
-        after = len(out_df)
-        removed = before - after
-        summary.append((sheet, before, after, removed))
-        deduped_frames[sheet] = out_df
-
-    # Write output
-    try:
-        with pd.ExcelWriter(output_path, engine="openpyxl") as writer:
-            for sheet, frame in deduped_frames.items():
-                frame.to_excel(writer, sheet_name=sheet, index=False)
-    except Exception as e:
-        print(f"ERROR: Failed to write output workbook: {e}", file=sys.stderr)
-        sys.exit(1)
-
-    # Print summary
-    print(f"Saved: {output_path}")
-    for (sheet, before, after, removed) in summary:
-        print(f"[{sheet}] rows: {before} -> {after} (removed {removed})")
-
 if __name__ == "__main__":
     main()